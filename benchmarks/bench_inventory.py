@@ -0,0 +1,67 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+import synthetic
+
+# Both inventory scripts, and their shared archive store
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(REPOSITORY, "exoplanet_inventory"))
+sys.path.append(os.path.join(
+    REPOSITORY, "exoplanet_inventory", "exoplanet_detection_statistics"
+))
+sys.path.append(os.path.join(
+    REPOSITORY, "exoplanet_inventory", "exoplanet_parameters"
+))
+import archive_store  # noqa: E402
+import util  # noqa: E402
+import utils  # noqa: E402
+
+
+class DetectionStatistics:
+    """Cumulative discovery counts per year and method."""
+    params = [[6_000, 30_000, 100_000]]
+    param_names = ["rows"]
+
+    def setup(self, n_rows):
+        self.frame = synthetic.archive_frame(n_rows).sort("disc_year")
+        self.years = np.arange(
+            self.frame["disc_year"].min(), self.frame["disc_year"].max() + 1
+        )
+        self.methods = self.frame.unique(
+            subset="discoverymethod", maintain_order=True
+        )["discoverymethod"].to_numpy()
+
+    def time_method_dictionary(self, n_rows):
+        utils.method_dictionary(
+            years=self.years, methods=self.methods, dataframe=self.frame
+        )
+
+    def time_cumulative_discovery_data(self, n_rows):
+        utils.cumulative_discovery_data(self.frame)
+
+
+class ArchiveSnapshot:
+    """Reading the needed columns of an archive snapshot (Parquet)."""
+    params = [[6_000, 30_000, 100_000]]
+    param_names = ["rows"]
+
+    def setup(self, n_rows):
+        self.store_directory = archive_store.STORE_DIRECTORY
+        self.directory = tempfile.mkdtemp()
+
+        archive_store.STORE_DIRECTORY = self.directory
+        archive_store.write_snapshot(synthetic.archive_frame(n_rows))
+
+    def teardown(self, n_rows):
+        archive_store.STORE_DIRECTORY = self.store_directory
+        shutil.rmtree(self.directory)
+
+    def time_read_detection_parameters(self, n_rows):
+        utils.read_exoplanet_parameters()
+
+    def time_read_population_parameters(self, n_rows):
+        util.read_exoplanet_parameters()
@@ -0,0 +1,64 @@
+import os
+import sys
+
+import numpy as np
+
+import synthetic
+
+# Shared binning (light-curve examples) and the transit model
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(REPOSITORY, "common"))
+sys.path.append(os.path.join(REPOSITORY, "transit_lightcurves"))
+import binning  # noqa: E402
+import transit_model  # noqa: E402
+
+# GLOBALS: WASP-39 b like orbit, around the mid-time of the synthetic grid
+PLANET = {
+    "ratio_ator": 11.4, "ratio_rtor": 0.145, "pl_orbper": 4.055,
+    "pl_orbincl": 87.8, "pl_orbeccen": 0., "pl_orblper": 90.
+}
+MID_TIME = 0.175
+
+
+class LightcurveBinning:
+    """Temporal binning of a (channel x time) light-curve grid."""
+    params = [[1, 500], [10, 100]]
+    param_names = ["channels", "binsize"]
+
+    def setup(self, n_channels, binsize):
+        self.grid = synthetic.lightcurve_grid(21_000, n_channels)
+        self.bin_ids = np.arange(21_000) // binsize
+
+    def time_box_median(self, n_channels, binsize):
+        binning.box_median(self.grid["flux"], binsize)
+
+    def time_box_weighted_mean(self, n_channels, binsize):
+        binning.box_weighted_mean(
+            self.grid["flux"], self.grid["error"], binsize
+        )
+
+    def time_bin_median(self, n_channels, binsize):
+        # Arbitrary bin ids instead of boxes (sorting instead of reshaping)
+        binning.bin_median(self.grid["flux"], self.bin_ids, 21_000 // binsize)
+
+
+class TransitModel:
+    """Transit light-curves on the (channel x time) grid."""
+    params = [[1, 50], ["uniform", "quadratic"]]
+    param_names = ["channels", "limb_darkening"]
+
+    def setup(self, n_channels, limb_darkening):
+        self.time = synthetic.lightcurve_grid(21_000, 1)["time"]
+        self.radius_ratio = 0.145 + 0.005 * np.sin(
+            np.linspace(0, 6, n_channels)
+        )
+        self.limb_darkening = (
+            None if limb_darkening == "uniform" else (0.4, 0.25)
+        )
+
+    def time_transit_lightcurve(self, n_channels, limb_darkening):
+        transit_model.transit_lightcurve(
+            self.time, PLANET, mid_time=MID_TIME,
+            radius_ratio=self.radius_ratio,
+            limb_darkening=self.limb_darkening
+        )
@@ -0,0 +1,84 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import synthetic
+
+# Spectra of the pre/post-JWST comparison (with their own 'util' module)
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(REPOSITORY, "common"))
+sys.path.append(os.path.join(REPOSITORY, "pre-post_JWST_comparison"))
+import binning  # noqa: E402
+import spectral_rebin  # noqa: E402
+import spectrum_store  # noqa: E402
+import util  # noqa: E402
+
+
+class SpectrumLoading:
+    """Reading IPAC spectra, parsed and from the spectrum store."""
+    params = [[100, 5_000, 50_000]]
+    param_names = ["points"]
+
+    def setup(self, n_points):
+        self.store_directory = spectrum_store.STORE_DIRECTORY
+        self.directory = tempfile.mkdtemp()
+        spectrum_store.STORE_DIRECTORY = os.path.join(
+            self.directory, "store"
+        )
+
+        self.filename = synthetic.write_ipac_spectrum(
+            os.path.join(self.directory, "spectrum.tbl"), n_points
+        )
+        util.SpectralData(self.filename, reference="Synthetic")
+
+    def teardown(self, n_points):
+        spectrum_store.STORE_DIRECTORY = self.store_directory
+        shutil.rmtree(self.directory)
+
+    def time_read_ipac_columns(self, n_points):
+        spectrum_store.read_ipac_columns(
+            self.filename, spectrum_store.SPECTRUM_COLUMNS
+        )
+
+    def time_spectral_data(self, n_points):
+        util.SpectralData(self.filename, reference="Synthetic")
+
+
+class SpectralStitching:
+    """Collecting spectra, and rebinning them onto a common R grid."""
+    params = [[10, 100], [3_000]]
+    param_names = ["spectra", "points"]
+
+    def setup(self, n_spectra, n_points):
+        self.spectra = []
+        for idx in range(n_spectra):
+            spectrum = util.SpectralData.__new__(util.SpectralData)
+            spectrum.ref = f"Reference {idx % 5}"
+            spectrum.instrument = f"Instrument {idx % 3}"
+
+            points = synthetic.spectrum_points(
+                n_points, lower=0.5 + 0.02 * idx, offset=0.01 * (idx % 4),
+                seed=idx
+            )
+            for key, values in points.items():
+                setattr(spectrum, key, values)
+
+            self.spectra.append(spectrum)
+
+        self.collection = util.SpectralCollection.from_spectra(self.spectra)
+        self.edges = binning.resolution_edges(0.5, 5.5, 100)
+
+    def time_from_spectra(self, n_spectra, n_points):
+        util.SpectralCollection.from_spectra(self.spectra)
+
+    def time_select(self, n_spectra, n_points):
+        self.collection.select(
+            wavelength_range=(1, 3), references=["Reference 1"]
+        )
+
+    def time_rebin_spectra(self, n_spectra, n_points):
+        spectral_rebin.rebin_spectra(self.collection, self.edges)
+
+    def time_stitch_spectra(self, n_spectra, n_points):
+        spectral_rebin.stitch_spectra(self.collection, self.edges)
@@ -0,0 +1,38 @@
+import os
+import sys
+
+import synthetic
+
+# Shared binning, as used by 'opacity_xsec_illustration/xsec_prep.py'
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(REPOSITORY, "common"))
+import binning  # noqa: E402
+
+
+class ResolutionBinning:
+    """Binning of a cross-section slab to constant resolution R."""
+    params = [[1_000_000, 10_000_000], [100, 1_000]]
+    param_names = ["points", "resolution"]
+
+    def setup(self, n_points, resolution):
+        self.wavel, self.xsec = synthetic.xsec_spectrum(n_points)
+        self.bin_ids = binning.resolution_bin_ids(self.wavel, resolution)
+
+    def time_resolution_bin_ids(self, n_points, resolution):
+        binning.resolution_bin_ids(self.wavel, resolution)
+
+    def time_bin_id_average(self, n_points, resolution):
+        binning.bin_id_average(self.xsec, self.bin_ids)
+
+
+class BoxBinning:
+    """Box averages of a cross-section slab."""
+    params = [[1_000_000, 10_000_000], [10, 1_000]]
+    param_names = ["points", "box"]
+
+    def setup(self, n_points, box):
+        self.wavel, self.xsec = synthetic.xsec_spectrum(n_points)
+
+    def time_box_average(self, n_points, box):
+        binning.box_average(self.wavel, box)
+        binning.box_average(self.xsec, box)
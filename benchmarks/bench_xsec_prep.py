@@ -0,0 +1,57 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import synthetic
+
+# The cross-section preparation itself (which needs Python >= 3.12, like
+# the script), so that its own steps and the HDF5 reads are covered
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(REPOSITORY, "opacity_xsec_illustration"))
+import xsec_prep  # noqa: E402
+
+
+class BinData:
+    """'wrap_bin_data' on a cross-section slab (both bin types)."""
+    params = [[1_000_000, 10_000_000], ["resolution", "box"]]
+    param_names = ["points", "bin_type"]
+
+    def setup(self, n_points, bin_type):
+        self.wavel, self.xsec = synthetic.xsec_spectrum(n_points)
+
+    def time_wrap_bin_data(self, n_points, bin_type):
+        # R=100, or boxes of 100 samples
+        xsec_prep.wrap_bin_data(
+            bin_type=bin_type, bin_info=100, wavel=self.wavel, xsec=self.xsec
+        )
+
+
+class PrepareXsecData:
+    """
+    'prepare_xsec_data' on a synthetic TauREx file: reading the selected
+    (p, T) slab (whole, or in chunks), binning, and writing the products.
+    The cache is off, so that every run reads and bins the file.
+    """
+    params = [[1_000_000], [None, 100_000]]
+    param_names = ["points", "chunk_size"]
+
+    def setup(self, n_points, chunk_size):
+        self.directory = tempfile.mkdtemp()
+        self.working_directory = os.getcwd()
+        self.filename = synthetic.write_xsec_file(
+            os.path.join(self.directory, "xsec.h5"), n_points
+        )
+
+        # Products are written to 'binned_data' of the working directory
+        os.chdir(self.directory)
+        os.makedirs("binned_data")
+
+    def teardown(self, n_points, chunk_size):
+        os.chdir(self.working_directory)
+        shutil.rmtree(self.directory)
+
+    def time_prepare_xsec_data(self, n_points, chunk_size):
+        xsec_prep.prepare_xsec_data(
+            self.filename, chunk_size=chunk_size, use_cache=False
+        )
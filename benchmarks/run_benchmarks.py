@@ -0,0 +1,310 @@
+import argparse
+import datetime
+import glob
+import importlib
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+# GLOBALS
+BENCHMARK_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIRECTORY = os.path.join(BENCHMARK_DIRECTORY, "results")
+REPEAT = 5
+MIN_TIME = 1.
+THRESHOLD = 1.2
+MIN_MEMORY = 2 ** 20
+
+
+def main():
+    args = argument_parser()
+
+    # Worker mode: run one benchmark module, in its own process
+    if args.worker is not None:
+        results = run_module(
+            args.worker, quick=args.quick, pattern=args.bench,
+            repeat=args.repeat
+        )
+        with open(args.worker_output, "w") as f:
+            json.dump(results, f)
+
+        return
+
+    results = {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "machine": platform.node(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "quick": args.quick,
+        "benchmarks": {},
+    }
+    for module in benchmark_modules():
+        results["benchmarks"].update(run_worker(module, args))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to '{args.baseline}'")
+
+        return
+
+    # Without a baseline there is nothing to compare against, which must
+    # not pass as a run without regressions
+    if not os.path.isfile(args.baseline):
+        print(f"\nWARNING: no baseline at '{args.baseline}'; store one "
+              f"first with '--save-baseline'", file=sys.stderr)
+        sys.exit(2)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    print(f"\nCompared to baseline of {baseline['date']} "
+          f"({baseline['commit']}):")
+    regressions = compare_results(
+        results["benchmarks"], baseline["benchmarks"], args.threshold
+    )
+
+    sys.exit(1 if regressions else 0)
+
+
+def argument_parser() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run the benchmarks in 'bench_*.py' (asv-style classes "
+                    "with 'setup' and 'time_*' methods). Every benchmark is "
+                    "timed (best of several runs) and its peak memory is "
+                    "traced; the results are compared against a baseline."
+    )
+    parser.add_argument(
+        "-b", "--bench", default=None,
+        help="Only run benchmarks whose name contains this string"
+    )
+    parser.add_argument(
+        "-q", "--quick", action=argparse.BooleanOptionalAction,
+        default=False, help="Only run the smallest parameter set"
+    )
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=REPEAT,
+        help="Maximum number of timed runs per benchmark"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        default=os.path.join(RESULTS_DIRECTORY, "latest.json"),
+        help="Results file"
+    )
+    parser.add_argument(
+        "--baseline",
+        default=os.path.join(RESULTS_DIRECTORY, "baseline.json"),
+        help="Baseline file to compare against (store it first with "
+             "--save-baseline)"
+    )
+    parser.add_argument(
+        "--save-baseline", action=argparse.BooleanOptionalAction,
+        default=False, help="Store the results as the new baseline"
+    )
+    parser.add_argument(
+        "-t", "--threshold", type=float, default=THRESHOLD,
+        help="Ratio to the baseline (time or memory) counted as regression"
+    )
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+
+    return parser.parse_args()
+
+
+def benchmark_modules() -> list[str]:
+    return sorted(
+        os.path.splitext(os.path.basename(filename))[0]
+        for filename in glob.glob(
+            os.path.join(BENCHMARK_DIRECTORY, "bench_*.py")
+        )
+    )
+
+
+def run_worker(module: str, args: argparse.Namespace) -> dict:
+    """
+    Run one benchmark module in a fresh interpreter, so that modules of the
+    same name from different plot collections (e.g. 'util') do not clash,
+    and memory of earlier benchmarks does not carry over.
+    """
+    with tempfile.NamedTemporaryFile(suffix=".json") as output:
+        command = [
+            sys.executable, os.path.abspath(__file__), "--worker", module,
+            "--worker-output", output.name, "--repeat", str(args.repeat),
+            "--quick" if args.quick else "--no-quick"
+        ]
+        if args.bench is not None:
+            command += ["--bench", args.bench]
+
+        # A broken module is reported, but does not stop the others
+        try:
+            subprocess.run(command, cwd=BENCHMARK_DIRECTORY, check=True)
+        except subprocess.CalledProcessError:
+            print(f"BENCHMARK MODULE {module} FAILED\n")
+            return {}
+
+        with open(output.name) as f:
+            return json.load(f)
+
+
+def run_module(
+        module_name: str, quick: bool, pattern: str, repeat: int
+) -> dict:
+    """Run all benchmarks of a module, for all parameter combinations."""
+    sys.path.insert(0, BENCHMARK_DIRECTORY)
+    module = importlib.import_module(module_name)
+
+    results = {}
+    for class_name, benchmark_class in vars(module).items():
+        methods = [
+            name for name in dir(benchmark_class) if name.startswith("time_")
+        ]
+        if not isinstance(benchmark_class, type) or not methods:
+            continue
+
+        params = getattr(benchmark_class, "params", [])
+        if quick:
+            params = [values[:1] for values in params]
+
+        for parameters in itertools.product(*params):
+            names = [
+                f"{module_name}.{class_name}.{method}"
+                f"({', '.join(map(str, parameters))})"
+                for method in methods
+            ]
+            if pattern is not None and not any(
+                    pattern in name for name in names
+            ):
+                continue
+
+            benchmark = benchmark_class()
+            if hasattr(benchmark, "setup"):
+                benchmark.setup(*parameters)
+
+            for method, name in zip(methods, names):
+                if pattern is not None and pattern not in name:
+                    continue
+
+                results[name] = measure(
+                    getattr(benchmark, method), parameters, repeat
+                )
+                print_result(name, results[name])
+
+            if hasattr(benchmark, "teardown"):
+                benchmark.teardown(*parameters)
+
+    return results
+
+
+def measure(function, parameters: tuple, repeat: int) -> dict:
+    """
+    Best and median wall time over up to 'repeat' runs (fewer for slow
+    benchmarks, to stay near MIN_TIME), and the peak of memory allocated
+    during one traced run. tracemalloc sees NumPy and Python allocations,
+    but not those made inside Rust or C libraries (e.g. polars).
+    """
+    times = []
+    while len(times) < repeat and (
+            len(times) < 2 or sum(times) < MIN_TIME
+    ):
+        start = time.perf_counter()
+        function(*parameters)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    function(*parameters)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "time": min(times),
+        "time_median": float(np.median(times)),
+        "runs": len(times),
+        "peak_memory": peak_memory,
+    }
+
+
+def compare_results(
+        results: dict, baseline: dict, threshold: float
+) -> list[str]:
+    """
+    Print the ratios to the baseline, and return the regressions. Memory is
+    only compared for benchmarks whose baseline peak is at least
+    MIN_MEMORY: below that, tracemalloc sees only the Python overhead (e.g.
+    of polars benchmarks, whose data lives in Rust), and ratios of a few
+    kB are noise.
+    """
+    regressions = []
+
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"  {'new':>8}  {name}")
+            continue
+
+        time_ratio = result["time"] / baseline[name]["time"]
+        if baseline[name]["peak_memory"] >= MIN_MEMORY:
+            memory_ratio = (
+                result["peak_memory"] / baseline[name]["peak_memory"]
+            )
+            memory_string = f"x{memory_ratio:5.2f}"
+        else:
+            memory_ratio = None
+            memory_string = f"{'n/a':>6}"
+
+        memory_regressed = (
+            memory_ratio is not None and memory_ratio > threshold
+        )
+        if time_ratio > threshold or memory_regressed:
+            regressions.append(name)
+
+        print(
+            f"  {'SLOWER' if time_ratio > threshold else '':>6}"
+            f"{'MEMORY' if memory_regressed else '':>7}"
+            f"  time x{time_ratio:5.2f}  memory {memory_string}  {name}"
+        )
+
+    print(f"\n{len(regressions)} regression(s) above x{threshold}")
+
+    return regressions
+
+
+def print_result(name: str, result: dict) -> None:
+    print(
+        f"{format_time(result['time']):>10}"
+        f"{result['peak_memory'] / 2 ** 20:10.1f} MiB  {name}",
+        flush=True
+    )
+
+    return None
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+
+    return f"{seconds / 1e-9:.3g} ns"
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARK_DIRECTORY,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import h5py as h5
+import numpy as np
+import polars as pl
+
+# Synthetic inputs of the sizes of the real data, so that the benchmarks
+# run without any downloads. Every generator is seeded and reproducible.
+
+# GLOBALS
+SEED = 42
+DISCOVERY_METHODS = [
+    "Transit", "Radial Velocity", "Microlensing", "Imaging",
+    "Transit Timing Variations", "Eclipse Timing Variations",
+    "Orbital Brightness Modulation", "Pulsar Timing",
+    "Astrometry", "Pulsation Timing Variations", "Disk Kinematics"
+]
+METHOD_SHARES = [
+    0.741, 0.19, 0.04, 0.015, 0.005, 0.0035, 0.0015, 0.0015, 0.0015,
+    0.0005, 0.0005
+]
+IPAC_COLUMNS = [
+    "CENTRALWAVELNG", "BANDWIDTH", "PL_TRANDEP", "PL_TRANDEPERR1",
+    "PL_TRANDEPERR2", "PL_TRANDEP_AUTHORS"
+]
+IPAC_WIDTH = 18
+
+
+def archive_frame(n_rows: int, seed: int = SEED) -> pl.DataFrame:
+    """
+    Planetary-systems table in the layout of the archive store, with
+    realistic method mix, discovery years and (log-normal) parameters.
+    About 10% of the parameters are missing, as in the archive.
+    """
+    rng = np.random.default_rng(seed)
+
+    def parameter(median: float, sigma: float) -> np.ndarray:
+        values = median * rng.lognormal(0, sigma, n_rows)
+        values[rng.random(n_rows) < 0.1] = np.nan
+        return values
+
+    dates = pl.Series(
+        np.datetime64("2014-01-01") + rng.integers(0, 4000, n_rows).astype(
+            "timedelta64[D]"
+        )
+    ).cast(pl.Date)
+
+    return pl.DataFrame({
+        "pl_name": [f"Planet-{idx} b" for idx in range(n_rows)],
+        "hostname": [f"Planet-{idx}" for idx in range(n_rows)],
+        "disc_year": rng.integers(1992, 2026, n_rows).astype(np.int32),
+        "discoverymethod": rng.choice(
+            DISCOVERY_METHODS, n_rows, p=METHOD_SHARES
+        ),
+        "pl_orbper": parameter(10, 1.5),
+        "pl_orbsmax": parameter(0.1, 1.),
+        "pl_rade": parameter(3, 0.8),
+        "pl_masse": parameter(20, 1.5),
+        "pl_orbeccen": rng.uniform(0, 0.5, n_rows),
+        "pl_orbincl": rng.uniform(80, 90, n_rows),
+        "pl_orblper": rng.uniform(0, 360, n_rows),
+        "pl_imppar": rng.uniform(0, 1, n_rows),
+        "pl_projobliq": parameter(10, 1.),
+        "pl_trandur": parameter(3, 0.5),
+        "pl_eqt": parameter(1000, 0.5),
+        "st_rad": parameter(1, 0.3),
+        "st_teff": parameter(5500, 0.2),
+        "rowupdate": dates,
+        "releasedate": dates,
+    })
+
+
+def xsec_spectrum(
+        n_points: int, seed: int = SEED
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Wavelength [m] and cross-section of one (p, T) slab, as read from a
+    TauREx file: ascending wavenumber 300-33000 cm^-1, so the wavelength
+    descends. The cross-section has many narrow lines over a continuum.
+    """
+    rng = np.random.default_rng(seed)
+    wavenumber = np.linspace(300, 33000, n_points)
+
+    xsec = 1e-22 * np.exp(
+        -wavenumber / 8000 + 3 * np.sin(wavenumber / 7.3) ** 8
+    ) * rng.lognormal(0, 0.5, n_points)
+
+    return 1 / (wavenumber * 1e2), xsec
+
+
+def write_xsec_file(
+        filename: str, n_points: int, pressures: int = 3,
+        temperatures: int = 2, seed: int = SEED
+) -> str:
+    """
+    Write a cross-section file in the layout of a TauREx .h5 file, with a
+    (pressure x temperature x wavenumber) grid of 'xsec_spectrum' slabs.
+    """
+    rng = np.random.default_rng(seed)
+    wavelength, xsec = xsec_spectrum(n_points, seed=seed)
+
+    with h5.File(filename, "w") as f:
+        f["DOI"] = np.array([b"10.0000/synthetic"])
+        f["mol_name"] = np.array([b"H2O"])
+        f["p"] = np.logspace(-5, 2, pressures)
+        f["t"] = np.linspace(500, 2500, temperatures)
+        f["bin_edges"] = 1 / (wavelength * 1e2)
+        f["xsecarr"] = xsec * rng.lognormal(
+            0, 0.1, (pressures, temperatures, 1)
+        )
+
+    return filename
+
+
+def lightcurve_grid(
+        n_time: int, n_channels: int, seed: int = SEED
+) -> dict[str, np.ndarray]:
+    """
+    Spectroscopic light-curves on a (channel x time) grid: a box-shaped
+    transit with white noise, and errors rising with the channel number.
+    """
+    rng = np.random.default_rng(seed)
+    time = np.linspace(0, 0.35, n_time)
+
+    error = np.linspace(5e-4, 5e-3, n_channels)[:, np.newaxis] * np.ones(
+        n_time
+    )
+    flux = 1 - 0.021 * (np.abs(time - 0.175) < 0.06) + error * (
+        rng.standard_normal((n_channels, n_time))
+    )
+
+    return {"time": time, "flux": flux, "error": error}
+
+
+def spectrum_points(
+        n_points: int, lower: float = 0.5, upper: float = 5.5,
+        offset: float = 0., seed: int = SEED
+) -> dict[str, np.ndarray]:
+    """Transmission spectrum (columns of 'SpectralData') on even bins."""
+    rng = np.random.default_rng(seed)
+    edges = np.linspace(lower, upper, n_points + 1)
+    lam_cen = 0.5 * (edges[1:] + edges[:-1])
+    error = rng.uniform(0.005, 0.03, n_points)
+
+    return {
+        "lam_cen": lam_cen,
+        "lam_err": 0.5 * np.diff(edges),
+        "td": 2.1 + 0.05 * np.sin(3 * lam_cen) + offset
+        + error * rng.standard_normal(n_points),
+        "td_err_pos": error,
+        "td_err_neg": error,
+    }
+
+
+def write_ipac_spectrum(
+        filename: str, n_points: int, seed: int = SEED
+) -> str:
+    """Write a spectrum as an IPAC table, as downloaded from the archive."""
+    spectrum = spectrum_points(n_points, seed=seed)
+    columns = [
+        spectrum["lam_cen"], 2 * spectrum["lam_err"], spectrum["td"],
+        spectrum["td_err_pos"], -spectrum["td_err_neg"]
+    ]
+    types = ["double"] * 5 + ["char"]
+
+    def header(entries: list[str]) -> str:
+        return "|" + "|".join(
+            entry.rjust(IPAC_WIDTH) for entry in entries
+        ) + "|\n"
+
+    with open(filename, "w") as f:
+        f.write("\\PL_NAME = Synthetic b\n\\REFERENCE = Synthetic\n")
+        f.write(header(IPAC_COLUMNS))
+        f.write(header(types))
+        f.write(header(["microns", "microns", "%", "", "", ""]))
+        f.write(header(["null"] * len(IPAC_COLUMNS)))
+
+        for row in zip(*columns):
+            f.write(
+                " " + " ".join(
+                    f"{value:{IPAC_WIDTH}.5f}" for value in row
+                ) + " " + "Synthetic et al.".rjust(IPAC_WIDTH) + " \n"
+            )
+
+    return filename
@@ -0,0 +1,33 @@
+import contextlib
+import os
+import tempfile
+
+# Writing files so that readers (other processes, or the next run after an
+# interrupted one) only ever see a complete file: the content goes to a
+# temporary file in the same directory, which then replaces the target in
+# one step ('os.replace' is atomic within a file system).
+
+
+@contextlib.contextmanager
+def replacing_file(filename: str, mode: str = "wb"):
+    """
+    Open a temporary file next to 'filename', and move it in place of the
+    file once it is written completely (or remove it after an error).
+
+    Usage:
+        with replacing_file("index.json", "w") as f:
+            json.dump(index, f)
+    """
+    descriptor, temporary_file = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(filename)),
+        prefix=f".{os.path.basename(filename)}.", suffix=".tmp"
+    )
+
+    try:
+        with os.fdopen(descriptor, mode) as f:
+            yield f
+    except BaseException:
+        os.remove(temporary_file)
+        raise
+
+    os.replace(temporary_file, filename)
@@ -0,0 +1,252 @@
+import numpy as np
+
+# Binning of samples along the last axis of an array. Fixed-size boxes are
+# reshaped into (..., bins, binsize); any other binning assigns every sample
+# a bin id (constant resolution R, arbitrary edges), and the reducers sum
+# all samples of a bin with one 'np.bincount' per quantity. Samples with a
+# bin id outside [0, n_bins) are ignored, and empty bins are NaN.
+
+
+def box_reshape(
+        array: np.ndarray, binsize: int, tail: str = "drop"
+) -> np.ndarray:
+    """
+    Reshape the last (time-) axis into bins of 'binsize' samples, so that
+    (channels x time) becomes (channels x bins x binsize). An incomplete
+    trailing bin is dropped ("drop"), filled up with its last value
+    ("pad"), or filled up with NaN ("partial"), so that NaN-aware
+    reductions only use the samples that are actually there.
+    """
+    array = np.asarray(array)
+    if not np.issubdtype(array.dtype, np.floating):
+        array = array.astype(float)
+
+    remainder = array.shape[-1] % binsize
+    tail_padding = [(0, 0)] * (array.ndim - 1) + [(0, binsize - remainder)]
+
+    if tail == "drop" or remainder == 0:
+        array = array[..., :array.shape[-1] - remainder]
+
+    elif tail == "pad":
+        array = np.pad(array, tail_padding, mode="edge")
+
+    elif tail == "partial":
+        array = np.pad(
+            array, tail_padding, mode="constant", constant_values=np.nan
+        )
+
+    else:
+        raise ValueError(f"Unknown tail handling '{tail}'")
+
+    return array.reshape(*array.shape[:-1], -1, binsize)
+
+
+def box_average(
+        array: np.ndarray, binsize: int, tail: str = "drop"
+) -> np.ndarray:
+    """Mean of each box (NaN-aware for the NaN-padded "partial" tail)."""
+    boxes = box_reshape(array, binsize, tail)
+
+    if tail == "partial":
+        return np.nanmean(boxes, axis=-1)
+
+    return boxes.mean(axis=-1)
+
+
+def box_median(
+        array: np.ndarray, binsize: int, tail: str = "drop"
+) -> np.ndarray:
+    """Median of each temporal bin, ignoring NaN."""
+    return np.nanmedian(box_reshape(array, binsize, tail), axis=-1)
+
+
+def box_weighted_mean(
+        data: np.ndarray, error: np.ndarray, binsize: int, tail: str = "drop"
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Weighted (inverse-variance) arithmetic mean of each temporal bin, and
+    its error. NaN samples do not contribute to a bin.
+    """
+    return weighted_mean(
+        box_reshape(data, binsize, tail), box_reshape(error, binsize, tail),
+        axis=-1
+    )
+
+
+def weighted_mean(
+        data: np.ndarray, error: np.ndarray, axis: int = -1
+) -> tuple[np.ndarray, np.ndarray]:
+    """Inverse-variance weighted mean along an axis, and its error."""
+    valid = np.isfinite(data) & np.isfinite(error)
+    weights = np.where(valid, 1 / np.where(valid, error, 1) ** 2, 0)
+    weight_sum = np.sum(weights, axis=axis)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.sum(np.where(valid, data, 0) * weights, axis=axis) / (
+            weight_sum
+        )
+
+    return mean, 1 / np.sqrt(weight_sum)
+
+
+def resolution_log_step(resolving_power: float) -> float:
+    """
+    Step in ln(lambda) between the edges of bins of constant resolution,
+    such that lambda_central / lambda_span = R.
+    """
+    return np.log((2 * resolving_power + 1) / (2 * resolving_power - 1))
+
+
+def resolution_edges(
+        lower: float, upper: float, resolving_power: float
+) -> np.ndarray:
+    """
+    Edges of wavelength bins with constant resolving power R, i.e. bins of
+    equal width in ln(lambda), covering the range [lower, upper].
+    """
+    log_step = resolution_log_step(resolving_power)
+    n_bins = int(np.ceil(np.log(upper / lower) / log_step))
+
+    return lower * np.exp(log_step * np.arange(n_bins + 1))
+
+
+def resolution_bin_ids(
+        wavelength: np.ndarray, resolving_power: float, reference: float = None
+) -> np.ndarray:
+    """
+    Assign each wavelength to a bin of constant resolution R. The bin edges
+    are spaced logarithmically, starting at the reference wavelength (by
+    default the first sample), such that lambda_central / lambda_span = R.
+    """
+    if reference is None:
+        reference = wavelength[0]
+
+    log_step = resolution_log_step(resolving_power)
+
+    # Distance from the reference is ascending for both sorting directions
+    log_distance = np.abs(np.log(wavelength / reference))
+    bin_number = int(log_distance.max() // log_step) + 1
+    log_edges = log_step * np.arange(bin_number + 1)
+
+    return np.searchsorted(log_edges, log_distance, side="right") - 1
+
+
+def edge_bin_ids(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """
+    Bin of every value for ascending bin edges (bins include their lower
+    edge, the last one also its upper edge). Values outside get id -1.
+    """
+    bin_ids = np.searchsorted(edges, values, side="right") - 1
+    bin_ids[values == edges[-1]] = edges.size - 2
+
+    return np.where((bin_ids >= 0) & (bin_ids < edges.size - 1), bin_ids, -1)
+
+
+def bin_id_average(data: np.ndarray, bin_ids: np.ndarray) -> np.ndarray:
+    """
+    Average all samples sharing the same bin id along the last axis. The
+    bin ids have to be monotonic, so that each bin is a contiguous slice
+    (only non-empty bins are returned).
+    """
+    # Start index and number of samples of each (non-empty) bin
+    bin_starts = np.flatnonzero(np.diff(bin_ids, prepend=bin_ids[0] - 1))
+    bin_counts = np.diff(np.append(bin_starts, bin_ids.shape[0]))
+
+    return np.add.reduceat(data, bin_starts, axis=-1) / bin_counts
+
+
+def bin_sums(
+        data: np.ndarray, bin_ids: np.ndarray, n_bins: int
+) -> np.ndarray:
+    """
+    Sum of the samples of every bin along the last axis, of shape
+    (..., n_bins). The bin ids do not need to be sorted.
+    """
+    data = np.asarray(data, dtype=float)
+    rows = data.reshape(-1, data.shape[-1])
+    inside = (bin_ids >= 0) & (bin_ids < n_bins)
+
+    # All rows at once, on a flattened (row x bin) grid
+    flat_ids = (
+        np.arange(rows.shape[0])[:, np.newaxis] * n_bins + bin_ids[inside]
+    )
+    sums = np.bincount(
+        flat_ids.ravel(), weights=rows[:, inside].ravel(),
+        minlength=rows.shape[0] * n_bins
+    )
+
+    return sums.reshape(*data.shape[:-1], n_bins)
+
+
+def bin_counts(bin_ids: np.ndarray, n_bins: int) -> np.ndarray:
+    """Number of samples in every bin."""
+    inside = (bin_ids >= 0) & (bin_ids < n_bins)
+
+    return np.bincount(bin_ids[inside], minlength=n_bins)
+
+
+def bin_mean(
+        data: np.ndarray, bin_ids: np.ndarray, n_bins: int
+) -> np.ndarray:
+    """Mean of the samples of every bin (NaN for empty bins)."""
+    counts = bin_counts(bin_ids, n_bins)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(
+            counts > 0, bin_sums(data, bin_ids, n_bins) / counts, np.nan
+        )
+
+
+def bin_weighted_mean(
+        data: np.ndarray, error: np.ndarray, bin_ids: np.ndarray, n_bins: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Inverse-variance weighted mean of every bin, and its error. Samples
+    without a finite value or error do not contribute.
+    """
+    valid = np.isfinite(data) & np.isfinite(error)
+    weights = np.where(valid, 1 / np.where(valid, error, 1) ** 2, 0)
+
+    weight_sum = bin_sums(weights, bin_ids, n_bins)
+    numerator = bin_sums(np.where(valid, data, 0) * weights, bin_ids, n_bins)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return numerator / weight_sum, 1 / np.sqrt(weight_sum)
+
+
+def bin_median(
+        data: np.ndarray, bin_ids: np.ndarray, n_bins: int
+) -> np.ndarray:
+    """
+    Median of the samples of every bin, ignoring NaN (NaN for empty bins).
+    All rows are sorted by (bin id, value) at once, after which every
+    median is read off at the middle of its bin.
+    """
+    data = np.asarray(data, dtype=float)
+    rows = data.reshape(-1, data.shape[-1])
+
+    inside = (bin_ids >= 0) & (bin_ids < n_bins)
+    bin_ids, rows = bin_ids[inside], rows[:, inside]
+
+    # NaN sort to the end of their bin, and are not counted
+    order = np.lexsort((rows, np.broadcast_to(bin_ids, rows.shape)), axis=-1)
+    ordered = np.take_along_axis(rows, order, axis=-1)
+    starts = np.searchsorted(np.sort(bin_ids), np.arange(n_bins))
+    counts = bin_sums(np.isfinite(rows), bin_ids, n_bins).astype(int)
+
+    # Middle sample(s) of every bin; empty bins read any sample, then NaN
+    last = max(rows.shape[1] - 1, 0)
+    lower = np.clip(starts + (counts - 1) // 2, 0, last)
+    upper = np.clip(starts + counts // 2, 0, last)
+    ordered = np.pad(ordered, [(0, 0), (0, rows.shape[1] == 0)])
+
+    medians = np.where(
+        counts > 0,
+        0.5 * (
+            np.take_along_axis(ordered, lower, axis=-1)
+            + np.take_along_axis(ordered, upper, axis=-1)
+        ),
+        np.nan
+    )
+
+    return medians.reshape(*data.shape[:-1], n_bins)
@@ -0,0 +1,235 @@
+import concurrent.futures as cf
+import os
+import pickle
+
+import matplotlib as mpl
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import matplotlib.figure as m_fig
+import matplotlib.pyplot as plt
+import numpy as np
+from PIL import Image
+
+# GLOBALS: file types that are encoded straight from an Agg pixel buffer,
+# and the rcParams (by prefix) that affect writing a figure to file
+RASTER_FORMATS = {"png", "jpg", "jpeg", "tif", "tiff", "webp"}
+RENDER_PARAMS = (
+    "savefig.", "pdf.", "svg.", "ps.", "agg.", "path.", "image.", "text.",
+    "mathtext."
+)
+
+
+class FigureExporter:
+    """
+    Render queue that saves figures in a process pool, so that several
+    formats and resolutions (and several figures) are rendered in parallel.
+
+    A snapshot of the figure is pickled when it is submitted, so the same
+    figure can be changed and submitted again right away (e.g. to toggle
+    layers). Raster files of the same resolution are rendered only once
+    with Agg and encoded into every requested format. Figures that cannot
+    be pickled are saved directly instead.
+
+    Usage:
+        with FigureExporter() as exporter:
+            exporter.submit(figure, ["plot.svg", "plot.pdf"])
+            exporter.submit(figure, "plot.png", dpi=600)
+    """
+    def __init__(self, processes: int = None) -> None:
+        self.pool = cf.ProcessPoolExecutor(
+            max_workers=processes, initializer=use_agg
+        )
+        self.futures = []
+        self.saved = []
+
+    def submit(
+            self,
+            figure: m_fig.Figure,
+            filenames: str | list[str],
+            dpi: float | str = None,
+            **savefig_kwargs
+    ) -> list[cf.Future]:
+        """Queue one figure for export into one or more files."""
+        if isinstance(filenames, str):
+            filenames = [filenames]
+
+        try:
+            figure_state = pickle.dumps(figure)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            for filename in filenames:
+                figure.savefig(filename, dpi=dpi, **savefig_kwargs)
+            self.saved.extend(filenames)
+
+            return []
+
+        render_params = {
+            key: value for key, value in mpl.rcParams.items()
+            if key.startswith(RENDER_PARAMS)
+        }
+
+        # Without extra savefig options (or cropping and transparency from
+        # the style), raster files share one rendering
+        if plain_raster_export(savefig_kwargs):
+            raster_files = [
+                filename for filename in filenames
+                if file_format(filename) in RASTER_FORMATS
+            ]
+        else:
+            raster_files = []
+
+        jobs = [
+            (render_raster, raster_files)
+        ] if raster_files else []
+        jobs += [
+            (render_savefig, [filename]) for filename in filenames
+            if filename not in raster_files
+        ]
+
+        futures = [
+            self.pool.submit(
+                function, figure_state, files, dpi, render_params,
+                savefig_kwargs
+            )
+            for function, files in jobs
+        ]
+        self.futures.extend(futures)
+
+        return futures
+
+    def close(self) -> list[str]:
+        """Wait for all queued exports, and return the saved file names."""
+        for future in self.futures:
+            self.saved.extend(future.result())
+
+        self.futures = []
+        self.pool.shutdown()
+
+        return self.saved
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.pool.shutdown(cancel_futures=True)
+
+        return None
+
+
+def export_figures(
+        figures: list[tuple[m_fig.Figure, str | list[str]]],
+        dpi: float | str = None,
+        processes: int = None
+) -> list[str]:
+    """Export (figure, filenames) pairs in parallel, and wait for them."""
+    exporter = FigureExporter(processes=processes)
+
+    for figure, filenames in figures:
+        exporter.submit(figure, filenames, dpi=dpi)
+
+    return exporter.close()
+
+
+def use_agg() -> None:
+    """Worker initializer: render without any GUI backend."""
+    mpl.use("Agg")
+
+    return None
+
+
+def plain_raster_export(savefig_kwargs: dict) -> bool:
+    """Check that 'savefig' would not crop or change the rendering."""
+    return (
+        not savefig_kwargs
+        and mpl.rcParams["savefig.bbox"] != "tight"
+        and not mpl.rcParams["savefig.transparent"]
+    )
+
+
+def file_format(filename: str) -> str:
+    """Lower-case file extension, e.g. 'png'."""
+    return os.path.splitext(filename)[1][1:].lower()
+
+
+def render_savefig(
+        figure_state: bytes,
+        filenames: list[str],
+        dpi: float | str,
+        render_params: dict,
+        savefig_kwargs: dict
+) -> list[str]:
+    """
+    Worker: save a pickled figure with 'savefig' (any format). The restored
+    figure is closed afterwards, so that the worker does not keep every
+    figure it rendered.
+    """
+    with mpl.rc_context(render_params):
+        figure = pickle.loads(figure_state)
+
+        try:
+            for filename in filenames:
+                figure.savefig(filename, dpi=dpi, **savefig_kwargs)
+        finally:
+            plt.close(figure)
+
+    return filenames
+
+
+def render_raster(
+        figure_state: bytes,
+        filenames: list[str],
+        dpi: float | str,
+        render_params: dict,
+        savefig_kwargs: dict
+) -> list[str]:
+    """
+    Worker (Agg fast path): draw a pickled figure once at the requested
+    resolution, and encode the pixel buffer into all raster files.
+    """
+    with mpl.rc_context(render_params):
+        figure = pickle.loads(figure_state)
+
+        try:
+            write_raster(figure, filenames, dpi)
+        finally:
+            plt.close(figure)
+
+    return filenames
+
+
+def write_raster(
+        figure: m_fig.Figure, filenames: list[str], dpi: float | str
+) -> None:
+    """
+    Draw a figure with Agg, and encode the pixel buffer into all files. The
+    canvas is created explicitly, since a restored figure that was not
+    made through pyplot only has a base canvas (without a pixel buffer).
+    """
+    # Resolution as 'savefig' resolves it
+    if dpi is None:
+        dpi = mpl.rcParams["savefig.dpi"]
+    if dpi == "figure":
+        dpi = figure.dpi
+
+    # Same background as 'savefig' would use
+    facecolor = mpl.rcParams["savefig.facecolor"]
+    if facecolor == "auto":
+        facecolor = figure.get_facecolor()
+
+    figure.set_dpi(dpi)
+    figure.patch.set_facecolor(facecolor)
+    canvas = FigureCanvasAgg(figure)
+    canvas.draw()
+    image = Image.fromarray(np.asarray(canvas.buffer_rgba()))
+
+    for filename in filenames:
+        # Formats without transparency get a white background
+        if file_format(filename) in {"jpg", "jpeg"}:
+            flat = Image.new("RGB", image.size, "white")
+            flat.paste(image, mask=image.getchannel("A"))
+            flat.save(filename, dpi=(dpi, dpi))
+        else:
+            image.save(filename, dpi=(dpi, dpi))
+
+    return None
@@ -0,0 +1,154 @@
+import numpy as np
+
+# Flux of a star while a planet disk covers part of it, for any array of
+# projected separations (in stellar radii). The overlap geometry is exact;
+# limb darkening is integrated numerically over rings of the stellar disk.
+# Used by the transit model of 'transit_lightcurves' and the transit-cord
+# animation.
+
+# numexpr is optional; it evaluates the overlap geometry multi-threaded and
+# without temporary arrays, which helps for large (channel x time) grids
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+# GLOBALS: default quadratic limb-darkening coefficients (roughly a Sun-like
+# star in the optical), number of radial rings and in-transit points per
+# chunk of the limb-darkening integration
+LIMB_DARKENING = (0.4, 0.25)
+N_RINGS = 50
+CHUNK_SIZE = 20_000
+
+# Partial overlap area of a circle of radius R and a planet disk of radius p
+# at distance z (valid for |R - p| < z < R + p), for numexpr (see
+# 'partial_overlap' for the NumPy version). Arguments are clipped to their
+# valid range, since rounding pushes them over at the points of tangency.
+CLIPPED = "where({0} > 1, 1, where({0} < -1, -1, {0}))"
+PARTIAL_OVERLAP = (
+    "R**2 * arccos({0}) + p**2 * arccos({1})"
+    " - 0.5 * sqrt(where({2} > 0, {2}, 0))"
+).format(
+    CLIPPED.format("(z**2 + R**2 - p**2) / (2 * z * R)"),
+    CLIPPED.format("(z**2 + p**2 - R**2) / (2 * z * p)"),
+    "(-z + R + p) * (z + R - p) * (z - R + p) * (z + R + p)"
+)
+
+
+def overlap_area(
+        radius: np.ndarray, radius_ratio: np.ndarray, separation: np.ndarray
+) -> np.ndarray:
+    """
+    Area of overlap of a circle (radius R, centred on the star) and the
+    planet disk (radius p, at separation z), broadcast over all inputs:
+    the full smaller disk, no overlap, or the lens-shaped area of two
+    intersecting circles.
+    """
+    radius, radius_ratio, separation = np.broadcast_arrays(
+        radius, radius_ratio, separation
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if numexpr is not None:
+            partial = numexpr.evaluate(PARTIAL_OVERLAP, local_dict={
+                "R": radius, "p": radius_ratio, "z": separation
+            })
+        else:
+            partial = partial_overlap(radius, radius_ratio, separation)
+
+    # No overlap, or the smaller disk lies fully inside the larger one
+    return np.where(
+        separation >= radius + radius_ratio, 0.,
+        np.where(
+            separation <= abs(radius - radius_ratio),
+            np.pi * np.minimum(radius, radius_ratio) ** 2,
+            np.maximum(partial, 0)
+        )
+    )
+
+
+def partial_overlap(
+        radius: np.ndarray, radius_ratio: np.ndarray, separation: np.ndarray
+) -> np.ndarray:
+    """NumPy version of 'PARTIAL_OVERLAP' (lens-shaped overlap area)."""
+    radius_sq, ratio_sq, separation_sq = (
+        radius ** 2, radius_ratio ** 2, separation ** 2
+    )
+    star_angle = np.arccos(np.clip(
+        (separation_sq + radius_sq - ratio_sq) / (2 * separation * radius),
+        -1, 1
+    ))
+    planet_angle = np.arccos(np.clip(
+        (separation_sq + ratio_sq - radius_sq)
+        / (2 * separation * radius_ratio),
+        -1, 1
+    ))
+    kite = np.clip(
+        (-separation + radius + radius_ratio)
+        * (separation + radius - radius_ratio)
+        * (separation - radius + radius_ratio)
+        * (separation + radius + radius_ratio),
+        0, None
+    )
+
+    return (
+        radius_sq * star_angle + ratio_sq * planet_angle
+        - 0.5 * np.sqrt(kite)
+    )
+
+
+def uniform_flux(
+        separation: np.ndarray, radius_ratio: float | np.ndarray
+) -> np.ndarray:
+    """Transit of a uniform stellar disk (covered fraction of its area)."""
+    return 1 - overlap_area(1., radius_ratio, separation) / np.pi
+
+
+def quadratic_flux(
+        separation: np.ndarray,
+        radius_ratio: float | np.ndarray,
+        u1: float | np.ndarray,
+        u2: float | np.ndarray,
+        n_rings: int = N_RINGS
+) -> np.ndarray:
+    """
+    Transit of a quadratically limb-darkened star. The stellar disk is cut
+    into rings of constant intensity, and each ring loses the area that
+    the planet covers of it (the difference of the uniform overlap areas
+    at its edges). This is a numerical integration over the rings, not an
+    analytic solution; its accuracy is set by 'n_rings'.
+
+    Only the rings between |z - p| and z + p can be covered, so the rings
+    of every point are spread over that range only. In-transit points are
+    integrated in chunks, to keep the (point x ring) arrays small.
+    """
+    separation, radius_ratio, u1, u2 = np.broadcast_arrays(
+        separation, radius_ratio, u1, u2
+    )
+    flux = np.ones(separation.shape)
+
+    in_transit = np.flatnonzero(separation < 1 + radius_ratio)
+    for start in range(0, in_transit.size, CHUNK_SIZE):
+        points = np.unravel_index(
+            in_transit[start:start + CHUNK_SIZE], separation.shape
+        )
+        z = separation[points][:, np.newaxis]
+        p = radius_ratio[points][:, np.newaxis]
+
+        # Ring edges over the covered range, and the intensity in between
+        inner = np.maximum(z - p, 0)
+        outer = np.minimum(z + p, 1)
+        edges = inner + (outer - inner) * np.linspace(0, 1, n_rings + 1)
+        mu = np.sqrt(1 - (0.5 * (edges[:, 1:] + edges[:, :-1])) ** 2)
+        intensity = (
+            1 - u1[points][:, np.newaxis] * (1 - mu)
+            - u2[points][:, np.newaxis] * (1 - mu) ** 2
+        )
+        covered = np.diff(overlap_area(edges, p, z), axis=-1)
+
+        # Relative to the total flux of the limb-darkened disk
+        flux[points] = 1 - (intensity * covered).sum(axis=-1) / (
+            np.pi * (1 - u1[points] / 3 - u2[points] / 6)
+        )
+
+    return flux
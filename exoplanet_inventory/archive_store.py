@@ -0,0 +1,243 @@
+import datetime
+import hashlib
+import json
+import os
+
+import astropy.io.votable as votable
+import polars as pl
+import pyvo
+
+# GLOBALS
+TAP_RESOURCE = "https://exoplanetarchive.ipac.caltech.edu/TAP"
+STORE_DIRECTORY = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "archive_store"
+)
+
+# Superset of 'ps' columns used by the inventory plots (and the transit cord
+# sketches), together with the types they are stored as
+ARCHIVE_SCHEMA = {
+    "pl_name": pl.Utf8,
+    "hostname": pl.Utf8,
+    "disc_year": pl.Int32,
+    "discoverymethod": pl.Utf8,
+    "pl_orbper": pl.Float64,
+    "pl_orbsmax": pl.Float64,
+    "pl_rade": pl.Float64,
+    "pl_masse": pl.Float64,
+    "pl_orbeccen": pl.Float64,
+    "pl_orbincl": pl.Float64,
+    "pl_orblper": pl.Float64,
+    "pl_imppar": pl.Float64,
+    "pl_projobliq": pl.Float64,
+    "pl_trandur": pl.Float64,
+    "pl_eqt": pl.Float64,
+    "st_rad": pl.Float64,
+    "st_teff": pl.Float64,
+    "rowupdate": pl.Date,
+    "releasedate": pl.Date,
+}
+
+
+def update_snapshot(
+        tap_service: pyvo.dal.TAPService = None,
+        incremental: bool = False
+) -> str:
+    """
+    Query all default parameter sets from the 'ps' table and save them as a
+    dated Parquet snapshot, which is recorded in the store index.
+
+    In incremental mode, only rows updated or released since the last sync
+    are queried and merged into the latest snapshot by 'pl_name'. (Planets
+    that lose their default parameter set entirely are only dropped by a
+    full update.)
+    """
+    if tap_service is None:
+        tap_service = pyvo.dal.TAPService(TAP_RESOURCE)
+
+    query = (
+        f"SELECT {', '.join(ARCHIVE_SCHEMA.keys())} "
+        "FROM ps "
+        "WHERE default_flag = 1"
+    )
+
+    # Without an earlier snapshot, there is nothing to update incrementally
+    snapshots = read_index()["snapshots"]
+    if not incremental or not snapshots:
+        snapshot = typed_frame(pl.from_pandas(
+            tap_service.search(query).to_table().to_pandas()
+        ))
+
+        return write_snapshot(snapshot, last_sync=latest_update(snapshot))
+
+    # Fetch only rows that changed since the last sync (same day inclusive)
+    latest = max(snapshots, key=lambda entry: entry["queried"])
+    last_sync = latest.get("last_sync", latest["queried"])
+    delta = typed_frame(pl.from_pandas(
+        tap_service.search(
+            f"{query} "
+            f"AND (rowupdate >= '{last_sync}' OR releasedate >= '{last_sync}')"
+        ).to_table().to_pandas()
+    ))
+
+    # Replace changed planets and append new ones
+    snapshot = pl.read_parquet(latest_snapshot())
+    merged = pl.concat([
+        snapshot.join(delta, on="pl_name", how="anti"), delta
+    ])
+
+    # Record which planets were added or updated
+    known_names = set(snapshot["pl_name"])
+    write_changelog({
+        "date": datetime.datetime.now().strftime("%Y-%m-%d"),
+        "since": last_sync,
+        "added": [name for name in delta["pl_name"] if name not in known_names],
+        "updated": [name for name in delta["pl_name"] if name in known_names],
+    })
+
+    return write_snapshot(
+        merged, last_sync=latest_update(merged) or last_sync
+    )
+
+
+def latest_update(snapshot: pl.DataFrame) -> str | None:
+    """Most recent row update or release date in a snapshot."""
+    dates = [
+        snapshot[column].max() for column in ["rowupdate", "releasedate"]
+    ]
+    dates = [date for date in dates if date is not None]
+
+    return max(dates).strftime("%Y-%m-%d") if dates else None
+
+
+def typed_frame(frame: pl.DataFrame) -> pl.DataFrame:
+    """Cast a query result to the column types of the store."""
+    columns = []
+    for name, dtype in ARCHIVE_SCHEMA.items():
+        column = pl.col(name)
+
+        # Dates arrive as strings from the archive
+        if dtype == pl.Date and frame.schema[name] != pl.Date:
+            column = column.cast(pl.Utf8).str.slice(0, 10).str.to_date(
+                "%Y-%m-%d", strict=False
+            )
+
+        columns.append(column.cast(dtype))
+
+    return frame.select(columns)
+
+
+def write_snapshot(snapshot: pl.DataFrame, last_sync: str = None) -> str:
+    """Save a snapshot under today's date and add it to the index."""
+    os.makedirs(STORE_DIRECTORY, exist_ok=True)
+
+    today = datetime.datetime.now().strftime("%Y-%m-%d")
+    filename = f"ps_{today}.parquet"
+    snapshot.write_parquet(
+        os.path.join(STORE_DIRECTORY, filename), compression="zstd"
+    )
+
+    # A second snapshot on the same day replaces the first
+    index = read_index()
+    index["snapshots"] = [
+        entry for entry in index["snapshots"] if entry["file"] != filename
+    ]
+    index["snapshots"].append({
+        "file": filename,
+        "queried": today,
+        "last_sync": last_sync or today,
+        "rows": snapshot.shape[0],
+        "columns": snapshot.columns,
+    })
+    write_index(index)
+
+    return os.path.join(STORE_DIRECTORY, filename)
+
+
+def latest_snapshot() -> str:
+    """Path of the most recent snapshot in the store."""
+    snapshots = read_index()["snapshots"]
+
+    if not snapshots:
+        raise FileNotFoundError(
+            f"No exoplanet archive snapshot in '{STORE_DIRECTORY}'"
+        )
+
+    latest = max(snapshots, key=lambda entry: entry["queried"])
+
+    return os.path.join(STORE_DIRECTORY, latest["file"])
+
+
+def scan_snapshot(columns: list[str], filename: str = None) -> pl.LazyFrame:
+    """
+    Lazily scan a snapshot (by default the latest one), so that only the
+    requested columns are read from disk.
+    """
+    if filename is None:
+        filename = latest_snapshot()
+
+    return pl.scan_parquet(filename).select(columns)
+
+
+def read_index() -> dict:
+    """Metadata index of all snapshots in the store."""
+    index_file = os.path.join(STORE_DIRECTORY, "index.json")
+
+    if not os.path.isfile(index_file):
+        return {"snapshots": []}
+
+    with open(index_file) as f:
+        return json.load(f)
+
+
+def write_index(index: dict) -> None:
+    os.makedirs(STORE_DIRECTORY, exist_ok=True)
+
+    with open(os.path.join(STORE_DIRECTORY, "index.json"), "w") as f:
+        json.dump(index, f, indent=2)
+
+    return None
+
+
+def write_changelog(change: dict) -> None:
+    """Append an incremental change to the changelog of the store."""
+    os.makedirs(STORE_DIRECTORY, exist_ok=True)
+
+    with open(os.path.join(STORE_DIRECTORY, "changelog.jsonl"), "a") as f:
+        f.write(json.dumps(change) + "\n")
+
+    return None
+
+
+class RecordedTAPService:
+    """
+    Stand-in for a TAP service that answers queries with recorded VOTable
+    responses from a directory, e.g. to run updates offline or in tests.
+    If a live service is given, unknown queries are forwarded to it and
+    their responses are recorded.
+    """
+    def __init__(
+            self, directory: str,
+            live_service: pyvo.dal.TAPService = None
+    ) -> None:
+        self.directory = directory
+        self.live_service = live_service
+
+    def response_file(self, query: str) -> str:
+        # Queries are matched independent of their whitespace
+        digest = hashlib.sha256(" ".join(query.split()).encode("utf-8"))
+
+        return os.path.join(self.directory, f"{digest.hexdigest()[:16]}.xml")
+
+    def search(self, query: str) -> pyvo.dal.TAPResults:
+        response_file = self.response_file(query)
+
+        if not os.path.isfile(response_file):
+            if self.live_service is None:
+                raise FileNotFoundError(
+                    f"No recorded response for query: {query}"
+                )
+
+            os.makedirs(self.directory, exist_ok=True)
+            self.live_service.search(query).votable.to_xml(response_file)
+
+        return pyvo.dal.TAPResults(votable.parse(response_file))
@@ -0,0 +1,138 @@
+import matplotlib.colors as colors
+import matplotlib.pyplot as plt
+import numpy as np
+
+# GLOBALS: point counts above which a scatter is rasterized (inside vector
+# output), or replaced by a log-log density image
+RASTER_THRESHOLD = 2_000
+DENSITY_THRESHOLD = 50_000
+DENSITY_BINS = 150
+
+
+def density_scatter(
+        axis: plt.Axes,
+        x_array: np.ndarray,
+        y_array: np.ndarray,
+        mode: str = "auto",
+        bins: int = DENSITY_BINS,
+        **kwargs
+):
+    """
+    Scatter plot that stays small and fast to render for many points.
+    Depending on the number of points ('auto'), this is
+
+        - "scatter": a plain scatter plot (every point a vector marker),
+        - "raster": a scatter plot rasterized into vector output (PDF/SVG),
+        - "density": a 2-D histogram on log-log bins, drawn as a single
+          rasterized mesh in the given colour, with the bin counts as
+          opacity (empty bins stay transparent).
+
+    :param axis:        Axis-object to draw onto (log-log for "density")
+    :param x_array:     x-values (array, polars Series or masked column)
+    :param y_array:     y-values
+    :param mode:        "auto", "scatter", "raster" or "density"
+    :param bins:        Number of log-spaced bins per axis for "density"
+    :param kwargs:      Passed on to 'axis.scatter' (colour, alpha, label,
+                        zorder also apply to the density image)
+
+    :return:
+        Drawn artist
+    """
+    x_array = np.ma.filled(np.ma.asarray(x_array, dtype=float), np.nan)
+    y_array = np.ma.filled(np.ma.asarray(y_array, dtype=float), np.nan)
+
+    if mode == "auto":
+        mode = select_mode(x_array.size, kwargs.get("c", kwargs.get("color")))
+
+    if mode == "scatter":
+        return axis.scatter(x_array, y_array, **kwargs)
+
+    elif mode == "raster":
+        return axis.scatter(x_array, y_array, rasterized=True, **kwargs)
+
+    elif mode == "density":
+        return density_image(axis, x_array, y_array, bins=bins, **kwargs)
+
+    raise ValueError(f"Unknown scatter mode '{mode}'")
+
+
+def select_mode(n_points: int, colour=None) -> str:
+    """Rendering mode from the number of points."""
+    if n_points <= RASTER_THRESHOLD:
+        return "scatter"
+
+    # A density image needs a single colour (not one per point)
+    if n_points <= DENSITY_THRESHOLD or not single_colour(colour):
+        return "raster"
+
+    return "density"
+
+
+def single_colour(colour) -> bool:
+    return colour is None or (
+        isinstance(colour, (str, tuple)) and colors.is_color_like(colour)
+    )
+
+
+def density_image(
+        axis: plt.Axes,
+        x_array: np.ndarray,
+        y_array: np.ndarray,
+        bins: int = DENSITY_BINS,
+        **kwargs
+):
+    """
+    Log-log 2-D histogram of the points, as a rasterized mesh. Like many
+    overlapping translucent markers, a bin with a single point has the
+    given alpha, and the densest bin is opaque. A marker without data
+    carries the label for legends.
+    """
+    colour = kwargs.pop("c", kwargs.pop("color", "C0"))
+    alpha = kwargs.pop("alpha", 1.)
+    label = kwargs.pop("label", None)
+    zorder = kwargs.pop("zorder", None)
+
+    # Only points that can be shown on logarithmic axes
+    valid = (
+        np.isfinite(x_array) & np.isfinite(y_array)
+        & (x_array > 0) & (y_array > 0)
+    )
+    x_array, y_array = x_array[valid], y_array[valid]
+
+    counts, x_edges, y_edges = np.histogram2d(
+        x_array, y_array,
+        bins=[log_edges(x_array, bins), log_edges(y_array, bins)]
+    )
+
+    # Bins scale from translucent to opaque with the logarithm of counts
+    red, green, blue, _ = colors.to_rgba(colour)
+    fade_map = colors.LinearSegmentedColormap.from_list(
+        "density_fade", [(red, green, blue, alpha), (red, green, blue, 1.)]
+    )
+    mesh = axis.pcolormesh(
+        x_edges, y_edges, np.ma.masked_equal(counts, 0).T,
+        cmap=fade_map, norm=colors.LogNorm(vmin=1), shading="flat",
+        rasterized=True, zorder=zorder
+    )
+
+    # Legend proxy, in the style of the scatter markers
+    axis.scatter(
+        [], [], color=colour, alpha=alpha, label=label, zorder=zorder,
+        **kwargs
+    )
+
+    return mesh
+
+
+def log_edges(values: np.ndarray, bins: int) -> np.ndarray:
+    """Logarithmically spaced bin edges covering all (positive) values."""
+    if values.size == 0:
+        return np.logspace(0, 1, bins + 1)
+
+    lower, upper = np.log10(values.min()), np.log10(values.max())
+
+    # Widen degenerate ranges (a single distinct value)
+    if upper - lower < 1e-6:
+        lower, upper = lower - 0.5, upper + 0.5
+
+    return np.logspace(lower, upper, bins + 1)
@@ -1,7 +1,18 @@
 import argparse
+import os
+import sys
 
 import utils as u
 
+# Shared figure export lives in 'common' at the top of the repository
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__)
+    ))),
+    "common"
+))
+import figure_export  # noqa: E402
+
 
 def main() -> None:
     # Argument parser
@@ -9,7 +20,7 @@ def main() -> None:
 
     # Update data file only if requested
     if args.update:
-        u.update_exoplanet_parameters()
+        u.update_exoplanet_parameters(incremental=args.incremental)
 
     # Instantiate the plotting frame(s)
     fig, ax = u.set_discovery_figure(space_missions=args.spacemissions)
@@ -23,8 +34,6 @@ def main() -> None:
     # Fill in the discovery plot and save figure
     u.fill_discovery_plot(axis=ax, cumulative_data=cumulative_discoveries)
     fig.tight_layout()
-    fig.savefig("cumulative_exoplanet_discoveries.svg")
-    fig.savefig("cumulative_exoplanet_discoveries.pdf")
 
     # Do this (quick and dirty) for alternative figure as well
     import matplotlib.pyplot as plt
@@ -51,7 +60,14 @@ def main() -> None:
     )
     ax_alt.legend()
 
-    fig_alt.savefig("individual_exoplanet_discoveries.pdf")
+    # Render all files in parallel
+    figure_export.export_figures([
+        (fig, [
+            "cumulative_exoplanet_discoveries.svg",
+            "cumulative_exoplanet_discoveries.pdf"
+        ]),
+        (fig_alt, "individual_exoplanet_discoveries.pdf")
+    ])
 
 
 def argument_parser() -> argparse.ArgumentParser:
@@ -71,13 +87,24 @@ def argument_parser() -> argparse.ArgumentParser:
         action=argparse.BooleanOptionalAction
     )
 
+    # Add boolean incremental update argument (only fetch changed rows)
+    parser.add_argument(
+        "-i", "--incremental",
+        action=argparse.BooleanOptionalAction
+    )
+
     # Add boolean "space mission" argument
     parser.add_argument(
         "-sm", "--spacemissions",
         action=argparse.BooleanOptionalAction
     )
 
-    return parser.parse_args()
+    # '--incremental' only changes how '--update' fetches the data
+    args = parser.parse_args()
+    if args.incremental and not args.update:
+        parser.error("--incremental requires --update")
+
+    return args
 
 
 if __name__ == "__main__":
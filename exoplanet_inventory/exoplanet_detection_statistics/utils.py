@@ -1,11 +1,14 @@
-import datetime
+import os
+import sys
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 import matplotlib.ticker as ticks
 import numpy as np
-import pandas as pd
 import polars as pl
-import pyvo
+
+# Shared archive store lives one level up, in 'exoplanet_inventory'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import archive_store  # noqa: E402
 
 # GLOBAL: COLOUR-WHEEL FOR BAR-CHART
 COLOURMAP = [
@@ -17,6 +20,12 @@ COLOURMAP = [
 def cumulative_discovery_data(
         ascending_discovery_frame: pl.DataFrame
         ) -> dict:
+    # Planets without discovery year or method cannot be counted (and a
+    # missing method would end up among the method names)
+    ascending_discovery_frame = ascending_discovery_frame.drop_nulls(
+        subset=["disc_year", "discoverymethod"]
+    )
+
     # Determine years counted for discoveries
     discovery_years = np.arange(
         ascending_discovery_frame["disc_year"].min(),
@@ -70,6 +79,34 @@ def fill_discovery_plot(axis: plt.Axes, cumulative_data: dict) -> None:
     axis.set(ylim=(6e-1, 1e4))
 
 
+def cumulative_count_matrix(
+        years: np.ndarray[int],
+        methods: np.ndarray[str],
+        dataframe: pl.DataFrame
+        ) -> np.ndarray:
+    """
+    Dense (years x methods) matrix of cumulative discovery counts, built
+    from a single group-by over discovery year and method.
+    """
+    # Count discoveries per (year, method) pair in one pass
+    counts = dataframe.drop_nulls(
+        subset=["disc_year", "discoverymethod"]
+    ).group_by(["disc_year", "discoverymethod"]).len()
+
+    # Map years and methods onto matrix indices
+    year_idx = np.searchsorted(years, counts["disc_year"].to_numpy())
+    method_order = np.argsort(methods)
+    method_idx = method_order[np.searchsorted(
+        methods, counts["discoverymethod"].to_numpy(), sorter=method_order
+    )]
+
+    # Scatter counts into the matrix and accumulate along the year-axis
+    count_matrix = np.zeros((years.shape[0], methods.shape[0]), dtype=int)
+    np.add.at(count_matrix, (year_idx, method_idx), counts["len"].to_numpy())
+
+    return np.cumsum(count_matrix, axis=0)
+
+
 def method_dictionary(
         years: np.ndarray[int],
         methods: np.ndarray[str],
@@ -78,22 +115,14 @@ def method_dictionary(
     # Instantiate result dictionary with list of years
     result_dictionary = {"year": years, "method_names": methods}
 
-    # Create keys for each method
-    for method in methods:
-        result_dictionary[method] = []
-
-    # Loop over all counted years
-    for year in years:
-        subframe = dataframe.filter(pl.col("disc_year") <= year)
-
-        # Loop over each method and append array-shape (= number of planets)
-        for method in methods:
-            method_frame = subframe.filter(pl.col("discoverymethod") == method)
-            result_dictionary[method].append(method_frame.shape[0])
+    # Cumulative counts for all years and methods at once
+    count_matrix = cumulative_count_matrix(
+        years=years, methods=methods, dataframe=dataframe
+    )
 
-    # Make all listts into numpy arrays
-    for method in methods:
-        result_dictionary[method] = np.array(result_dictionary[method])
+    # Dictionary view onto the matrix columns, one key per method
+    for method_idx, method in enumerate(methods):
+        result_dictionary[method] = count_matrix[:, method_idx]
 
     return result_dictionary
 
@@ -112,9 +141,18 @@ def plot_spacemission_indicator(
 
 
 def read_exoplanet_parameters() -> pl.DataFrame:
-    # Read epa file as polars data frame
-    filename = "nasa_epa_fulldata.csv"
-    exoplanet_data = pl.read_csv(filename)
+    # Scan the latest archive snapshot, reading only the needed columns
+    try:
+        exoplanet_data = archive_store.scan_snapshot(
+            columns=[
+                "pl_name", "disc_year", "discoverymethod",
+                "pl_rade", "pl_orbper"
+            ]
+        ).collect()
+
+    # Fall back to the (legacy) epa file if there is no snapshot yet
+    except FileNotFoundError:
+        exoplanet_data = pl.read_csv("nasa_epa_fulldata.csv")
 
     return exoplanet_data
 
@@ -162,29 +200,8 @@ def set_discovery_figure_alt(
     return figure, axis
 
 
-def update_exoplanet_parameters() -> None:
-    # Set the NASA Exoplanet Archive as the TAP ressource
-    tap_resource = "https://exoplanetarchive.ipac.caltech.edu/TAP"
-    tap_service = pyvo.dal.TAPService(tap_resource)
-
-    # Convert search result immediately to pandas DataFrame
-    search_result = pd.DataFrame(
-        tap_service.search(
-            "SELECT pl_name, disc_year, discoverymethod, pl_rade, pl_orbper "
-            "FROM ps "
-            "WHERE default_flag = 1 "
-            # "AND pl_controv_flag != 1"
-        )
-    )
-
-    # Save a mark with current day for posterity
-    today = datetime.datetime.now().strftime("%Y-%m-%d")
-    with open("marker_file.txt", "w") as marker_file:
-        marker_file.write(
-            f"Exoplanet data in 'nasa_epa_fulldata.csv' was queried on {today}"
-        )
-
-    # Save search result as csv-file
-    search_result.to_csv("nasa_epa_fulldata.csv")
+def update_exoplanet_parameters(incremental: bool = False) -> None:
+    # Save a new snapshot of the NASA Exoplanet Archive to the shared store
+    archive_store.update_snapshot(incremental=incremental)
 
     return None
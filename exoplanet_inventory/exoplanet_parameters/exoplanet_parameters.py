@@ -1,8 +1,20 @@
 import argparse
+import os
+import sys
+
 import polars as pl
 
 import util
 
+# Shared figure export lives in 'common' at the top of the repository
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__)
+    ))),
+    "common"
+))
+import figure_export  # noqa: E402
+
 
 COLOURMAP = [
         "tab:red", "tab:orange", "gold", "tab:green", "skyblue", "tab:blue",
@@ -15,7 +27,7 @@ def main():
 
     # Check if EPA data should be updated
     if arguments.update:
-        util.update_exoplanet_parameters()
+        util.update_exoplanet_parameters(incremental=arguments.incremental)
 
     # Read EPA data
     epa_data, sorting = util.read_exoplanet_parameters()
@@ -59,7 +71,7 @@ def main():
         )
     ax[1].set(xlabel="$P$ [d]", ylabel="$M_\\mathrm{p}$ [M$_\\oplus$]")
 
-    fig.savefig("period-radius_period-mass.pdf")
+    figure_export.export_figures([(fig, "period-radius_period-mass.pdf")])
 
 
 def argument_parser() -> argparse.Namespace:
@@ -79,13 +91,24 @@ def argument_parser() -> argparse.Namespace:
         action=argparse.BooleanOptionalAction
     )
 
+    # Add boolean incremental update argument (only fetch changed rows)
+    parser.add_argument(
+        "-i", "--incremental",
+        action=argparse.BooleanOptionalAction
+    )
+
     # Add boolean "space mission" argument
     parser.add_argument(
         "-sm", "--spacemissions",
         action=argparse.BooleanOptionalAction
     )
 
-    return parser.parse_args()
+    # '--incremental' only changes how '--update' fetches the data
+    arguments = parser.parse_args()
+    if arguments.incremental and not arguments.update:
+        parser.error("--incremental requires --update")
+
+    return arguments
 
 
 if __name__ == "__main__":
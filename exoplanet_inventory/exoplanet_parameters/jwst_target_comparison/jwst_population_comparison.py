@@ -1,15 +1,43 @@
+import os
+import sys
+
 import matplotlib.pyplot as plt
 import numpy as np
 import polars as pl
 import pyvo
 
+# Shared plotting helpers live in 'exoplanet_inventory', and the shared
+# figure export in 'common' at the top of the repository
+INVENTORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)
+)))
+sys.path.append(INVENTORY_DIRECTORY)
+sys.path.append(os.path.join(
+    os.path.dirname(INVENTORY_DIRECTORY), "common"
+))
+import density_scatter  # noqa: E402
+import figure_export  # noqa: E402
+
+
+# GLOBALS: progressive-reveal images, with the layers shown in each of them
+LAYER_STACKS = {
+    "exoplanets_solarsystem.png": ["solar_system"],
+    "exoplanets_solarsystem+all.png": ["all_exoplanets", "solar_system"],
+    "exoplanets_solarsystem+all+jwst.png": [
+        "jwst_targets", "all_exoplanets", "solar_system"
+    ],
+    "exoplanets_solarsystem+all+jwst+w39b.png": [
+        "wasp39b", "jwst_targets", "all_exoplanets", "solar_system"
+    ],
+}
+
 
 def main():
     # Auxiliary: Read Solar System data sheet
     solarsystem: pl.DataFrame = pl.read_csv("solar_system.csv")
 
     # Self-compiled: Read information for JWST C1 - C3
-    namestring = ""
+    target_names = []
 
     for i in range(1, 4):
         query = pl.read_csv(f"jtp_c{i}.csv")
@@ -17,13 +45,13 @@ def main():
         # Possible: Filter by specific parameters
         # query = query.filter(pl.col("Type") == "Eclipse")
 
-        for element in query["Target Name"].to_numpy():
-            namestring += f"'{element}',"
-    
-    print(len(np.unique(namestring.split(","))))
-    # Remove the last, redundant "," in 'namestring'
-    namestring = np.array(namestring[:-1])
-    exit()
+        target_names.extend(query["Target Name"].to_list())
+
+    # Every target only once, as (escaped) ADQL string literals
+    namestring = ", ".join(
+        "'" + name.replace("'", "''") + "'"
+        for name in dict.fromkeys(target_names)
+    )
 
     # Exoplanet Archive as TAP query source
     tap_source = "https://exoplanetarchive.ipac.caltech.edu/TAP"
@@ -47,50 +75,73 @@ def main():
         jwst_targets=jwst_table, solar_system_data=solarsystem
     )
 
-    # ITERATIVE PLOTS (I MUST BE ABLE TO AUTOMATE THIS!?)
-    # Solar System only
+    # Every layer is drawn only once, in legend order
     fig, ax = exoplanet_pop_figure_set()
-    ax = plot_solar_system(axis=ax, solar_system=solarsystem)
+    layers = {
+        "wasp39b": draw_layer(
+            ax, plot_wasp39b, jwst_target_data=jwst_table,
+            planet_idx=w39b_idx
+        ),
+        "jwst_targets": draw_layer(
+            ax, plot_jwst_targets, jwst_targets=jwst_table
+        ),
+        "all_exoplanets": draw_layer(
+            ax, plot_all_exoplanets, all_planets_table=full_table
+        ),
+        "solar_system": draw_layer(
+            ax, plot_solar_system, solar_system=solarsystem
+        ),
+    }
     ax.set(xlim=xlims, ylim=ylims)
-    ax.legend(loc="lower right")
     fig.tight_layout()
-    fig.savefig("exoplanets_solarsystem.png", dpi=600)
-    plt.close(fig)
 
-    # Solar System + known exoplanets
-    fig, ax = exoplanet_pop_figure_set()
-    ax = plot_all_exoplanets(axis=ax, all_planets_table=full_table)
-    ax = plot_solar_system(axis=ax, solar_system=solarsystem)
-    ax.set(xlim=xlims, ylim=ylims)
-    ax.legend(loc="lower right")
-    fig.tight_layout()
-    fig.savefig("exoplanets_solarsystem+all.png", dpi=600)
+    # Progressive reveal: only toggle which layers are visible
+    save_layer_stacks(fig, ax, layers, LAYER_STACKS)
     plt.close(fig)
 
-    # Solar System + known exoplanets + JWST targets + WASP-39
-    fig, ax = exoplanet_pop_figure_set()
-    ax = plot_jwst_targets(axis=ax, jwst_targets=jwst_table)
-    ax = plot_all_exoplanets(axis=ax, all_planets_table=full_table)
-    ax = plot_solar_system(axis=ax, solar_system=solarsystem)
-    ax.set(xlim=xlims, ylim=ylims)
-    ax.legend(loc="lower right")
-    fig.tight_layout()
-    plt.savefig("exoplanets_solarsystem+all+jwst.png", dpi=600)
-    plt.close(fig)
+    return None
+
+
+def draw_layer(axis: plt.Axes, plot_function, **kwargs) -> list:
+    """Draw one layer and return the artists it added to the axis."""
+    existing = set(axis.get_children())
+    plot_function(axis=axis, **kwargs)
+
+    return [
+        artist for artist in axis.get_children() if artist not in existing
+    ]
 
-    # Solar System + known exoplanets + JWST targets + WASP-39
-    fig, ax = exoplanet_pop_figure_set()
-    ax = plot_wasp39b(
-        axis=ax, jwst_target_data=jwst_table, planet_idx=w39b_idx
-    )
-    ax = plot_jwst_targets(axis=ax, jwst_targets=jwst_table)
-    ax = plot_all_exoplanets(axis=ax, all_planets_table=full_table)
-    ax = plot_solar_system(axis=ax, solar_system=solarsystem)
-    ax.set(xlim=xlims, ylim=ylims)
-    ax.legend(loc="lower right")
-    fig.tight_layout()
-    plt.savefig("exoplanets_solarsystem+all+jwst+w39b.png", dpi=600)
-    plt.close(fig)
+
+def save_layer_stacks(
+        figure: plt.Figure,
+        axis: plt.Axes,
+        layers: dict[str, list],
+        stacks: dict[str, list[str]],
+        dpi: int = 600
+        ) -> None:
+    """
+    Save one image per stack of layers. Layers are switched on and off
+    (not redrawn), and the legend only lists the visible layers. Every
+    state of the figure is queued for export, so that all images are
+    rendered in parallel.
+    """
+    handles, labels = axis.get_legend_handles_labels()
+    exporter = figure_export.FigureExporter()
+
+    for filename, visible_layers in stacks.items():
+        for name, artists in layers.items():
+            for artist in artists:
+                artist.set_visible(name in visible_layers)
+
+        visible = [
+            (handle, label) for handle, label in zip(handles, labels)
+            if handle.get_visible()
+        ]
+        axis.legend(*zip(*visible), loc="lower right")
+
+        exporter.submit(figure, filename, dpi=dpi)
+
+    exporter.close()
 
     return None
 
@@ -114,20 +165,31 @@ def make_plot_limits(
         jwst_targets: pl.DataFrame,
         solar_system_data: pl.DataFrame
         ) -> tuple:
-    temporary_figure, temporary_axis = exoplanet_pop_figure_set()
-
-    axis = plot_jwst_targets(axis=temporary_axis, jwst_targets=jwst_targets)
-    axis = plot_solar_system(
-        axis=temporary_axis, solar_system=solar_system_data
-        )
-    axis.set(yscale="log", xscale="log")
+    """
+    Log-scale axis limits that enclose the JWST targets and Solar System
+    planets, with the default axis margins (as autoscaling would give).
+    """
+    x_values = np.concatenate([
+        np.ma.filled(np.ma.asarray(jwst_targets["pl_orbper"], float), np.nan),
+        solar_system_data["porb"].to_numpy() * 365
+    ])
+    y_values = np.concatenate([
+        np.ma.filled(np.ma.asarray(jwst_targets["pl_rade"], float), np.nan),
+        solar_system_data["re"].to_numpy()
+    ])
+
+    return (
+        log_limits(x_values, plt.rcParams["axes.xmargin"]),
+        log_limits(y_values, plt.rcParams["axes.ymargin"])
+    )
 
-    xaxis_limits, yaxis_limits = axis.get_xlim(), axis.get_ylim()
 
-    # Close plot instance
-    plt.close(temporary_figure)
+def log_limits(values: np.ndarray, margin: float) -> tuple[float, float]:
+    """Limits of the positive values, with a margin in log-space."""
+    values = np.log10(values[np.isfinite(values) & (values > 0)])
+    padding = margin * (values.max() - values.min())
 
-    return xaxis_limits, yaxis_limits
+    return 10 ** (values.min() - padding), 10 ** (values.max() + padding)
 
 
 def plot_all_exoplanets(
@@ -135,8 +197,9 @@ def plot_all_exoplanets(
         all_planets_table: pl.DataFrame
         ) -> plt.Axes:
 
-    axis.scatter(
-        all_planets_table["pl_orbper"], all_planets_table["pl_rade"],
+    # Whole archive: rasterized or as density image for many planets
+    density_scatter.density_scatter(
+        axis, all_planets_table["pl_orbper"], all_planets_table["pl_rade"],
         c="grey", alpha=0.2, zorder=102, label="Known Exop."
     )
 
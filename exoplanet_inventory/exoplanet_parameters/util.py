@@ -1,8 +1,13 @@
-import datetime
+import os
+import sys
 import matplotlib.pyplot as plt
 import pandas as pd
 import polars as pl
-import pyvo
+
+# Shared archive store lives one level up, in 'exoplanet_inventory'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import archive_store  # noqa: E402
+import density_scatter  # noqa: E402
 
 
 def set_multifigure():
@@ -22,8 +27,11 @@ def fill_axis(
     y_array: pd.Series,
     **kwargs
 ) -> None:
-    """Generic function to fill an axis"""
-    axis.scatter(x_array, y_array, **kwargs)
+    """
+    Generic function to fill an axis, with the rendering mode (plain,
+    rasterized or density image) chosen by the number of points
+    """
+    density_scatter.density_scatter(axis, x_array, y_array, **kwargs)
 
     return None
 
@@ -33,44 +41,29 @@ def clean_multifigure(total_figure, total_axis):
     total_axis[1].axis("off")
 
 
-def read_exoplanet_parameters() -> pl.DataFrame:
-    # Read epa file as polars data frame
-    filename = "nasa_epa_fulldata.csv"
-    data = pl.read_csv(filename)
+def read_exoplanet_parameters() -> tuple[pl.DataFrame, dict]:
+    # Scan the latest archive snapshot, reading only the needed columns
+    try:
+        data = archive_store.scan_snapshot(
+            columns=[
+                "pl_name", "pl_rade", "pl_orbper", "pl_masse",
+                "discoverymethod"
+            ]
+        ).collect()
+
+    # Fall back to the (legacy) epa file if there is no snapshot yet
+    except FileNotFoundError:
+        data = pl.read_csv("nasa_epa_fulldata.csv")
 
     # Sort the table by total count of method discoveries
-    sort = {
-        method: data.filter(pl.col("discoverymethod") == method).shape[0]
-        for method in data["discoverymethod"].unique()
-    }
-    sort = dict(sorted(sort.items(), key=lambda item: item[1], reverse=True))
+    counts = data["discoverymethod"].value_counts(sort=True)
+    sort = dict(zip(counts["discoverymethod"], counts["count"]))
 
     return data, sort
 
 
-def update_exoplanet_parameters() -> None:
-    # Set the NASA Exoplanet Archive as the TAP ressource
-    tap_resource = "https://exoplanetarchive.ipac.caltech.edu/TAP"
-    tap_service = pyvo.dal.TAPService(tap_resource)
-
-    # Convert search result immediately to pandas DataFrame
-    search_result = pd.DataFrame(
-        tap_service.search(
-            "SELECT pl_name, pl_rade, pl_orbper, pl_masse, discoverymethod "
-            "FROM ps "
-            "WHERE default_flag = 1"  # type: ignore
-        )
-    )
-
-    # Save a mark with current day for posterity
-    today = datetime.datetime.now().strftime("%Y-%m-%d")
-    with open("marker_file.txt", "w") as marker_file:
-        marker_file.write(
-            "Exoplanet data in 'nasa_epa_fulldata.csv' "
-            f"was queried on {today}"
-        )
-
-    # Save search result as csv-file
-    search_result.to_csv("nasa_epa_fulldata.csv")
+def update_exoplanet_parameters(incremental: bool = False) -> None:
+    # Save a new snapshot of the NASA Exoplanet Archive to the shared store
+    archive_store.update_snapshot(incremental=incremental)
 
     return None
@@ -1,21 +1,103 @@
 import argparse
+import concurrent.futures as cf
 
+import matplotlib.pyplot as plt
+
+import modules.animate as animate
+import modules.backends as backends
 import modules.get_data as data
 import modules.make_plot as plotting
 
 
 def main() -> None:
     parser = argument_parser()
+    backend = select_backend(parser.backend, parser.snapshot)
 
-    planet_data = data.get_parameters(planet_name=parser.name)
+    # Single planet
+    if parser.name is not None:
+        planet_data = data.get_parameters(
+            planet_name=parser.name, backend=backend
+        )
 
-    figure = plotting.draw_sketch(planet_data)
+        # Planet moving along the cord, with its light curve
+        if parser.animate is not None:
+            animate.animate_transit(
+                planet_data, filename=parser.animate, n_frames=parser.frames
+            )
+
+            return None
+
+        render_sketch(planet_data, "exoplanet_transit_cord.png")
+
+        return None
+
+    # Whole target list: batched queries, one sketch per planet
+    with open(parser.names_file) as names_file:
+        planet_names = [
+            line.strip() for line in names_file
+            if line.strip() and not line.startswith("#")
+        ]
+
+    planet_list, skipped = data.get_parameters_batch(
+        planet_names=planet_names, backend=backend
+    )
+
+    # Bad names or unplottable cords are reported, all others are drawn
+    for name, reason in skipped.items():
+        print(f"SKIPPING {name}: {reason}")
+    planet_names = [name for name in planet_names if name not in skipped]
+
+    # All planets as small multiples on shared pages
+    if parser.atlas is not None:
+        plotting.draw_atlas(planet_list, filename=parser.atlas)
 
-    figure.savefig("exoplanet_transit_cord.png", dpi=600)
+        return None
+
+    render_sketches(
+        planet_list=planet_list, planet_names=planet_names,
+        processes=parser.processes
+    )
 
     return None
 
 
+def select_backend(name: str, snapshot: str = None):
+    """Parameter backend from its command line name."""
+    if name == "snapshot":
+        return backends.SnapshotBackend(filename=snapshot)
+
+    elif name == "cache":
+        return backends.CachedBackend()
+
+    return backends.TAPBackend()
+
+
+def render_sketch(planet_data: dict, filename: str) -> str:
+    """Draw and save the sketch of one planet."""
+    figure = plotting.draw_sketch(planet_data)
+    figure.savefig(filename, dpi=600)
+    plt.close(figure)
+
+    return filename
+
+
+def render_sketches(
+        planet_list: list[dict],
+        planet_names: list[str],
+        processes: int = None
+) -> list[str]:
+    """Draw the sketches of many planets in a process pool."""
+    filenames = [
+        f"exoplanet_transit_cord_{name.replace(' ', '_')}.png"
+        for name in planet_names
+    ]
+
+    with cf.ProcessPoolExecutor(max_workers=processes) as pool:
+        saved = list(pool.map(render_sketch, planet_list, filenames))
+
+    return saved
+
+
 def argument_parser() -> argparse.Namespace:
     # Instantiate argument parser
     argument_parser = argparse.ArgumentParser(
@@ -26,11 +108,48 @@ def argument_parser() -> argparse.Namespace:
         """,
     )
 
-    # Read planet name as command line argument
-    argument_parser.add_argument(
-        "-n", "--name", required=True,
+    # Read planet name(s) as command line argument
+    planet_group = argument_parser.add_mutually_exclusive_group(required=True)
+    planet_group.add_argument(
+        "-n", "--name",
         help="name of exoplanet to send to NASA EPA"
         )
+    planet_group.add_argument(
+        "-f", "--names-file",
+        help="file with one exoplanet name per line, for a sketch of each"
+        )
+
+    # Where the system parameters come from
+    argument_parser.add_argument(
+        "-b", "--backend", choices=["tap", "snapshot", "cache"],
+        default="tap",
+        help="live archive, local snapshot, or cached archive answers"
+        )
+    argument_parser.add_argument(
+        "-s", "--snapshot", default=None,
+        help="Parquet/CSV snapshot (default: latest in the archive store)"
+        )
+
+    argument_parser.add_argument(
+        "-a", "--atlas", default=None,
+        help="with a names file: draw all planets into this atlas file "
+             "(PDF with one page per grid, or numbered images)"
+        )
+
+    argument_parser.add_argument(
+        "-m", "--animate", default=None,
+        help="with a single planet: animate the transit into this GIF/MP4 "
+             "file instead of drawing the sketch"
+        )
+    argument_parser.add_argument(
+        "--frames", type=int, default=200,
+        help="number of frames of the transit animation"
+        )
+
+    argument_parser.add_argument(
+        "-p", "--processes", type=int, default=None,
+        help="number of worker processes when drawing many sketches"
+        )
 
     return argument_parser.parse_args()
 
@@ -0,0 +1,237 @@
+import os
+import shutil
+import subprocess
+import sys
+
+import matplotlib as mpl
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import matplotlib.figure as m_fig
+import matplotlib.patches as patch
+import matplotlib.pyplot as plt
+import numpy as np
+from PIL import Image
+
+from . import make_plot as plotting
+
+# Shared occultation (limb-darkened transit flux) of 'common'
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__)
+    ))),
+    "common"
+))
+import occultation  # noqa: E402
+
+
+def planet_track(
+        planet_parameters: dict, n_frames: int
+        ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Positions of the planet centre along the transit cord for all frames,
+    and the time of each frame in hours from mid-transit (or in units of
+    the stellar radius along the cord, if the transit duration is unknown).
+
+    :param planet_parameters:   Parameter dictionary (see 'get_data')
+    :param n_frames:            Number of animation frames
+
+    :return:
+        x- and y-positions of the planet centre, and frame times
+    """
+    x_array = np.linspace(-1.5, 1.5, n_frames)
+    centre, _, _ = plotting.transit_cord_auxilary(
+        x_array, planet_parameters["ratio_rtor"],
+        planet_parameters["impact_par"], planet_parameters["pl_projobliq"]
+    )
+
+    # Path length along the cord, measured from the point closest to the
+    # stellar centre
+    obliquity = np.radians(planet_parameters["pl_projobliq"])
+    path = (
+        x_array / np.cos(obliquity)
+        + planet_parameters["impact_par"] * np.tan(obliquity)
+    )
+
+    # First to fourth contact spans the full chord of the cord
+    chord = 2 * np.sqrt(np.clip(
+        (1 + planet_parameters["ratio_rtor"]) ** 2
+        - planet_parameters["impact_par"] ** 2, 0, None
+    ))
+    duration = planet_parameters.get("transit_duration", np.nan)
+    if chord > 0 and np.isfinite(duration):
+        frame_times = path / chord * duration
+    else:
+        frame_times = path
+
+    return x_array, centre, frame_times
+
+
+def animate_transit(
+        planet_parameters: dict,
+        filename: str,
+        n_frames: int = 200,
+        fps: int = 30,
+        limb_darkening: tuple[float, float] = occultation.LIMB_DARKENING
+        ) -> str:
+    """
+    Animation of the planet moving along its transit cord, together with
+    the resulting light curve. All positions and fluxes are computed before
+    drawing. The static backdrop is rendered once, and every frame only
+    redraws the planet and light-curve artists on top of it (blitting).
+
+    :param planet_parameters:   Parameter dictionary (see 'get_data')
+    :param filename:            Output file, GIF (Pillow) or MP4 (FFmpeg)
+    :param n_frames:            Number of animation frames
+    :param fps:                 Frames per second of the exported file
+    :param limb_darkening:      Quadratic limb-darkening coefficients
+
+    :return:
+        Name of the saved file
+    """
+    # Whole transit up front
+    x_position, y_position, frame_times = planet_track(
+        planet_parameters, n_frames
+    )
+    flux = occultation.quadratic_flux(
+        np.hypot(x_position, y_position), planet_parameters["ratio_rtor"],
+        *limb_darkening
+    )
+
+    figure, (sketch_axis, curve_axis) = draw_animation_canvas(
+        planet_parameters, frame_times, flux
+    )
+
+    # Artists that change from frame to frame
+    planet_disk = sketch_axis.add_patch(patch.Circle(
+        (x_position[0], y_position[0]),
+        radius=planet_parameters["ratio_rtor"], color="k", animated=True
+    ))
+    curve_line, = curve_axis.plot([], [], c="k", animated=True)
+    curve_marker, = curve_axis.plot([], [], "o", c="k", animated=True)
+
+    def update(frame: int) -> list:
+        planet_disk.set_center((x_position[frame], y_position[frame]))
+        curve_line.set_data(frame_times[:frame + 1], flux[:frame + 1])
+        curve_marker.set_data(
+            frame_times[frame:frame + 1], flux[frame:frame + 1]
+        )
+
+        return [planet_disk, curve_line, curve_marker]
+
+    write_frames(blitted_frames(figure, update, n_frames), filename, fps)
+    plt.close(figure)
+
+    return filename
+
+
+def blitted_frames(figure: m_fig.Figure, update, n_frames: int):
+    """
+    RGBA images of all frames. The figure is drawn in full only once; for
+    every frame, the saved backdrop is restored and only the artists
+    returned by 'update' are drawn on top of it. (Each image is a view of
+    the canvas buffer, only valid until the next frame is drawn.)
+    """
+    canvas = FigureCanvasAgg(figure)
+    canvas.draw()
+    backdrop = canvas.copy_from_bbox(figure.bbox)
+
+    for frame in range(n_frames):
+        canvas.restore_region(backdrop)
+        for artist in update(frame):
+            artist.axes.draw_artist(artist)
+
+        yield np.asarray(canvas.buffer_rgba())
+
+
+def write_frames(frames, filename: str, fps: int) -> None:
+    """
+    Write RGBA frames to a GIF (Pillow) or, through an FFmpeg pipe, to a
+    movie file (e.g. MP4).
+    """
+    if filename.endswith(".gif"):
+        # The backdrop holds (nearly) all colours, so one palette is enough
+        images = [Image.fromarray(frame).convert("RGB") for frame in frames]
+        palette = images[0].quantize(colors=256)
+        images = [
+            image.quantize(palette=palette, dither=Image.Dither.NONE)
+            for image in images
+        ]
+        images[0].save(
+            filename, save_all=True, append_images=images[1:],
+            duration=1000 / fps, loop=0, optimize=False
+        )
+
+        return None
+
+    ffmpeg = mpl.rcParams["animation.ffmpeg_path"]
+    if shutil.which(ffmpeg) is None:
+        raise RuntimeError(
+            f"FFmpeg is needed to write '{filename}' (or use a .gif file)"
+        )
+
+    frames = iter(frames)
+    first_frame = next(frames)
+    height, width, _ = first_frame.shape
+
+    # Raw RGBA frames in, H.264 (or the container's default) out
+    process = subprocess.Popen(
+        [
+            ffmpeg, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgba",
+            "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+            "-pix_fmt", "yuv420p", "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+            filename
+        ],
+        stdin=subprocess.PIPE
+    )
+    process.stdin.write(first_frame.tobytes())
+    for frame in frames:
+        process.stdin.write(frame.tobytes())
+    process.stdin.close()
+
+    if process.wait() != 0:
+        raise RuntimeError(f"FFmpeg failed to write '{filename}'")
+
+    return None
+
+
+def draw_animation_canvas(
+        planet_parameters: dict,
+        frame_times: np.ndarray,
+        flux: np.ndarray
+        ) -> tuple[m_fig.Figure, np.ndarray]:
+    """Static backdrop: star and transit cord, and the light-curve axis."""
+    figure, axes = plt.subplots(
+        ncols=2, figsize=(10, 4.5), width_ratios=[1, 1.4]
+    )
+    sketch_axis, curve_axis = axes
+
+    # Stellar disk and transit cord, as in the static sketch
+    sketch_axis.set(xlim=(-1.5, 1.5), ylim=(-1.5, 1.5), xticks=[], yticks=[])
+    sketch_axis.set_aspect("equal")
+    plotting.draw_star(sketch_axis, planet_parameters["st_teff"])
+
+    x_array = np.linspace(-1.5, 1.5, 100)
+    centre, top, bottom = plotting.transit_cord_auxilary(
+        x_array, planet_parameters["ratio_rtor"],
+        planet_parameters["impact_par"], planet_parameters["pl_projobliq"]
+    )
+    plotting.draw_transit_cord(sketch_axis, x_array, centre, top, bottom)
+    sketch_axis.set_title(planet_parameters.get("pl_name", ""))
+
+    # Light curve: full model faintly in the background
+    depth = 1 - flux.min()
+    curve_axis.plot(frame_times, flux, c="grey", alpha=0.3)
+    curve_axis.set(
+        xlim=(frame_times.min(), frame_times.max()),
+        ylim=(1 - 1.15 * depth - 1e-4, 1 + 0.15 * depth + 1e-4),
+        xlabel=(
+            "Time from mid-transit [h]"
+            if np.isfinite(planet_parameters.get("transit_duration", np.nan))
+            else r"Distance along cord [R$_\ast$]"
+        ),
+        ylabel="Relative flux"
+    )
+
+    figure.tight_layout()
+
+    return figure, axes
@@ -0,0 +1,192 @@
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import polars as pl
+import pyvo
+
+# Shared archive store of 'exoplanet_inventory'
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__)
+    ))),
+    "exoplanet_inventory"
+))
+import archive_store  # noqa: E402
+
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__)
+    ))),
+    "common"
+))
+import atomic_write  # noqa: E402
+
+# GLOBALS
+TAP_RESOURCE = "https://exoplanetarchive.ipac.caltech.edu/TAP"
+QUERY_COLUMNS = [
+    "pl_name", "pl_rade", "pl_orbsmax", "pl_orbper", "st_rad", "st_teff",
+    "pl_orbincl", "pl_orbeccen", "pl_orblper", "pl_projobliq", "pl_imppar"
+]
+CHUNK_SIZE = 100
+CACHE_FILE = ".parameter_cache.json"
+CACHE_TTL = 7 * 24 * 3600
+
+# Every backend provides 'fetch(planet_names)', returning the archive rows of
+# all planets it knows, keyed by lower-case planet name
+
+
+class TAPBackend:
+    """Live queries against the NASA Exoplanet Archive."""
+    def __init__(
+            self,
+            tap_service: pyvo.dal.TAPService = None,
+            chunk_size: int = CHUNK_SIZE
+    ) -> None:
+        if tap_service is None:
+            tap_service = pyvo.dal.TAPService(TAP_RESOURCE)
+
+        self.tap_service = tap_service
+        self.chunk_size = chunk_size
+
+    def fetch(self, planet_names: list[str]) -> dict[str, dict]:
+        """One 'IN (...)' query per chunk of names."""
+        archive_rows = {}
+
+        for start in range(0, len(planet_names), self.chunk_size):
+            name_list = ", ".join(
+                quote_name(name)
+                for name in planet_names[start:start + self.chunk_size]
+            )
+
+            # Generate the query string
+            query_string = f"""
+            SELECT {", ".join(QUERY_COLUMNS)}
+            FROM ps WHERE default_flag = 1
+            AND lower(pl_name) IN ({name_list})
+            """
+            search_result = self.tap_service.search(query_string).to_table()
+
+            # Masked (missing) numbers become NaN
+            columns = {
+                key: np.ma.filled(search_result[key].value, np.nan)
+                if search_result[key].dtype.kind == "f"
+                else np.ma.getdata(search_result[key].value)
+                for key in search_result.keys()
+            }
+            for row_idx, name in enumerate(columns["pl_name"]):
+                archive_rows[str(name).lower()] = plain_row({
+                    key: column[row_idx] for key, column in columns.items()
+                })
+
+        return archive_rows
+
+
+class SnapshotBackend:
+    """
+    Local Parquet or CSV snapshot of the archive (by default the latest one
+    in the shared archive store), indexed by lower-case planet name.
+    """
+    def __init__(self, filename: str = None) -> None:
+        if filename is None:
+            filename = archive_store.latest_snapshot()
+
+        if filename.endswith(".parquet"):
+            snapshot = pl.read_parquet(filename)
+        else:
+            snapshot = pl.read_csv(filename)
+
+        # Columns missing from the snapshot are treated as unknown values
+        snapshot = snapshot.select(
+            [pl.col("pl_name")] + [
+                pl.col(column).cast(pl.Float64).fill_null(np.nan)
+                if column in snapshot.columns
+                else pl.lit(np.nan, dtype=pl.Float64).alias(column)
+                for column in QUERY_COLUMNS[1:]
+            ]
+        )
+
+        self.index = {
+            row["pl_name"].lower(): plain_row(row)
+            for row in snapshot.iter_rows(named=True)
+        }
+
+    def fetch(self, planet_names: list[str]) -> dict[str, dict]:
+        return {
+            name.lower(): self.index[name.lower()]
+            for name in planet_names if name.lower() in self.index
+        }
+
+
+class CachedBackend:
+    """
+    On-disk cache of the answers of another backend (by default the live
+    archive). Cached rows are re-used until they are older than the TTL, or
+    for as long as the backend cannot be reached.
+    """
+    def __init__(
+            self,
+            backend=None,
+            cache_file: str = CACHE_FILE,
+            ttl: float = CACHE_TTL
+    ) -> None:
+        self.backend = backend
+        self.cache_file = cache_file
+        self.ttl = ttl
+
+    def fetch(self, planet_names: list[str]) -> dict[str, dict]:
+        cache = {}
+        if os.path.isfile(self.cache_file):
+            with open(self.cache_file) as f:
+                cache = json.load(f)
+
+        # Only ask the backend for planets without a fresh entry
+        now = time.time()
+        stale = [
+            name for name in planet_names
+            if now - cache.get(name.lower(), {}).get("time", -np.inf)
+            > self.ttl
+        ]
+
+        if stale:
+            if self.backend is None:
+                self.backend = TAPBackend()
+
+            try:
+                archive_rows = self.backend.fetch(stale)
+            except (OSError, pyvo.dal.DALServiceError) as error:
+                # Offline, expired entries are better than none at all
+                if not any(name.lower() in cache for name in stale):
+                    raise
+                print(f"BACKEND FAILED ({error}), USING EXPIRED CACHE ENTRIES")
+            else:
+                # Planets unknown to the backend are cached without a row,
+                # so that they are not queried again before the TTL ends
+                for name in stale:
+                    cache[name.lower()] = {
+                        "time": now, "row": archive_rows.get(name.lower())
+                    }
+
+                with atomic_write.replacing_file(self.cache_file, "w") as f:
+                    json.dump(cache, f)
+
+        return {
+            name.lower(): cache[name.lower()]["row"]
+            for name in planet_names
+            if cache.get(name.lower(), {}).get("row") is not None
+        }
+
+
+def quote_name(planet_name: str) -> str:
+    """Lower-case planet name as (escaped) ADQL string literal."""
+    return "'" + planet_name.lower().replace("'", "''") + "'"
+
+
+def plain_row(row: dict) -> dict:
+    """Archive row with plain Python values (e.g. for the JSON cache)."""
+    return {
+        key: str(value) if key == "pl_name" else float(value)
+        for key, value in row.items()
+    }
@@ -1,4 +1,11 @@
+import astropy.constants as c
 import numpy as np
+import polars as pl
+
+# Defaults for orbital angles and eccentricity that are not measured
+DEFAULT_PERIAPSIS = 90.
+DEFAULT_OBLIQUITY = 0.
+DEFAULT_ECCENTRICITY = 0.
 
 
 def calculate_impact_parameter(
@@ -20,18 +27,205 @@ def calculate_impact_parameter(
     :return:
         Impact parameter of projected orbit
     """
-    circular_part: float = (
-        semimajor_axis * np.cos(orbit_inclination * np.pi / 180)
+    transit_impact_par = float(impact_parameters(
+        semimajor_axis, orbit_inclination, eccentricity, argument_periapsis
+    ))
+
+    # Make a sanity check to ensure that the planet is actually transiting
+    check_plottable(transit_impact_par)
+
+    return transit_impact_par
+
+
+def check_plottable(impact_parameter: float) -> None:
+    """Raise if the transit cord would lie outside of the sketch."""
+    if not abs(impact_parameter) <= 1.5:
+        raise ValueError(
+            f"Impact parameter {impact_parameter} not possible to plot!"
+        )
+
+    return None
+
+
+def impact_parameters(
+        semimajor_axis: np.ndarray,
+        orbit_inclination: np.ndarray,
+        eccentricity: np.ndarray,
+        argument_periapsis: np.ndarray
+        ) -> np.ndarray:
+    """
+    Vectorised equation (7) from Winn (2010), for whole columns of planets.
+    Missing eccentricities and arguments of periapsis are replaced by the
+    circular-orbit defaults.
+
+    :param semimajor_axis:      Semi-major axes in units of stellar radius
+    :param orbit_inclination:   Inclinations of orbital plane in degrees
+    :param eccentricity:        Orbital eccentricties
+    :param argument_periapsis:  Arguments of periapsis in degrees
+
+    :return:
+        Impact parameters of projected orbits
+    """
+    eccentricity = fill_missing(eccentricity, DEFAULT_ECCENTRICITY)
+    argument_periapsis = fill_missing(argument_periapsis, DEFAULT_PERIAPSIS)
+
+    circular_part = (
+        np.asarray(semimajor_axis, dtype=float)
+        * np.cos(np.radians(orbit_inclination))
     )
-    eccentric_addition: float = (
-        (1 - eccentricity ** 2) /
-        (1 + eccentricity * np.sin(argument_periapsis * np.pi / 180))
+
+    return circular_part * eccentric_factor(eccentricity, argument_periapsis)
+
+
+def transit_durations(
+        period: np.ndarray,
+        semimajor_axis: np.ndarray,
+        radius_ratio: np.ndarray,
+        impact_parameter: np.ndarray,
+        orbit_inclination: np.ndarray,
+        eccentricity: np.ndarray,
+        argument_periapsis: np.ndarray
+        ) -> np.ndarray:
+    """
+    Total transit duration (first to fourth contact), following equations
+    (14) and (16) from Winn (2010). Non-transiting planets get NaN.
+
+    :param period:              Orbital periods in days
+    :param semimajor_axis:      Semi-major axes in units of stellar radius
+    :param radius_ratio:        Planet-to-star radius ratios
+    :param impact_parameter:    Impact parameters
+    :param orbit_inclination:   Inclinations of orbital plane in degrees
+    :param eccentricity:        Orbital eccentricties
+    :param argument_periapsis:  Arguments of periapsis in degrees
+
+    :return:
+        Transit durations in hours
+    """
+    eccentricity = fill_missing(eccentricity, DEFAULT_ECCENTRICITY)
+    argument_periapsis = fill_missing(argument_periapsis, DEFAULT_PERIAPSIS)
+
+    # Chord length across the stellar disk (NaN if there is none)
+    chord = np.sqrt(
+        np.clip((1 + radius_ratio) ** 2 - impact_parameter ** 2, 0, None)
     )
-    transit_impact_par: float = circular_part * eccentric_addition
+    chord = np.where(abs(impact_parameter) < 1 + radius_ratio, chord, np.nan)
 
-    # Make a sanity check to ensure that the planet is actually transiting
-    assert abs(transit_impact_par) <= 1.5, (
-        f"Impact parameter {transit_impact_par} not possible to plot!"
+    with np.errstate(invalid="ignore"):
+        circular_duration = np.asarray(period, dtype=float) * 24 / np.pi * (
+            np.arcsin(np.clip(
+                chord / (
+                    semimajor_axis * np.sin(np.radians(orbit_inclination))
+                ), -1, 1
+            ))
+        )
+
+    return circular_duration * (
+        np.sqrt(1 - eccentricity ** 2)
+        / (1 + eccentricity * np.sin(np.radians(argument_periapsis)))
     )
 
-    return transit_impact_par
+
+def transit_geometry(
+        planet_radius: np.ndarray,
+        semimajor_axis: np.ndarray,
+        stellar_radius: np.ndarray,
+        period: np.ndarray,
+        orbit_inclination: np.ndarray,
+        eccentricity: np.ndarray,
+        argument_periapsis: np.ndarray,
+        projected_obliquity: np.ndarray,
+        impact_parameter: np.ndarray
+        ) -> dict[str, np.ndarray]:
+    """
+    Derived transit geometry of many planets in one vectorised pass, from
+    archive columns (NumPy arrays or polars Series, in archive units).
+    Missing angles and eccentricities get their default values, and missing
+    inclinations are recovered from the archive impact parameter.
+
+    :return:
+        Dictionary of a/R*, Rp/R*, impact parameter, inclination, transit
+        duration [h], a transiting mask, and the (filled) angles
+    """
+    def as_array(column):
+        return np.asarray(column, dtype=float)
+
+    eccentricity = fill_missing(eccentricity, DEFAULT_ECCENTRICITY)
+    argument_periapsis = fill_missing(argument_periapsis, DEFAULT_PERIAPSIS)
+    projected_obliquity = fill_missing(
+        projected_obliquity, DEFAULT_OBLIQUITY
+    )
+
+    ratio_ator = (
+        as_array(semimajor_axis) * c.au.value
+        / (as_array(stellar_radius) * c.R_sun.value)
+    )
+    ratio_rtor = (
+        as_array(planet_radius) * c.R_earth.value
+        / (as_array(stellar_radius) * c.R_sun.value)
+    )
+
+    # Inclination from the archive impact parameter where it is missing
+    orbit_inclination = as_array(orbit_inclination)
+    with np.errstate(invalid="ignore"):
+        inclination_from_b = np.degrees(np.arccos(
+            as_array(impact_parameter) / ratio_ator
+            / eccentric_factor(eccentricity, argument_periapsis)
+        ))
+    orbit_inclination = np.where(
+        np.isnan(orbit_inclination), inclination_from_b, orbit_inclination
+    )
+
+    impact_par = impact_parameters(
+        ratio_ator, orbit_inclination, eccentricity, argument_periapsis
+    )
+
+    return {
+        "ratio_ator": ratio_ator,
+        "ratio_rtor": ratio_rtor,
+        "pl_orbincl": orbit_inclination,
+        "pl_orbeccen": eccentricity,
+        "pl_orblper": argument_periapsis,
+        "pl_projobliq": projected_obliquity,
+        "impact_par": impact_par,
+        "transit_duration": transit_durations(
+            period, ratio_ator, ratio_rtor, impact_par,
+            orbit_inclination, eccentricity, argument_periapsis
+        ),
+        "transiting": abs(impact_par) < 1 + ratio_rtor,
+    }
+
+
+def derive_geometry(catalogue: pl.DataFrame) -> pl.DataFrame:
+    """Add the derived transit geometry to a whole archive catalogue."""
+    geometry = transit_geometry(
+        planet_radius=catalogue["pl_rade"],
+        semimajor_axis=catalogue["pl_orbsmax"],
+        stellar_radius=catalogue["st_rad"],
+        period=catalogue["pl_orbper"],
+        orbit_inclination=catalogue["pl_orbincl"],
+        eccentricity=catalogue["pl_orbeccen"],
+        argument_periapsis=catalogue["pl_orblper"],
+        projected_obliquity=catalogue["pl_projobliq"],
+        impact_parameter=catalogue["pl_imppar"]
+    )
+
+    return catalogue.with_columns([
+        pl.Series(name, values) for name, values in geometry.items()
+    ])
+
+
+def eccentric_factor(
+        eccentricity: np.ndarray, argument_periapsis: np.ndarray
+        ) -> np.ndarray:
+    """Correction factor of the projected separation for eccentric orbits."""
+    return (
+        (1 - eccentricity ** 2)
+        / (1 + eccentricity * np.sin(np.radians(argument_periapsis)))
+    )
+
+
+def fill_missing(column: np.ndarray, default: float) -> np.ndarray:
+    """Float array of a column, with missing values (NaN) set to default."""
+    column = np.asarray(column, dtype=float)
+
+    return np.where(np.isnan(column), default, column)
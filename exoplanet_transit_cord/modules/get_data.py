@@ -1,65 +1,82 @@
-import astropy.constants as c
+from . import backends
 from . import calculate_pars as pars
-import numpy as np
 import pyvo
 
 
-def get_parameters(planet_name: str) -> dict:
-    # Set the NASA Exoplanet Archive as the TAP ressource
-    tap_resource = "https://exoplanetarchive.ipac.caltech.edu/TAP"
-    tap_service = pyvo.dal.TAPService(tap_resource)
+def get_parameters(
+        planet_name: str,
+        tap_service: pyvo.dal.TAPService = None,
+        backend=None
+) -> dict:
+    planet_list, skipped = get_parameters_batch(
+        [planet_name], tap_service=tap_service, backend=backend
+    )
+    if skipped:
+        raise ValueError(f"{planet_name}: {skipped[planet_name]}")
+
+    return planet_list[0]
+
 
-    # Generate the query string
-    query_string = f"""
-    SELECT pl_rade, pl_orbsmax, st_rad, st_teff,
-    pl_orbincl, pl_orbeccen, pl_orblper, pl_projobliq, pl_imppar
-    FROM ps WHERE default_flag = 1
-    AND lower(pl_name) = '{planet_name.lower()}'
+def get_parameters_batch(
+        planet_names: list[str],
+        chunk_size: int = backends.CHUNK_SIZE,
+        tap_service: pyvo.dal.TAPService = None,
+        backend=None
+) -> tuple[list[dict], dict[str, str]]:
     """
+    System parameters of many planets, in the order of the given names. By
+    default, they are queried live from the archive (one 'IN (...)' query
+    per chunk of names), but any backend from 'backends' can be used, e.g.
+    a local snapshot or a cache of earlier answers.
 
-    # Convert search result immediately to pandas DataFrame
-    search_result = tap_service.search(query_string).to_table()
+    Planets without an archive entry, or whose transit cord does not fit
+    onto the sketch, are skipped, so that one bad name does not stop the
+    whole batch.
+
+    :return:
+        Parameters of all valid planets, and the reason for every skipped
+        planet (by name)
+    """
+    if backend is None:
+        backend = backends.TAPBackend(
+            tap_service=tap_service, chunk_size=chunk_size
+        )
 
-    # Very scuffed, but it works I guess
-    result_dict = {
-        key: search_result[key].value.data[0]
-        for key in search_result.keys()
-    }
+    archive_rows = backend.fetch(planet_names)
 
-    # Insert standardised argument of periapsis, projected obliquite, 
-    # and orbital inclination if no value retrieved
-    if np.isnan(result_dict["pl_orblper"]):
-        result_dict["pl_orblper"] = 90.
+    planet_list = []
+    skipped = {}
+    for name in planet_names:
+        if name.lower() not in archive_rows:
+            skipped[name] = "no archive entry found"
+            continue
 
-    if np.isnan(result_dict["pl_projobliq"]):
-        result_dict["pl_projobliq"] = 0.
+        try:
+            planet_list.append(
+                derive_parameters(dict(archive_rows[name.lower()]))
+            )
+        except ValueError as error:
+            skipped[name] = str(error)
 
-    if np.isnan(result_dict["pl_orbincl"]):
-        print("WAIT A MINUTE! I'll need to use retrieved b-value")
+    return planet_list, skipped
 
-    # Calculate derivative parameters
-    result_dict["ratio_ator"] = (
-        result_dict["pl_orbsmax"] * c.au.value / (
-            result_dict["st_rad"] * c.R_sun.value
-        )
-    )
-    result_dict["ratio_rtor"] = (
-        result_dict["pl_rade"] * c.R_earth.value / (
-            result_dict["st_rad"] * c.R_sun.value
-        )
-    )
 
-    # Calculate the impact parameter
-    result_dict["impact_par"] = pars.calculate_impact_parameter(
-        semimajor_axis=result_dict["ratio_ator"],
+def derive_parameters(result_dict: dict) -> dict:
+    """Fill in missing orbital angles and derive the transit geometry."""
+    geometry = pars.transit_geometry(
+        planet_radius=result_dict["pl_rade"],
+        semimajor_axis=result_dict["pl_orbsmax"],
+        stellar_radius=result_dict["st_rad"],
+        period=result_dict["pl_orbper"],
         orbit_inclination=result_dict["pl_orbincl"],
         eccentricity=result_dict["pl_orbeccen"],
-        argument_periapsis=result_dict["pl_orblper"]
+        argument_periapsis=result_dict["pl_orblper"],
+        projected_obliquity=result_dict["pl_projobliq"],
+        impact_parameter=result_dict["pl_imppar"]
     )
+    result_dict.update({key: value.item() for key, value in geometry.items()})
 
-    # Mark the file with current day for posterity
-    # today = datetime.datetime.now().strftime("%Y-%m-%d")
+    # Make a sanity check to ensure that the cord fits onto the sketch
+    pars.check_plottable(result_dict["impact_par"])
 
-    # Save search result as csv-file
-    # search_result.to_csv(f"nasa_epa_fulldata_{today}.csv")
     return result_dict
@@ -5,8 +5,15 @@ import matplotlib.axes as m_ax
 import matplotlib.colors as colors
 import matplotlib.cm as cm
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_pdf import PdfPages
 import numpy as np
 
+# GLOBALS: stellar temperature colour-scale, built only once
+TEMPERATURE_MAPPABLE = cm.ScalarMappable(
+    norm=colors.Normalize(vmin=1000, vmax=10000),
+    cmap=mpl.colormaps["YlOrRd_r"]
+)
+
 
 def projected_offset(adjacent: float, angle: float) -> float:
     """DOC!"""
@@ -30,6 +37,9 @@ def transit_cord_auxilary(
     """
     DOC!
 
+    All planet parameters can also be arrays (of N planets), in which case
+    each cord line is an array of shape (N, x_array.shape[0]).
+
     :param planet_size:     Size of the planet in stellar radii
     :param impact_param:    Impact parameter
     :param proj_obliquity:  Projected obliquity angle of planet orbit [deg]
@@ -44,16 +54,18 @@ def transit_cord_auxilary(
     # area, but I might as well keep this in and use it in the future in
     # some way
 
-    # Transform obliquity from degrees into radians
-    proj_obliquity *= np.pi / 180
+    # Transform obliquity from degrees into radians (one row per planet)
+    proj_obliquity = np.radians(np.asarray(proj_obliquity, dtype=float))
+    proj_obliquity = proj_obliquity[..., np.newaxis]
 
     # Values of the planet centre and edges at mid-transit
-    planet_centre: float = impact_param
-    upper_edge: float = planet_centre + planet_size
-    lower_edge: float = planet_centre - planet_size
+    planet_centre = np.asarray(impact_param, dtype=float)[..., np.newaxis]
+    planet_size = np.asarray(planet_size, dtype=float)[..., np.newaxis]
+    upper_edge = planet_centre + planet_size
+    lower_edge = planet_centre - planet_size
 
     # Linear inclination
-    inclination_absolute: float = np.tan(proj_obliquity)
+    inclination_absolute = np.tan(proj_obliquity)
 
     # Make arrays for all three cord lines
     """centre_line = make_line(
@@ -108,6 +120,98 @@ def draw_sketch(planet_parameters: dict) -> m_fig.Figure:
     return fig
 
 
+def draw_atlas(
+        planet_list: list[dict],
+        filename: str,
+        ncols: int = 4,
+        nrows: int = 4
+        ) -> list[str]:
+    """
+    Sketches of many planets as small multiples, saved page by page. The
+    page figure and its artists are built once and only updated for every
+    page; the cord lines of all planets are computed in one go.
+
+    :param planet_list: Parameter dictionaries (see 'get_data')
+    :param filename:    PDF file (all pages), or other image file name,
+                        which is then numbered per page
+    :param ncols:       Number of sketches per row
+    :param nrows:       Number of rows per page
+
+    :return:
+        List of saved files
+    """
+    # Star colours and cord lines of all planets at once
+    x_array = np.linspace(-1.5, 1.5, 100)
+    star_colours = stellar_temp_cmap(
+        [planet["st_teff"] for planet in planet_list]
+    )
+    centre, top, bottom = transit_cord_auxilary(
+        x_array,
+        np.array([planet["ratio_rtor"] for planet in planet_list]),
+        np.array([planet["impact_par"] for planet in planet_list]),
+        np.array([planet["pl_projobliq"] for planet in planet_list])
+    )
+
+    # Page canvas with re-usable artists in every panel
+    figure, axes = plt.subplots(
+        nrows=nrows, ncols=ncols, figsize=(2 * ncols, 2 * nrows),
+        squeeze=False
+    )
+    panels = []
+    for axis in axes.flatten():
+        axis.set(xlim=(-1.5, 1.5), ylim=(-1.5, 1.5), xticks=[], yticks=[])
+        axis.set_aspect("equal")
+        axis.set_title(" ", fontsize=8)
+
+        stellar_disk = axis.add_patch(patch.Circle((0, 0), radius=1.))
+        cord = axis.add_patch(
+            patch.Polygon(np.zeros((1, 2)), color="k", alpha=0.7)
+        )
+        centre_line, = axis.plot([], [], c="k", ls="--")
+        panels.append((axis, stellar_disk, cord, centre_line))
+    figure.patch.set_facecolor('none')
+    figure.tight_layout()
+
+    per_page = ncols * nrows
+    pdf = PdfPages(filename) if filename.endswith(".pdf") else None
+    saved = []
+
+    for page_start in range(0, len(planet_list), per_page):
+        for panel_idx, panel in enumerate(panels):
+            axis, stellar_disk, cord, centre_line = panel
+            planet_idx = page_start + panel_idx
+
+            # Hide left-over panels on the last page
+            axis.set_visible(planet_idx < len(planet_list))
+            if planet_idx >= len(planet_list):
+                continue
+
+            stellar_disk.set_color(star_colours[planet_idx])
+            cord.set_xy(np.column_stack([
+                np.concatenate([x_array, x_array[::-1]]),
+                np.concatenate([top[planet_idx], bottom[planet_idx][::-1]])
+            ]))
+            centre_line.set_data(x_array, centre[planet_idx])
+            axis.set_title(
+                planet_list[planet_idx].get("pl_name", ""), fontsize=8
+            )
+
+        if pdf is not None:
+            pdf.savefig(figure)
+        else:
+            root, extension = filename.rsplit(".", 1)
+            saved.append(f"{root}_{page_start // per_page + 1}.{extension}")
+            figure.savefig(saved[-1], dpi=300)
+
+    if pdf is not None:
+        pdf.close()
+        saved.append(filename)
+
+    plt.close(figure)
+
+    return saved
+
+
 def draw_star(axis: m_ax.Axes, star_teff: float) -> None:
     """
     Draws a circle of radius 1 on the axis-object.
@@ -123,12 +227,8 @@ def draw_star(axis: m_ax.Axes, star_teff: float) -> None:
 
 
 def stellar_temp_cmap(temperature: float) -> np.ndarray:
-    """Map stellar host temperature to RGBA value of colormap."""
-    norm = colors.Normalize(vmin=1000, vmax=10000)
-    cmap = mpl.colormaps["YlOrRd_r"]
-
-    mappable = cm.ScalarMappable(norm=norm, cmap=cmap)
-    colour = mappable.to_rgba(np.array([temperature]))
+    """Map stellar host temperature(s) to RGBA value(s) of colormap."""
+    colour = TEMPERATURE_MAPPABLE.to_rgba(np.atleast_1d(temperature))
 
     return colour
 
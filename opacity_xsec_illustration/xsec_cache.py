@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+# Atomic file writes live in 'common' at the top of the repository
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"
+))
+import atomic_write  # noqa: E402
+
+# GLOBALS
+CACHE_DIRECTORY = "xsec_cache"
+CACHE_SIZE_LIMIT = 256 * 1024 ** 2
+DIGEST_BLOCK_SIZE = 16 * 1024 ** 2
+
+
+def source_digest(filename: str, cache_dir: str = CACHE_DIRECTORY) -> str:
+    """
+    SHA-256 digest of the content of a source file. Hashing a large xsec
+    file is not free, so digests are remembered per (path, size, mtime) in
+    an index within the cache directory. In batch runs, the digests are
+    computed once up front (see 'prepare_xsec_batch'), not by each worker.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    index_file = os.path.join(cache_dir, "digests.json")
+    stat = os.stat(filename)
+    stamp = [stat.st_size, stat.st_mtime_ns]
+
+    # Re-use the digest if the file has not changed since it was hashed
+    index = {}
+    if os.path.isfile(index_file):
+        with open(index_file) as f:
+            index = json.load(f)
+
+    entry = index.get(os.path.abspath(filename))
+    if entry is not None and entry["stamp"] == stamp:
+        return entry["digest"]
+
+    # Hash the content block by block
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(DIGEST_BLOCK_SIZE), b""):
+            digest.update(block)
+    digest = digest.hexdigest()
+
+    # Re-read the index right before writing, to keep entries that were
+    # added in the meantime, and replace it in one step
+    if os.path.isfile(index_file):
+        with open(index_file) as f:
+            index = json.load(f)
+    index[os.path.abspath(filename)] = {"stamp": stamp, "digest": digest}
+
+    with atomic_write.replacing_file(index_file, "w") as f:
+        json.dump(index, f)
+
+    return digest
+
+
+def cache_key(
+        digest: str, p_idx: int, t_idx: int, bin_type: str, bin_info: int,
+        chunk_size: int = None
+) -> str:
+    """
+    Key of a binned product from its source and selection. The chunk size
+    is part of the key, since chunked binning sums in a different order
+    and can differ from the unchunked result in the last digits.
+    """
+    key_string = (
+        f"{digest}|{p_idx}|{t_idx}|{bin_type.lower()}|{bin_info}"
+        f"|{chunk_size}"
+    )
+
+    return hashlib.sha256(key_string.encode("utf-8")).hexdigest()
+
+
+def load_entry(key: str, cache_dir: str = CACHE_DIRECTORY) -> dict | None:
+    """
+    Cached product for the key, or None if there is none. Another worker
+    may evict the entry at any time, so an entry that disappears while it
+    is read counts as missing (and is recomputed).
+    """
+    entry_file = os.path.join(cache_dir, f"{key}.npz")
+
+    try:
+        # Mark the entry as recently used for the eviction order
+        os.utime(entry_file)
+
+        return read_npz(entry_file)
+    except FileNotFoundError:
+        return None
+
+
+def store_entry(
+        key: str, entry: dict,
+        cache_dir: str = CACHE_DIRECTORY,
+        size_limit: int = CACHE_SIZE_LIMIT
+) -> None:
+    """Store a product under the key and evict old entries if needed."""
+    os.makedirs(cache_dir, exist_ok=True)
+    write_npz(os.path.join(cache_dir, f"{key}.npz"), entry)
+    evict_entries(cache_dir, size_limit)
+
+    return None
+
+
+def evict_entries(cache_dir: str, size_limit: int) -> None:
+    """
+    Remove least recently used entries until the cache fits the limit.
+    Several workers may evict at the same time, so entries that are
+    already gone are skipped.
+    """
+    entries = []
+    for name in os.listdir(cache_dir):
+        if not name.endswith(".npz"):
+            continue
+        try:
+            stat = os.stat(os.path.join(cache_dir, name))
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, name))
+
+    total_size = sum(size for _, size, _ in entries)
+
+    for _, size, name in sorted(entries):
+        if total_size <= size_limit:
+            break
+        total_size -= size
+        try:
+            os.remove(os.path.join(cache_dir, name))
+        except FileNotFoundError:
+            pass
+
+    return None
+
+
+def write_npz(filename: str, product: dict) -> None:
+    """
+    Write arrays and strings of a product dictionary to an .npz file (via
+    a temporary file, so that readers never see a partial archive).
+    """
+    with atomic_write.replacing_file(filename, "wb") as f:
+        np.savez(f, **{
+            key: np.asarray(value) for key, value in product.items()
+        })
+
+    return None
+
+
+def read_npz(filename: str) -> dict:
+    """Read a product dictionary written by 'write_npz'."""
+    with np.load(filename) as data:
+        product = {
+            key: value.item() if value.ndim == 0 else value
+            for key, value in data.items()
+        }
+
+    return product
@@ -1,6 +1,10 @@
+import os
+
 import pandas as pd
 import matplotlib.pyplot as plt
 
+import xsec_cache
+
 
 def main():
     h2o = read_xsec("H2O")
@@ -19,10 +23,20 @@ def main():
 
 
 def read_xsec(filename: str) -> dict:
-    data = pd.read_csv(
-        f"binned_data/xsec_{filename}.csv",
-        comment="#"
-    )
+    # Prefer the binary product, and fall back to the commented CSV file
+    binary_file = f"binned_data/xsec_{filename}.npz"
+    if os.path.isfile(binary_file):
+        product = xsec_cache.read_npz(binary_file)
+        data = pd.DataFrame(
+            {"wavel [m]": product["wavel"], "x-sec": product["xsec"]}
+        )
+
+    else:
+        data = pd.read_csv(
+            f"binned_data/xsec_{filename}.csv",
+            comment="#"
+        )
+
     name = make_latex_string(filename)
     return_dict = {"id": filename, "name": name, "xsec": data}
 
@@ -1,70 +1,272 @@
+import argparse
+import concurrent.futures as cf
+import glob
+import itertools
+import os
+import sys
+
 import h5py as h5
 import numpy as np
 import pandas as pd
 
+import xsec_cache
+
+# Shared binning lives in 'common' at the top of the repository
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"
+))
+import binning  # noqa: E402
+
 # GLOBALS
 PRESSURE_TARGET = 1e-3
 TEMPERATURE_TARGET = 1000
 BIN_TYPE = "resolution"
 BIN_INFO = 100
+CHUNK_SIZE = None
 
 
 def main():
-    test = "14N-1H3__CoYuTe.R15000_0.3-50mu.xsec.TauREx.h5"
-    _ = prepare_xsec_data(f"/home/simon/Downloads/{test}")
+    args = argument_parser()
+
+    # Every combination of pressure, temperature and resolution is a target
+    targets = list(itertools.product(
+        args.pressure, args.temperature, args.resolution
+    ))
+    _ = prepare_xsec_batch(
+        sources=args.files, targets=targets,
+        processes=args.processes, chunk_size=args.chunksize
+    )
 
     return
 
 
-def prepare_xsec_data(filename: str):
-    """Most importantly, bin down the xsec data."""
-    xsec_data = h5.File(filename)
-    reference = xsec_data["DOI"][()][0].decode("utf-8")
-    mol_name = xsec_data["mol_name"][()][0].decode("utf-8")
+def argument_parser() -> argparse.Namespace:
+    test = "14N-1H3__CoYuTe.R15000_0.3-50mu.xsec.TauREx.h5"
 
-    # Start the return dictionary
-    xsec_dictionary = {
-        "ref": reference,
-        "name": mol_name,
-        "latex_name": make_latex_string(mol_name),
-    }
+    # Instantiate argument parser
+    parser = argparse.ArgumentParser(
+        prog="Cross-section preparation",
+        description="""
+            Bin down TauREx cross-section files (or all files in given
+            directories) for every combination of pressure, temperature
+            and resolution, one worker process per file and target.
+        """,
+    )
+
+    parser.add_argument(
+        "files", nargs="*", default=[f"/home/simon/Downloads/{test}"],
+        help="TauREx .h5 files or directories containing them"
+    )
+    parser.add_argument(
+        "-p", "--pressure", nargs="+", type=float,
+        default=[PRESSURE_TARGET], help="target pressure(s) [bar]"
+    )
+    parser.add_argument(
+        "-t", "--temperature", nargs="+", type=float,
+        default=[TEMPERATURE_TARGET], help="target temperature(s) [K]"
+    )
+    parser.add_argument(
+        "-r", "--resolution", nargs="+", type=int,
+        default=[BIN_INFO], help="target resolution(s) R"
+    )
+    parser.add_argument(
+        "-n", "--processes", type=int, default=None,
+        help="number of worker processes (default: number of cores)"
+    )
+    parser.add_argument(
+        "-c", "--chunksize", type=int, default=CHUNK_SIZE,
+        help="read the wavenumber range in chunks of this size"
+    )
 
-    # Find the appropriate xsec entry through pressure and temperature
-    pressure = xsec_data["p"][()]
-    p_idx = np.argmin(abs(np.log10(pressure) - np.log10(PRESSURE_TARGET)))
+    return parser.parse_args()
 
-    temperature = xsec_data["t"][()]
-    t_idx = np.argmin(abs(temperature - TEMPERATURE_TARGET))
 
-    # Slice into xsec array
-    xsec = xsec_data["xsecarr"][()]
-    xsec_slice = xsec[p_idx][t_idx]
+def collect_xsec_files(sources: list[str]) -> list[str]:
+    """Expand directories into the TauREx .h5 files they contain."""
+    filenames = []
 
-    # Document the chosen pressure and temperature
-    xsec_dictionary["pt_doc_string"] = (
-        f"Selected xsec at p = {pressure[p_idx]} bar "
-        f"and T = {temperature[t_idx]} K"
-    )
+    for source in sources:
+        if os.path.isdir(source):
+            filenames.extend(sorted(glob.glob(os.path.join(source, "*.h5"))))
+        else:
+            filenames.append(source)
 
-    # Wavelength from wavenumber array
-    wavelength = 1 / (xsec_data["bin_edges"][()] * 1e2)
+    return filenames
 
-    # Bin down the data
-    bin_info, wavel_bin, xsec_bin = wrap_bin_data(
-        bin_type=BIN_TYPE, bin_info=BIN_INFO, wavel=wavelength, xsec=xsec_slice
-    )
 
-    # Turn around both arrays to have ascending wavelength
-    xsec_dictionary["xsec"] = xsec_bin[::-1]
-    xsec_dictionary["wavel"] = wavel_bin[::-1]
-    xsec_dictionary["bin_information"] = bin_info
+def prepare_xsec_batch(
+        sources: list[str],
+        targets: list[tuple],
+        processes: int = None,
+        chunk_size: int = CHUNK_SIZE
+) -> list[dict]:
+    """
+    Run 'prepare_xsec_data' for every file and (p, T, R) target across a
+    process pool. With more than one target, the binned products carry the
+    target in their file name, and products of files of the same molecule
+    carry their source (see 'source_suffixes'), so that none of them are
+    overwritten.
+    """
+    filenames = collect_xsec_files(sources)
+
+    # Hash every source once here, instead of in every worker
+    digests = {
+        filename: xsec_cache.source_digest(filename) for filename in filenames
+    }
+    suffixes = source_suffixes(filenames, digests)
+
+    with cf.ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [
+            pool.submit(
+                prepare_xsec_data, filename, digest=digests[filename],
+                pressure_target=p_target, temperature_target=t_target,
+                bin_type="resolution", bin_info=r_target,
+                chunk_size=chunk_size,
+                name_suffix=suffixes[filename] + (
+                    f"_p{p_target:g}_T{t_target:g}_R{r_target}"
+                    if len(targets) > 1 else ""
+                )
+            )
+            for filename in filenames
+            for p_target, t_target, r_target in targets
+        ]
+        results = [future.result() for future in futures]
+
+    return results
+
+
+def source_suffixes(
+        filenames: list[str], digests: dict[str, str]
+) -> dict[str, str]:
+    """
+    File name suffix of the binned products of every source. Products are
+    named after the molecule, so files of the same molecule (e.g. other
+    line lists) get the stem of their file name, or the start of their
+    content digest if the stems are the same as well.
+    """
+    molecules = {}
+    for filename in filenames:
+        with h5.File(filename, "r") as xsec_data:
+            molecules[filename] = xsec_data["mol_name"][()][0].decode("utf-8")
+
+    suffixes = {}
+    for filename in filenames:
+        namesakes = [
+            other for other in filenames
+            if molecules[other] == molecules[filename]
+            and digests[other] != digests[filename]
+        ]
+        if not namesakes:
+            suffixes[filename] = ""
+            continue
+
+        stem = os.path.basename(filename).split(".")[0]
+        if any(
+                os.path.basename(other).split(".")[0] == stem
+                for other in namesakes
+        ):
+            suffixes[filename] = f"_{digests[filename][:8]}"
+        else:
+            suffixes[filename] = f"_{stem}"
+
+    return suffixes
+
+
+def prepare_xsec_data(
+        filename: str,
+        pressure_target: float = PRESSURE_TARGET,
+        temperature_target: float = TEMPERATURE_TARGET,
+        bin_type: str = BIN_TYPE,
+        bin_info: int = BIN_INFO,
+        chunk_size: int = CHUNK_SIZE,
+        name_suffix: str = "",
+        use_cache: bool = True,
+        digest: str = None
+):
+    """
+    Most importantly, bin down the xsec data. Only the selected (p, T) slab
+    is read from the file; with a chunk size, the wavenumber range is also
+    read and binned chunk by chunk. Binned products are cached by source
+    content and selection, and returned from the cache when possible (the
+    content digest of the file can be passed in if it is already known).
+    """
+    with h5.File(filename, "r") as xsec_data:
+        reference = xsec_data["DOI"][()][0].decode("utf-8")
+        mol_name = xsec_data["mol_name"][()][0].decode("utf-8")
+
+        # Start the return dictionary
+        xsec_dictionary = {
+            "ref": reference,
+            "name": mol_name,
+            "latex_name": make_latex_string(mol_name),
+        }
+
+        # Find the appropriate xsec entry through pressure and temperature
+        pressure = xsec_data["p"][()]
+        p_idx = np.argmin(
+            abs(np.log10(pressure) - np.log10(pressure_target))
+        )
+
+        temperature = xsec_data["t"][()]
+        t_idx = np.argmin(abs(temperature - temperature_target))
+
+        # Document the chosen pressure and temperature
+        xsec_dictionary["pt_doc_string"] = (
+            f"Selected xsec at p = {pressure[p_idx]} bar "
+            f"and T = {temperature[t_idx]} K"
+        )
+
+        # Look for an earlier binned product of the same selection
+        cached = None
+        if use_cache:
+            if digest is None:
+                digest = xsec_cache.source_digest(filename)
+            key = xsec_cache.cache_key(
+                digest, p_idx, t_idx, bin_type, bin_info,
+                chunk_size=chunk_size
+            )
+            cached = xsec_cache.load_entry(key)
+
+        # Bin down the data, reading only the selected hyperslab
+        if cached is not None:
+            xsec_dictionary.update(cached)
+
+        elif chunk_size is None:
+            wavelength = 1 / (xsec_data["bin_edges"][()] * 1e2)
+            xsec_slice = xsec_data["xsecarr"][p_idx, t_idx, :]
+
+            bin_string, wavel_bin, xsec_bin = wrap_bin_data(
+                bin_type=bin_type, bin_info=bin_info,
+                wavel=wavelength, xsec=xsec_slice
+            )
+
+        else:
+            bin_string, wavel_bin, xsec_bin = chunked_bin_data(
+                bin_type=bin_type, bin_info=bin_info,
+                wavenumber=xsec_data["bin_edges"],
+                xsec_slab=xsec_data["xsecarr"], slab_idx=(p_idx, t_idx),
+                chunk_size=chunk_size
+            )
+
+    if cached is None:
+        # Turn around both arrays to have ascending wavelength
+        xsec_dictionary["xsec"] = xsec_bin[::-1]
+        xsec_dictionary["wavel"] = wavel_bin[::-1]
+        xsec_dictionary["bin_information"] = bin_string
+
+        if use_cache:
+            xsec_cache.store_entry(key, {
+                entry: xsec_dictionary[entry]
+                for entry in ["xsec", "wavel", "bin_information"]
+            })
 
     # Saving binned xsec to a file
     saveframe = pd.DataFrame(
         data=np.array([xsec_dictionary["wavel"], xsec_dictionary["xsec"]]).T,
         columns=["wavel [m]", "x-sec"]
     )
-    with open(f"binned_data/xsec_{xsec_dictionary['name']}.csv", "w") as f:
+    save_name = f"binned_data/xsec_{xsec_dictionary['name']}{name_suffix}.csv"
+    with open(save_name, "w") as f:
         f.write(
             f"# Name: {xsec_dictionary["name"]}\n"
             f"# Source: {xsec_dictionary["ref"]}\n"
@@ -72,11 +274,88 @@ def prepare_xsec_data(filename: str):
             f"# {xsec_dictionary["pt_doc_string"]}\n"
             f"# {xsec_dictionary["bin_information"]}\n"
         )
-    saveframe.to_csv(
-        f"binned_data/xsec_{xsec_dictionary['name']}.csv",
-        mode="a", index=False
+    saveframe.to_csv(save_name, mode="a", index=False)
+
+    # Binary copy of the same product, which loads without parsing
+    xsec_cache.write_npz(
+        save_name.replace(".csv", ".npz"),
+        {**xsec_dictionary, "source": filename}
+    )
+
+    return xsec_dictionary
+
+
+def prepare_xsec_grid(
+        filename: str,
+        pressure_targets: np.ndarray,
+        temperature_targets: np.ndarray,
+        bin_type: str = BIN_TYPE,
+        bin_info: int = BIN_INFO
+) -> dict:
+    """
+    Binned xsec for many (p, T) targets from a single pass over the file.
+    Only the slabs bracketing the targets are read (one read per pressure),
+    and each target is bilinearly interpolated in (log p, T) between them.
+    """
+    pressure_targets = np.atleast_1d(np.asarray(pressure_targets, float))
+    temperature_targets = np.atleast_1d(
+        np.asarray(temperature_targets, float)
+    )
+
+    with h5.File(filename, "r") as xsec_data:
+        reference = xsec_data["DOI"][()][0].decode("utf-8")
+        mol_name = xsec_data["mol_name"][()][0].decode("utf-8")
+
+        # Bracketing grid points and interpolation weights of all targets
+        pressure = xsec_data["p"][()]
+        p_low, p_high, p_weight = bracket_grid(
+            np.log10(pressure), np.log10(pressure_targets)
+        )
+        temperature = xsec_data["t"][()]
+        t_low, t_high, t_weight = bracket_grid(
+            temperature, temperature_targets
+        )
+
+        # Grid points that are actually needed by any target
+        p_needed = np.unique(np.concatenate([p_low, p_high]))
+        t_needed = np.unique(np.concatenate([t_low, t_high]))
+
+        # Bin down all needed slabs, one pressure (all temperatures) at once
+        wavelength = 1 / (xsec_data["bin_edges"][()] * 1e2)
+        binned_slabs = []
+        for p_idx in p_needed:
+            bin_string, wavel_bin, xsec_bin = wrap_bin_data(
+                bin_type=bin_type, bin_info=bin_info, wavel=wavelength,
+                xsec=xsec_data["xsecarr"][p_idx, t_needed, :]
+            )
+            binned_slabs.append(xsec_bin)
+        binned_slabs = np.array(binned_slabs)
+
+    # Positions of the bracketing grid points within the binned slabs
+    pl, ph = np.searchsorted(p_needed, [p_low, p_high])
+    tl, th = np.searchsorted(t_needed, [t_low, t_high])
+    p_weight, t_weight = p_weight[:, None], t_weight[:, None]
+
+    # Bilinear interpolation for all targets at once
+    xsec_grid = (
+        (1 - p_weight) * (1 - t_weight) * binned_slabs[pl, tl]
+        + (1 - p_weight) * t_weight * binned_slabs[pl, th]
+        + p_weight * (1 - t_weight) * binned_slabs[ph, tl]
+        + p_weight * t_weight * binned_slabs[ph, th]
     )
 
+    # Turn around both arrays to have ascending wavelength
+    xsec_dictionary = {
+        "ref": reference,
+        "name": mol_name,
+        "latex_name": make_latex_string(mol_name),
+        "pressure": pressure_targets,
+        "temperature": temperature_targets,
+        "xsec": xsec_grid[:, ::-1],
+        "wavel": np.asarray(wavel_bin)[::-1],
+        "bin_information": bin_string,
+    }
+
     return xsec_dictionary
 
 
@@ -87,83 +366,91 @@ def wrap_bin_data(
     """Wrap around different types of binning."""
     if bin_type.lower() == "resolution":
         info_str = f"Binned using R={bin_info}"
-        idx_list = make_resolution_ids(wavel, bin_info)
-        wavel_bin = index_list_average(wavel, idx_list)
-        xsec_bin = index_list_average(xsec, idx_list)
+        bin_ids = binning.resolution_bin_ids(wavel, bin_info)
+        wavel_bin = binning.bin_id_average(wavel, bin_ids)
+        xsec_bin = binning.bin_id_average(xsec, bin_ids)
 
     elif bin_type.lower() == "box":
         info_str = f"Binned box of size {bin_info}"
-        wavel_bin = box_average(wavel, bin_info)
-        xsec_bin = box_average(xsec, bin_info)
+        wavel_bin = binning.box_average(wavel, bin_info)
+        xsec_bin = binning.box_average(xsec, bin_info)
 
     return info_str, wavel_bin, xsec_bin
 
 
-def index_list_average(data: np.ndarray, slices: np.ndarray) -> np.ndarray:
-    """Custom average slices (e.g. for resolution-based binning)."""
-    binned = np.array([
-        np.average(data[slice_list]) for slice_list in slices
-    ])
-
-    return binned
-
-
-def box_average(data: np.ndarray, window_size: int) -> np.ndarray:
-    """Simple box average"""
-    start = 0
-    end = window_size
-    box_averages = []
-
-    # Loop through the array
-    while end <= data.shape[0]:
-
-        # Calculate the average of current window
-        box_average = np.sum(data[start:end]) / window_size
-        box_averages.append(box_average)
-
-        # Shift window
-        start = end
-        end += window_size
-
-    return box_averages
-
-
-def make_resolution_ids(wavelength: np.ndarray, target_r: int) -> np.ndarray:
-    """Create lists for slices correspinding to a certain resolution value."""
-    # Some initial values
-    start = 0
-    end = 1
-    r_tol = 1e-2
-    result = []
+def chunked_bin_data(
+        bin_type: str, bin_info: int,
+        wavenumber: h5.Dataset, xsec_slab: h5.Dataset,
+        slab_idx: tuple, chunk_size: int
+) -> tuple:
+    """
+    Same binning as 'wrap_bin_data', but reading the wavenumber range of a
+    single (p, T) slab in chunks. Bin sums and counts are accumulated, so
+    memory is bounded by the chunk size and the number of output bins.
+    """
+    sample_number = wavenumber.shape[0]
 
-    while end <= wavelength.shape[0]:
-        current_r = 15000
+    if bin_type.lower() == "resolution":
+        info_str = f"Binned using R={bin_info}"
 
-        # Only using tolerance, break as soon as R is overshot
-        while current_r - target_r > r_tol and current_r > target_r:
+        # Anchor all chunks to the same bin edges via the first wavelength
+        reference = 1 / (wavenumber[0] * 1e2)
+        last_wavelength = 1 / (wavenumber[-1] * 1e2)
+        bin_number = binning.resolution_bin_ids(
+            np.array([reference, last_wavelength]), bin_info
+        )[-1] + 1
 
-            # Slice into data and calculate resolution
-            data_slice = wavelength[start:end + 1]
-            lambda_central = np.average(data_slice)
-            lambda_span = abs(data_slice[-1] - data_slice[0])
-            current_r = lambda_central / lambda_span
+    elif bin_type.lower() == "box":
+        info_str = f"Binned box of size {bin_info}"
+        bin_number = sample_number // bin_info
+
+    wavel_sum = np.zeros(bin_number)
+    xsec_sum = np.zeros(bin_number)
+    bin_counts = np.zeros(bin_number)
+
+    for start in range(0, sample_number, chunk_size):
+        stop = min(start + chunk_size, sample_number)
+        wavel = 1 / (wavenumber[start:stop] * 1e2)
+        xsec = xsec_slab[(*slab_idx, slice(start, stop))]
+
+        if bin_type.lower() == "resolution":
+            bin_ids = binning.resolution_bin_ids(
+                wavel, bin_info, reference=reference
+            )
+        elif bin_type.lower() == "box":
+            bin_ids = np.arange(start, stop) // bin_info
+
+        # Incomplete trailing boxes (ids beyond 'bin_number') are dropped,
+        # as in 'box_average'
+        wavel_sum += binning.bin_sums(wavel, bin_ids, bin_number)
+        xsec_sum += binning.bin_sums(xsec, bin_ids, bin_number)
+        bin_counts += binning.bin_counts(bin_ids, bin_number)
+
+    # Skip bins that did not receive any samples
+    filled = bin_counts > 0
+    wavel_bin = wavel_sum[filled] / bin_counts[filled]
+    xsec_bin = xsec_sum[filled] / bin_counts[filled]
 
-            # Iterate into next slice size
-            end += 1
+    return info_str, wavel_bin, xsec_bin
 
-            # Stop if max. array length is reached
-            if end == wavelength.shape[0]:
-                break
 
-        # Add to list of slice indices
-        slice_idxs = [idx for idx in range(start, end)]
-        result.append(slice_idxs)
+def bracket_grid(grid: np.ndarray, targets: np.ndarray) -> tuple:
+    """
+    Lower and upper grid indices bracketing each target, and the linear
+    weight of the upper index. Targets outside the grid are clipped to it.
+    """
+    if grid.shape[0] == 1:
+        zeros = np.zeros(targets.shape[0], dtype=int)
+        return zeros, zeros, np.zeros(targets.shape[0])
 
-        # Start next iteration
-        start = end
-        end += 1
+    targets = np.clip(targets, grid[0], grid[-1])
+    lower = np.clip(
+        np.searchsorted(grid, targets, side="right") - 1, 0, grid.shape[0] - 2
+    )
+    upper = lower + 1
+    weight = (targets - grid[lower]) / (grid[upper] - grid[lower])
 
-    return result
+    return lower, upper, weight
 
 
 def make_latex_string(string: str) -> str:
@@ -1,10 +1,26 @@
 # Compare WASP-39 b data: Spitzer, HST, full JWST coverage
 
+import os
+import sys
+
 import polars as pl
 import matplotlib.pyplot as plt
 
+import spectral_rebin as sr
 import util as u
 
+# Shared binning and figure export live in 'common' at the top of the
+# repository
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"
+))
+import binning  # noqa: E402
+import figure_export  # noqa: E402
+
+# GLOBALS: common wavelength grid of the stitched spectra
+STITCH_RESOLUTION = 50
+STITCH_RANGE = (.2, 5.4)
+
 
 def set_plot():
     figure, axis = plt.subplots(figsize=(10, 4))
@@ -17,25 +33,35 @@ def set_plot():
     return figure, axis
 
 
-def wrap_finish(figure, save_name):
+def wrap_finish(figure, save_name, exporter):
     figure.tight_layout()
-    figure.savefig(f"spectra_{save_name}.png", dpi=600)
+    exporter.submit(figure, f"spectra_{save_name}.png", dpi=600)
 
 
 def main():
     col_pre = wrap_collected_spectra("pre-JWST")
     col_post = wrap_collected_spectra("post-JWST")
 
-    fig, ax = set_plot()
-    plot_separated(col_pre, ax)
-    ax.legend(loc="lower right")
-    wrap_finish(fig, "pre-JWST")
-    
-    fig, ax = set_plot()
-    plot_together(col_post, ax)
-    plot_separated(col_pre, ax)
-    ax.legend(loc="lower right")
-    wrap_finish(fig, "post-JWST")
+    # Both figures are rendered in parallel
+    with figure_export.FigureExporter() as exporter:
+        fig, ax = set_plot()
+        plot_separated(col_pre, ax)
+        ax.legend(loc="lower right")
+        wrap_finish(fig, "pre-JWST", exporter)
+
+        fig, ax = set_plot()
+        plot_together(col_post, ax)
+        plot_separated(col_pre, ax)
+        ax.legend(loc="lower right")
+        wrap_finish(fig, "post-JWST", exporter)
+
+        # Both epochs aligned and combined on the same wavelength grid
+        edges = binning.resolution_edges(*STITCH_RANGE, STITCH_RESOLUTION)
+        fig, ax = set_plot()
+        plot_stitched(col_post, ax, edges, c="k", label="post-JWST")
+        plot_stitched(col_pre, ax, edges, c="C3", label="pre-JWST")
+        ax.legend(loc="lower right")
+        wrap_finish(fig, "stitched", exporter)
 
 
 def wrap_collected_spectra(folder):
@@ -51,42 +77,46 @@ def wrap_collected_spectra(folder):
 
         try:
             collection.append(
-                u.SpectralData(f"{folder}/{name}", reference=ref)
+                u.SpectralData(
+                    f"{folder}/{name}", reference=ref,
+                    instrument=temp_data["INSTRUMENT"]
+                )
             )
         except FileNotFoundError:
             print(f"FILE {name} NOT FOUND\n")
 
-    return collection
+    # All spectra of the folder in one array-backed collection
+    return u.SpectralCollection.from_spectra(collection)
 
 
 def plot_separated(collection, axis):
-    for spectrum in collection:
-        axis.errorbar(
-            spectrum.lam_cen, spectrum.td,
-            xerr=spectrum.lam_err,
-            yerr=[spectrum.td_err_pos, spectrum.td_err_neg],
-            ms=4, fmt="o", label=spectrum.ref
+    # One artist (and colour) per publication
+    for reference in collection.reference_names:
+        collection.select(references=[reference]).errorbar(
+            axis, ms=4, fmt="o", label=reference
         )
 
     return None
 
 
 def plot_together(collection, axis):
-    spectrum = collection[0]
-    axis.errorbar(
-        spectrum.lam_cen, spectrum.td,
-        xerr=spectrum.lam_err,
-        yerr=[spectrum.td_err_pos, spectrum.td_err_neg],
-        ms=4, fmt="o", label=spectrum.ref, c="k"
+    # All spectra at once, labelled with the first publication
+    collection.errorbar(
+        axis, ms=4, fmt="o", c="k",
+        label=collection.reference_names[collection.reference_idx[0]]
     )
 
-    for spectrum in collection[1:]:
-        axis.errorbar(
-            spectrum.lam_cen, spectrum.td,
-            xerr=spectrum.lam_err,
-            yerr=[spectrum.td_err_pos, spectrum.td_err_neg],
-            ms=4, fmt="o", c="k"
-        )
+    return None
+
+
+def plot_stitched(collection, axis, edges, **kwargs):
+    stitched = sr.stitch_spectra(collection, edges)
+
+    axis.errorbar(
+        stitched["lam_cen"], stitched["td"],
+        xerr=stitched["lam_err"], yerr=stitched["td_err_pos"],
+        ms=4, fmt="o", **kwargs
+    )
 
     return None
 
@@ -0,0 +1,242 @@
+import numpy as np
+
+import util as u
+
+# Spectra are rebinned by overlap: every data point covers the wavelength
+# bin 'lam_cen +- lam_err', and contributes to a target bin in proportion to
+# the overlapping wavelength range. For an averaged quantity like the
+# transit depth this conserves its integral over wavelength. Asymmetric
+# errors are symmetrised (mean of both sides) for the weighting.
+#
+# A point that only partly overlaps a target bin (e.g. a wide photometric
+# band spread over several narrow bins) only measured that part with the
+# fraction f = overlap / width of its range. Its variance in that bin is
+# inflated to sigma^2 / f, so that the bins together carry the weight of
+# the single point, instead of the full point once per bin. Points without
+# a wavelength range (zero or missing bandwidth) have no overlap with any
+# bin, and are rejected instead of silently left out.
+
+
+def overlap_pairs(
+        lower: np.ndarray, upper: np.ndarray, target_edges: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Wavelength overlap of source bins and target bins. Every source bin only
+    overlaps a few target bins, so only those (source, target) pairs are
+    kept, instead of a dense (source x target) matrix.
+
+    :return:
+        Source indices, target indices, and their overlap
+    """
+    n_target = target_edges.size - 1
+
+    # Range of target bins touched by every source bin
+    first = np.clip(
+        np.searchsorted(target_edges, lower, side="right") - 1, 0, n_target
+    )
+    last = np.clip(
+        np.searchsorted(target_edges, upper, side="left"), 0, n_target
+    )
+    counts = np.maximum(last - first, 0)
+
+    source = np.repeat(np.arange(lower.size), counts)
+    target = first[source] + (
+        np.arange(source.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    )
+    overlap = (
+        np.minimum(upper[source], target_edges[target + 1])
+        - np.maximum(lower[source], target_edges[target])
+    )
+
+    keep = overlap > 0
+
+    return source[keep], target[keep], overlap[keep]
+
+
+def weighted_rebin(
+        pairs: tuple[np.ndarray, np.ndarray, np.ndarray],
+        values: np.ndarray,
+        variance: np.ndarray,
+        n_target: int,
+        groups: np.ndarray = None,
+        n_groups: int = 1
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Weighted mean of the source values in every target bin, and its
+    variance sum(w^2 sigma^2) / (sum w)^2. With groups (the spectrum of
+    every source point), every group is rebinned separately. Target bins
+    without any data are NaN.
+
+    :param pairs:       Source indices, target indices and weights
+    :param values:      Source values
+    :param variance:    Variance of every (source, target) pair
+    :param n_target:    Number of target bins
+    :param groups:      Group index of every source point
+    :param n_groups:    Number of groups
+
+    :return:
+        Mean and variance, as (group x target) arrays
+    """
+    source, target, weights = pairs
+
+    # All groups at once, on a flattened (group x target) grid
+    bins = target if groups is None else groups[source] * n_target + target
+    size = n_groups * n_target
+
+    weight_sum, numerator, variance_sum = (
+        np.bincount(bins, weights=bin_weights, minlength=size).reshape(
+            n_groups, n_target
+        )
+        for bin_weights in (
+            weights, weights * values[source],
+            weights ** 2 * variance
+        )
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(weight_sum > 0, numerator / weight_sum, np.nan)
+        variance = np.where(
+            weight_sum > 0, variance_sum / weight_sum ** 2, np.nan
+        )
+
+    return mean, variance
+
+
+def collection_weights(
+        collection: u.SpectralCollection,
+        target_edges: np.ndarray,
+        inverse_variance: bool = False
+) -> tuple[tuple[np.ndarray, np.ndarray, np.ndarray], np.ndarray]:
+    """
+    Overlap weights (source, target, weight) of all data points, and the
+    (symmetric) variance of every pair, inflated by the inverse fraction
+    of the source range that falls into the target bin.
+    """
+    variance = (0.5 * (collection.td_err_pos + collection.td_err_neg)) ** 2
+    lower = collection.lam_cen - collection.lam_err
+    upper = collection.lam_cen + collection.lam_err
+
+    # Points without a finite value or error do not contribute
+    valid = np.isfinite(collection.td) & np.isfinite(variance)
+    if inverse_variance:
+        valid &= variance > 0
+
+    no_range = valid & ~(collection.lam_err > 0)
+    if np.any(no_range):
+        raise ValueError(
+            f"{no_range.sum()} data point(s) without a wavelength range "
+            f"(e.g. at {collection.lam_cen[no_range][0]} micron) cannot be "
+            f"rebinned by overlap"
+        )
+
+    source, target, overlap = overlap_pairs(lower, upper, target_edges)
+    keep = valid[source]
+    source, target, overlap = source[keep], target[keep], overlap[keep]
+
+    # Share of every point in a bin (see top of module)
+    pair_variance = variance[source] * (upper - lower)[source] / overlap
+
+    weights = overlap / pair_variance if inverse_variance else overlap
+
+    return (source, target, weights), pair_variance
+
+
+def rebin_spectra(
+        collection: u.SpectralCollection, target_edges: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Flux-conserving rebin of every spectrum of a collection onto the same
+    target bins.
+
+    :return:
+        Transit depth and its variance, as (spectrum x target) arrays
+    """
+    pairs, variance = collection_weights(collection, target_edges)
+
+    return weighted_rebin(
+        pairs, np.nan_to_num(collection.td), variance,
+        n_target=target_edges.size - 1,
+        groups=collection.source, n_groups=len(collection)
+    )
+
+
+def combine_spectra(
+        collection: u.SpectralCollection,
+        target_edges: np.ndarray,
+        spectrum_offsets: np.ndarray = None
+) -> dict[str, np.ndarray]:
+    """
+    Combine all spectra of a collection into one spectrum on the target
+    bins: overlap-weighted and inverse-variance weighted mean of all data
+    points (optionally after adding a depth offset to every spectrum).
+
+    :return:
+        Dictionary with the keys of 'SpectralData' (symmetric errors)
+    """
+    depth = np.nan_to_num(collection.td)
+    if spectrum_offsets is not None:
+        depth = depth + spectrum_offsets[collection.source]
+
+    pairs, variance = collection_weights(
+        collection, target_edges, inverse_variance=True
+    )
+    combined, combined_variance = weighted_rebin(
+        pairs, depth, variance, n_target=target_edges.size - 1
+    )
+
+    error = np.sqrt(combined_variance[0])
+
+    return {
+        "lam_cen": 0.5 * (target_edges[1:] + target_edges[:-1]),
+        "lam_err": 0.5 * np.diff(target_edges),
+        "td": combined[0],
+        "td_err_pos": error,
+        "td_err_neg": error,
+    }
+
+
+def align_offsets(
+        collection: u.SpectralCollection,
+        target_edges: np.ndarray,
+        reference: int = None
+) -> np.ndarray:
+    """
+    Depth offsets that align every spectrum with a reference spectrum (by
+    default the one with the widest wavelength coverage), from the
+    inverse-variance weighted mean difference in their common target bins.
+    Spectra that do not overlap the reference get no offset.
+    """
+    depth, variance = rebin_spectra(collection, target_edges)
+
+    if reference is None:
+        reference = np.argmax(np.isfinite(depth).sum(axis=1))
+
+    # Differences to the reference in all shared bins, for all spectra
+    difference = depth[reference] - depth
+    weight = 1 / (variance[reference] + variance)
+    shared = np.isfinite(difference) & np.isfinite(weight)
+
+    weight_sum = np.where(shared, weight, 0).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        offsets = np.where(shared, weight * difference, 0).sum(axis=1) / (
+            weight_sum
+        )
+
+    return np.where(weight_sum > 0, offsets, 0.)
+
+
+def stitch_spectra(
+        collection: u.SpectralCollection,
+        target_edges: np.ndarray,
+        align: bool = True,
+        reference: int = None
+) -> dict[str, np.ndarray]:
+    """Align the spectra of a collection, and combine them on the bins."""
+    spectrum_offsets = (
+        align_offsets(collection, target_edges, reference=reference)
+        if align else None
+    )
+
+    return combine_spectra(
+        collection, target_edges, spectrum_offsets=spectrum_offsets
+    )
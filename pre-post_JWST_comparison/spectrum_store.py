@@ -0,0 +1,155 @@
+import hashlib
+import os
+import sys
+
+import numpy as np
+
+# Atomic file writes live in 'common' at the top of the repository
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"
+))
+import atomic_write  # noqa: E402
+
+# GLOBALS
+STORE_DIRECTORY = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".spectrum_store"
+)
+SPECTRUM_COLUMNS = [
+    "CENTRALWAVELNG", "BANDWIDTH", "PL_TRANDEP", "PL_TRANDEPERR1",
+    "PL_TRANDEPERR2"
+]
+NUMERIC_TYPES = ("double", "float", "real", "int", "long")
+
+
+def load_spectrum(
+        filename: str, columns: list[str] = SPECTRUM_COLUMNS
+) -> dict[str, np.ndarray]:
+    """
+    Columns of an IPAC spectrum table. Each table is only parsed once; the
+    columns are kept as a single structured .npy array in the store, keyed
+    by the path and modification time of the table.
+    """
+    store_file = store_path(filename)
+
+    if os.path.isfile(store_file):
+        stored = np.load(store_file)
+
+        if all(column in stored.dtype.names for column in columns):
+            return {column: stored[column] for column in columns}
+
+        # Keep the columns stored so far, together with the new ones
+        columns = list(dict.fromkeys([*stored.dtype.names, *columns]))
+
+    spectrum = read_ipac_columns(filename, columns)
+    write_entry(filename, store_file, spectrum)
+
+    return spectrum
+
+
+def store_path(filename: str) -> str:
+    """Store file of a table, named after its path and modification time."""
+    filename = os.path.abspath(filename)
+    digest = hashlib.sha1(
+        f"{filename}:{os.stat(filename).st_mtime_ns}".encode("utf-8")
+    )
+
+    return os.path.join(
+        STORE_DIRECTORY,
+        f"{path_prefix(filename)}_{digest.hexdigest()[:12]}.npy"
+    )
+
+
+def path_prefix(filename: str) -> str:
+    """Part of the store file name that only depends on the table path."""
+    digest = hashlib.sha1(os.path.abspath(filename).encode("utf-8"))
+    stem = os.path.splitext(os.path.basename(filename))[0]
+
+    return f"{stem}_{digest.hexdigest()[:8]}"
+
+
+def write_entry(
+        filename: str, store_file: str, spectrum: dict[str, np.ndarray]
+) -> None:
+    """
+    Write the columns as one structured array (to a temporary file first,
+    then moved in place), and drop entries of older versions of the table.
+    """
+    os.makedirs(STORE_DIRECTORY, exist_ok=True)
+
+    stored = np.empty(
+        len(next(iter(spectrum.values()))),
+        dtype=[(column, values.dtype) for column, values in spectrum.items()]
+    )
+    for column, values in spectrum.items():
+        stored[column] = values
+
+    with atomic_write.replacing_file(store_file, "wb") as f:
+        np.save(f, stored)
+
+    prefix = path_prefix(filename)
+    for entry in os.listdir(STORE_DIRECTORY):
+        if (
+                entry.startswith(prefix) and entry.endswith(".npy")
+                and entry != os.path.basename(store_file)
+        ):
+            os.remove(os.path.join(STORE_DIRECTORY, entry))
+
+    return None
+
+
+def read_ipac_columns(
+        filename: str, columns: list[str]
+) -> dict[str, np.ndarray]:
+    """
+    Read selected columns of an IPAC table. Column boundaries are taken
+    from the '|' delimiters of the header, so that only the requested
+    fields of each row are sliced out and converted. Null values become
+    NaN in numeric columns.
+    """
+    with open(filename) as f:
+        lines = [
+            line.rstrip("\n") for line in f
+            if line.strip() and not line.startswith("\\")
+        ]
+
+    header = [line for line in lines[:4] if line.startswith("|")]
+    data_lines = lines[len(header):]
+
+    # Field of every column: between its two delimiters (as in astropy)
+    pipes = [idx for idx, char in enumerate(header[0]) if char == "|"]
+    fields = {
+        header[0][start + 1:end].strip(): (start + 1, end)
+        for start, end in zip(pipes[:-1], pipes[1:])
+    }
+
+    missing_columns = [column for column in columns if column not in fields]
+    if missing_columns:
+        raise KeyError(f"Columns {missing_columns} not in '{filename}'")
+
+    spectrum = {}
+    for column in columns:
+        start, end = fields[column]
+        column_type = header_entry(header, 1, start, end)
+        null_value = header_entry(header, 3, start, end) or "null"
+
+        values = np.char.strip(
+            np.array([line[start:end] for line in data_lines], dtype=str)
+        )
+
+        if column_type.startswith(NUMERIC_TYPES):
+            values[(values == null_value) | (values == "")] = "nan"
+            values = values.astype(float)
+
+        spectrum[column] = values
+
+    return spectrum
+
+
+def header_entry(
+        header: list[str], line_idx: int, start: int, end: int
+) -> str:
+    """Entry of one column in a header line (type, unit or null value)."""
+    if line_idx >= len(header):
+        return ""
+
+    return header[line_idx][start:end].strip()
@@ -1,27 +1,172 @@
-import astropy.io.ascii as ascii
-import polars as pl
 import matplotlib.pyplot as plt
+import numpy as np
+
+import spectrum_store
 
 
 class SpectralData:
     """Read individual spectral data from the EPA (as IPAC tables)"""
-    def __init__(self, filename: str, reference: str) -> None:
+    __slots__ = (
+        "ref", "instrument", "lam_cen", "lam_err", "td", "td_err_pos",
+        "td_err_neg"
+    )
+
+    def __init__(
+            self, filename: str, reference: str, instrument: str = ""
+    ) -> None:
         self.ref = reference
+        self.instrument = instrument
 
         # Of course, give me an IPAC table, I've certainly used that before
-        full_data = pl.DataFrame(ascii.read(filename).to_pandas())
+        # (parsed only once, then served from the spectrum store)
+        full_data = spectrum_store.load_spectrum(filename)
 
         # Extract useful parameters
-        self.lam_cen = full_data["CENTRALWAVELNG"].to_numpy()
-        self.lam_err = full_data["BANDWIDTH"].to_numpy() / 2
-        self.td = full_data["PL_TRANDEP"].to_numpy()
-        self.td_err_pos = full_data["PL_TRANDEPERR1"].to_numpy()
-        self.td_err_neg = full_data["PL_TRANDEPERR2"].to_numpy() * -1
+        self.lam_cen = full_data["CENTRALWAVELNG"]
+        self.lam_err = full_data["BANDWIDTH"] / 2
+        self.td = full_data["PL_TRANDEP"]
+        self.td_err_pos = full_data["PL_TRANDEPERR1"]
+        self.td_err_neg = full_data["PL_TRANDEPERR2"] * -1
 
     def __str__(self) -> str:
         return self.ref
 
 
+class SpectralCollection:
+    """
+    Many spectra packed into contiguous (ragged) arrays: the data points of
+    spectrum i are 'offsets[i]:offsets[i + 1]' of every data array, and
+    'source' holds the spectrum index of every data point. References and
+    instruments are stored once, and indexed per spectrum.
+    """
+    __slots__ = (
+        "lam_cen", "lam_err", "td", "td_err_pos", "td_err_neg", "offsets",
+        "source", "reference_names", "reference_idx", "instrument_names",
+        "instrument_idx"
+    )
+    DATA_FIELDS = ("lam_cen", "lam_err", "td", "td_err_pos", "td_err_neg")
+
+    def __init__(
+            self,
+            data: dict[str, np.ndarray],
+            offsets: np.ndarray,
+            reference_names: np.ndarray,
+            reference_idx: np.ndarray,
+            instrument_names: np.ndarray,
+            instrument_idx: np.ndarray
+    ) -> None:
+        for field in self.DATA_FIELDS:
+            setattr(self, field, np.asarray(data[field], dtype=float))
+
+        self.offsets = np.asarray(offsets, dtype=int)
+        self.source = np.repeat(
+            np.arange(self.offsets.size - 1), np.diff(self.offsets)
+        )
+        self.reference_names = reference_names
+        self.reference_idx = np.asarray(reference_idx, dtype=int)
+        self.instrument_names = instrument_names
+        self.instrument_idx = np.asarray(instrument_idx, dtype=int)
+
+    @classmethod
+    def from_spectra(cls, spectra: list[SpectralData]):
+        """Pack individual spectra into one collection."""
+        reference_names, reference_idx = name_index(
+            [spectrum.ref for spectrum in spectra]
+        )
+        instrument_names, instrument_idx = name_index(
+            [spectrum.instrument for spectrum in spectra]
+        )
+
+        return cls(
+            data={
+                field: np.concatenate(
+                    [getattr(spectrum, field) for spectrum in spectra]
+                ) if spectra else np.empty(0)
+                for field in cls.DATA_FIELDS
+            },
+            offsets=np.cumsum(
+                [0] + [spectrum.td.size for spectrum in spectra]
+            ),
+            reference_names=reference_names,
+            reference_idx=reference_idx,
+            instrument_names=instrument_names,
+            instrument_idx=instrument_idx
+        )
+
+    def __len__(self) -> int:
+        return self.offsets.size - 1
+
+    def select(
+            self,
+            wavelength_range: tuple[float, float] = None,
+            sources: list[int] = None,
+            references: list[str] = None,
+            instruments: list[str] = None
+    ):
+        """
+        Sub-collection of the data points within a wavelength range, and/or
+        of the given spectra (by index, reference or instrument). Spectra
+        without any remaining data points are dropped.
+        """
+        keep = np.ones(self.td.size, dtype=bool)
+
+        if wavelength_range is not None:
+            keep &= (
+                (self.lam_cen >= wavelength_range[0])
+                & (self.lam_cen <= wavelength_range[1])
+            )
+
+        # Per-spectrum conditions, broadcast to the data points
+        selected = np.ones(len(self), dtype=bool)
+        if sources is not None:
+            selected &= np.isin(np.arange(len(self)), sources)
+        if references is not None:
+            selected &= np.isin(self.reference_names, references)[
+                self.reference_idx
+            ]
+        if instruments is not None:
+            selected &= np.isin(self.instrument_names, instruments)[
+                self.instrument_idx
+            ]
+        keep &= selected[self.source]
+
+        kept_sources, counts = np.unique(
+            self.source[keep], return_counts=True
+        )
+
+        return SpectralCollection(
+            data={
+                field: getattr(self, field)[keep]
+                for field in self.DATA_FIELDS
+            },
+            offsets=np.concatenate([[0], np.cumsum(counts)]),
+            reference_names=self.reference_names,
+            reference_idx=self.reference_idx[kept_sources],
+            instrument_names=self.instrument_names,
+            instrument_idx=self.instrument_idx[kept_sources]
+        )
+
+    def errorbar(self, axis: plt.Axes, **kwargs):
+        """Draw all spectra of the collection as one errorbar artist."""
+        return axis.errorbar(
+            self.lam_cen, self.td,
+            xerr=self.lam_err,
+            yerr=[self.td_err_pos, self.td_err_neg],
+            **kwargs
+        )
+
+
+def name_index(names: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Unique names (in order of appearance), and the index of each name."""
+    unique_names = list(dict.fromkeys(names))
+    lookup = {name: idx for idx, name in enumerate(unique_names)}
+
+    return (
+        np.array(unique_names, dtype=str),
+        np.array([lookup[name] for name in names], dtype=int)
+    )
+
+
 def set_figure(size: tuple):
     figure, axis = plt.subplots(figsize=size)
     axis.set(
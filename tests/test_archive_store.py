@@ -0,0 +1,88 @@
+import datetime
+import json
+import os
+import sys
+
+import polars as pl
+import pytest
+
+# The archive store lives in 'exoplanet_inventory'
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(REPOSITORY, "exoplanet_inventory"))
+import archive_store  # noqa: E402
+
+# Recorded answers of the archive: a full query (4 planets, last update
+# 2024-05-01), and the incremental query since then (K2-18 b updated,
+# TOI-270 d new)
+RESPONSE_DIRECTORY = os.path.join(
+    REPOSITORY, "tests", "fixtures", "archive_responses"
+)
+
+
+@pytest.fixture
+def store_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive_store, "STORE_DIRECTORY", str(tmp_path))
+
+    return tmp_path
+
+
+def test_full_then_incremental_update(store_directory):
+    service = archive_store.RecordedTAPService(RESPONSE_DIRECTORY)
+    today = datetime.datetime.now().strftime("%Y-%m-%d")
+
+    # Full update
+    archive_store.update_snapshot(tap_service=service)
+    snapshot = pl.read_parquet(archive_store.latest_snapshot())
+
+    assert snapshot.schema == pl.Schema(archive_store.ARCHIVE_SCHEMA)
+    assert sorted(snapshot["pl_name"]) == [
+        "HD 209458 b", "K2-18 b", "OGLE-2005-BLG-390L b", "WASP-39 b"
+    ]
+    assert archive_store.read_index()["snapshots"][0]["last_sync"] == (
+        "2024-05-01"
+    )
+
+    # Incremental update: only the changed rows are queried and merged
+    archive_store.update_snapshot(tap_service=service, incremental=True)
+    merged = pl.read_parquet(archive_store.latest_snapshot())
+
+    assert sorted(merged["pl_name"]) == [
+        "HD 209458 b", "K2-18 b", "OGLE-2005-BLG-390L b", "TOI-270 d",
+        "WASP-39 b"
+    ]
+    k2_18 = merged.filter(pl.col("pl_name") == "K2-18 b").row(0, named=True)
+    assert k2_18["pl_rade"] == 2.61
+    assert k2_18["pl_masse"] == 8.92
+    assert k2_18["rowupdate"] == datetime.date(2024, 6, 2)
+
+    # Unchanged planets keep their values (and missing values stay null)
+    ogle = merged.filter(
+        pl.col("pl_name") == "OGLE-2005-BLG-390L b"
+    ).row(0, named=True)
+    assert ogle["pl_rade"] is None
+    assert ogle["pl_masse"] == 5.5
+
+    with open(os.path.join(store_directory, "changelog.jsonl")) as f:
+        changes = [json.loads(line) for line in f]
+    assert changes == [{
+        "date": today, "since": "2024-05-01",
+        "added": ["TOI-270 d"], "updated": ["K2-18 b"],
+    }]
+
+    # Both snapshots were taken today, so the second replaces the first
+    with open(os.path.join(store_directory, "index.json")) as f:
+        index = json.load(f)
+    assert index["snapshots"] == [{
+        "file": f"ps_{today}.parquet",
+        "queried": today,
+        "last_sync": "2024-06-03",
+        "rows": 5,
+        "columns": list(archive_store.ARCHIVE_SCHEMA),
+    }]
+
+
+def test_unrecorded_query_without_live_service(tmp_path):
+    service = archive_store.RecordedTAPService(str(tmp_path))
+
+    with pytest.raises(FileNotFoundError):
+        service.search("SELECT pl_name FROM ps")
@@ -0,0 +1,79 @@
+import json
+import os
+import sys
+
+import pytest
+
+# The parameter backends of 'exoplanet_transit_cord'
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(REPOSITORY, "exoplanet_transit_cord"))
+from modules import backends  # noqa: E402
+
+ROW = {"pl_name": "WASP-39 b", "pl_rade": 14.3}
+
+
+class FakeBackend:
+    """Backend knowing a single planet, counting the queried names."""
+    def __init__(self, offline: bool = False) -> None:
+        self.offline = offline
+        self.queried = []
+
+    def fetch(self, planet_names: list[str]) -> dict[str, dict]:
+        if self.offline:
+            raise OSError("archive not reachable")
+
+        self.queried.extend(planet_names)
+        return {
+            name.lower(): ROW for name in planet_names
+            if name.lower() == "wasp-39 b"
+        }
+
+
+def test_unknown_planets_are_cached(tmp_path):
+    backend = FakeBackend()
+    cached = backends.CachedBackend(
+        backend, cache_file=str(tmp_path / "cache.json")
+    )
+
+    assert cached.fetch(["WASP-39 b", "Unknown b"]) == {"wasp-39 b": ROW}
+    assert cached.fetch(["WASP-39 b", "Unknown b"]) == {"wasp-39 b": ROW}
+    assert backend.queried == ["WASP-39 b", "Unknown b"]
+
+
+def test_expired_entries_used_offline(tmp_path):
+    cache_file = str(tmp_path / "cache.json")
+    backends.CachedBackend(FakeBackend(), cache_file=cache_file).fetch(
+        ["WASP-39 b"]
+    )
+
+    # Expired, but the backend cannot be reached
+    cached = backends.CachedBackend(
+        FakeBackend(offline=True), cache_file=cache_file, ttl=-1
+    )
+    assert cached.fetch(["WASP-39 b"]) == {"wasp-39 b": ROW}
+
+    # Without any cached entry, the failure is not hidden
+    with pytest.raises(OSError):
+        cached.fetch(["Unknown b"])
+
+
+def test_interrupted_write_keeps_cache(tmp_path, monkeypatch):
+    cache_file = str(tmp_path / "cache.json")
+    backends.CachedBackend(FakeBackend(), cache_file=cache_file).fetch(
+        ["WASP-39 b"]
+    )
+
+    # The run is interrupted half-way through writing the cache
+    def interrupted_dump(obj, f):
+        f.write("{")
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(backends.json, "dump", interrupted_dump)
+    with pytest.raises(KeyboardInterrupt):
+        backends.CachedBackend(FakeBackend(), cache_file=cache_file).fetch(
+            ["Unknown b"]
+        )
+
+    with open(cache_file) as f:
+        assert set(json.load(f)) == {"wasp-39 b"}
+    assert os.listdir(tmp_path) == ["cache.json"]
@@ -0,0 +1,413 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The shared binning of 'common'
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(REPOSITORY, "common"))
+import binning  # noqa: E402
+
+# Random inputs are drawn for every seed, with NaN and empty bins
+SEEDS = range(10)
+TAILS = ["drop", "pad", "partial"]
+
+
+# REFERENCES: the loop implementations that 'binning' replaced, as they
+# were in the light-curve examples and the cross-section preparation
+def loop_box_median(array, binsize):
+    median_array = []
+
+    bin_start = 0
+    bin_end = binsize
+    number_array_elements = array.shape[0]
+
+    while bin_end < number_array_elements - binsize:
+        temporary_array = array[bin_start:bin_end]
+        median_array.append(np.nanmedian(temporary_array))
+
+        bin_start = bin_end
+        bin_end += binsize
+
+    return np.array(median_array)
+
+
+def loop_wam(data, error, binsize):
+    wam_array = []
+    wam_error = []
+
+    bin_start = 0
+    bin_end = binsize
+    number_array_elements = data.shape[0]
+
+    while bin_end < number_array_elements - binsize:
+        temporary_data = data[bin_start:bin_end]
+        temporary_error = error[bin_start:bin_end]
+        weights = 1 / temporary_error ** 2
+
+        wam_array.append(
+            np.sum(temporary_data * weights) / np.sum(weights)
+        )
+        wam_error.append(1 / np.sqrt(np.sum(weights)))
+
+        bin_start = bin_end
+        bin_end += binsize
+
+    return np.array(wam_array), np.array(wam_error)
+
+
+def loop_box_average(data, window_size):
+    start = 0
+    end = window_size
+    box_averages = []
+
+    while end <= data.shape[0]:
+        box_averages.append(np.sum(data[start:end]) / window_size)
+
+        start = end
+        end += window_size
+
+    return np.array(box_averages)
+
+
+def loop_index_list_average(data, slices):
+    return np.array([
+        np.average(data[slice_list]) for slice_list in slices
+    ])
+
+
+def loop_resolution_ids(wavelength, target_r):
+    start = 0
+    end = 1
+    r_tol = 1e-2
+    result = []
+
+    while end <= wavelength.shape[0]:
+        current_r = 15000
+
+        # Only using tolerance, break as soon as R is overshot
+        while current_r - target_r > r_tol and current_r > target_r:
+            data_slice = wavelength[start:end + 1]
+            lambda_central = np.average(data_slice)
+            lambda_span = abs(data_slice[-1] - data_slice[0])
+            current_r = lambda_central / lambda_span
+
+            end += 1
+            if end == wavelength.shape[0]:
+                break
+
+        result.append([idx for idx in range(start, end)])
+
+        start = end
+        end += 1
+
+    return result
+
+
+def loop_bin_reduce(data, bin_ids, n_bins, reducer):
+    """Reduce every bin with a function of its samples (NaN if empty)."""
+    return np.array([
+        reducer(data[bin_ids == idx]) if np.any(bin_ids == idx) else np.nan
+        for idx in range(n_bins)
+    ])
+
+
+# HELPERS
+def random_series(rng, n_samples, nan_fraction=0.1):
+    """Values and errors, with NaN in both at random positions."""
+    data = rng.normal(1, 0.01, n_samples)
+    error = rng.uniform(0.001, 0.01, n_samples)
+    data[rng.random(n_samples) < nan_fraction] = np.nan
+    error[rng.random(n_samples) < nan_fraction / 2] = np.nan
+
+    return data, error
+
+
+def random_bin_ids(rng, n_samples, n_bins):
+    """
+    Unsorted bin ids, with some bins left empty and some samples outside
+    of [0, n_bins).
+    """
+    used = rng.choice(n_bins, size=max(n_bins // 2, 1), replace=False)
+    bin_ids = rng.choice(used, n_samples)
+    outside = rng.random(n_samples) < 0.05
+    bin_ids[outside] = rng.choice([-1, n_bins, n_bins + 3], outside.sum())
+
+    return bin_ids
+
+
+def wavelength_grid(n_samples, descending):
+    """Log-spaced wavelengths [m] (as a TauREx wavenumber grid reversed)."""
+    wavelength = np.geomspace(1e-6, 10e-6, n_samples)
+
+    return wavelength[::-1] if descending else wavelength
+
+
+def bin_resolving_power(wavelength, groups):
+    """
+    Resolving power of every bin from the wavelength range it covers, out
+    to half-way to the neighbouring samples (edge bins are left out).
+    """
+    middles = 0.5 * (wavelength[1:] + wavelength[:-1])
+
+    return np.array([
+        abs(0.5 * (middles[group[0] - 1] + middles[group[-1]])
+            / (middles[group[-1]] - middles[group[0] - 1]))
+        for group in groups
+        if group[0] > 0 and group[-1] < wavelength.size - 1
+    ])
+
+
+# BOXES
+@pytest.mark.parametrize("tail", TAILS)
+@pytest.mark.parametrize("n_samples", [1000, 1037])
+def test_box_reshape(tail, n_samples):
+    array = np.arange(2 * n_samples, dtype=float).reshape(2, n_samples)
+    boxes = binning.box_reshape(array, 100, tail)
+    remainder = n_samples % 100
+
+    n_bins = n_samples // 100 + (tail != "drop" and remainder > 0)
+    assert boxes.shape == (2, n_bins, 100)
+
+    # Complete bins hold the samples in order
+    complete = n_samples // 100
+    np.testing.assert_array_equal(
+        boxes[:, :complete].reshape(2, -1), array[:, :complete * 100]
+    )
+
+    # The trailing bin holds the remaining samples, then its fill value
+    if tail != "drop" and remainder > 0:
+        np.testing.assert_array_equal(
+            boxes[:, -1, :remainder], array[:, complete * 100:]
+        )
+        fill = boxes[:, -1, remainder:]
+        if tail == "pad":
+            np.testing.assert_array_equal(
+                fill, np.broadcast_to(array[:, -1:], fill.shape)
+            )
+        else:
+            assert np.all(np.isnan(fill))
+
+
+def test_box_reshape_unknown_tail():
+    with pytest.raises(ValueError):
+        binning.box_reshape(np.arange(10), 3, tail="wrap")
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_box_median_against_loop(seed):
+    rng = np.random.default_rng(seed)
+    data, _ = random_series(rng, 1037)
+
+    reference = loop_box_median(data, 100)
+    binned = {tail: binning.box_median(data, 100, tail) for tail in TAILS}
+
+    # The loop also dropped the last complete bin; NaN were already ignored
+    assert reference.size == 9
+    assert binned["drop"].size == 10
+    for tail in TAILS:
+        np.testing.assert_allclose(binned[tail][:9], reference)
+
+    # The trailing 37 samples: kept with "pad" and "partial"
+    np.testing.assert_allclose(
+        binned["partial"][-1], np.nanmedian(data[1000:])
+    )
+    np.testing.assert_allclose(
+        binned["pad"][-1],
+        np.nanmedian(np.append(data[1000:], [data[-1]] * 63))
+    )
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_box_weighted_mean_against_loop(seed):
+    rng = np.random.default_rng(seed)
+    data, error = random_series(rng, 1037)
+    mean, mean_error = binning.box_weighted_mean(data, error, 100, "partial")
+
+    # Without NaN, the bins the loop produced agree
+    clean = np.isfinite(data) & np.isfinite(error)
+    reference, reference_error = loop_wam(
+        np.where(clean, data, 1.), np.where(clean, error, 0.005), 100
+    )
+    clean_mean, clean_error = binning.box_weighted_mean(
+        np.where(clean, data, 1.), np.where(clean, error, 0.005), 100
+    )
+    np.testing.assert_allclose(clean_mean[:9], reference)
+    np.testing.assert_allclose(clean_error[:9], reference_error)
+
+    # With NaN, the loop returns NaN for the whole bin; now the NaN samples
+    # are left out, i.e. the loop result on only the finite samples
+    nan_reference, _ = loop_wam(data, error, 100)
+    assert np.all(np.isnan(nan_reference[
+        ~clean[:900].reshape(9, 100).all(axis=1)
+    ]))
+    for idx in range(mean.size):
+        window = slice(100 * idx, 100 * (idx + 1))
+        finite = clean[window]
+        weights = 1 / error[window][finite] ** 2
+        np.testing.assert_allclose(
+            mean[idx], np.sum(data[window][finite] * weights) / weights.sum()
+        )
+        np.testing.assert_allclose(mean_error[idx], 1 / np.sqrt(weights.sum()))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_box_average_against_loop(seed):
+    rng = np.random.default_rng(seed)
+    data, _ = random_series(rng, 1037)
+
+    # Same bins as the loop, and NaN propagate in both (NaN-aware only for
+    # the NaN-padded "partial" tail)
+    np.testing.assert_allclose(
+        binning.box_average(data, 100), loop_box_average(data, 100)
+    )
+
+    partial = binning.box_average(data, 100, "partial")
+    assert partial.size == 11
+    np.testing.assert_allclose(partial[-1], np.nanmean(data[1000:]))
+
+
+# CONSTANT RESOLUTION
+@pytest.mark.parametrize("descending", [True, False])
+def test_resolution_bin_ids(descending):
+    wavelength = wavelength_grid(5000, descending)
+    bin_ids = binning.resolution_bin_ids(wavelength, 100)
+
+    # Contiguous bins in sample order, without gaps
+    assert bin_ids[0] == 0
+    assert set(np.diff(bin_ids)) <= {0, 1}
+
+    # Every bin lies within its logarithmic edges from the first sample
+    log_step = binning.resolution_log_step(100)
+    log_distance = np.abs(np.log(wavelength / wavelength[0]))
+    assert np.all(log_distance >= bin_ids * log_step - 1e-12)
+    assert np.all(log_distance < (bin_ids + 1) * log_step + 1e-12)
+
+
+@pytest.mark.parametrize("descending", [True, False])
+@pytest.mark.parametrize("seed", SEEDS)
+def test_bin_id_average_against_loop(descending, seed):
+    rng = np.random.default_rng(seed)
+    wavelength = wavelength_grid(3000, descending)
+    xsec = rng.lognormal(0, 1, (2, wavelength.size))
+
+    # The averages of the loop, on the bins of the new bin ids
+    bin_ids = binning.resolution_bin_ids(wavelength, 100)
+    groups = [np.flatnonzero(bin_ids == idx) for idx in np.unique(bin_ids)]
+
+    np.testing.assert_allclose(
+        binning.bin_id_average(wavelength, bin_ids),
+        loop_index_list_average(wavelength, groups)
+    )
+    for row in range(2):
+        np.testing.assert_allclose(
+            binning.bin_id_average(xsec, bin_ids)[row],
+            loop_index_list_average(xsec[row], groups)
+        )
+
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_resolution_more_uniform_than_loop(descending):
+    """
+    The loop grew every bin until its resolution dropped below R, so its
+    bins came out slightly too wide (median R ~98.8 for R=100). The bins
+    with fixed logarithmic edges are closer to R (~99.5) and vary less.
+    """
+    wavelength = wavelength_grid(20_000, descending)
+
+    loop_r = bin_resolving_power(
+        wavelength, loop_resolution_ids(wavelength, 100)
+    )
+    bin_ids = binning.resolution_bin_ids(wavelength, 100)
+    binned_r = bin_resolving_power(wavelength, [
+        np.flatnonzero(bin_ids == idx) for idx in np.unique(bin_ids)
+    ])
+
+    assert 98.5 < np.median(loop_r) < 99.
+    assert 99.5 < np.median(binned_r) < 100.5
+    assert np.median(np.abs(binned_r - 100)) < np.median(np.abs(loop_r - 100))
+
+
+# ARBITRARY EDGES AND BIN IDS
+@pytest.mark.parametrize("seed", SEEDS)
+def test_edge_bin_ids_against_loop(seed):
+    rng = np.random.default_rng(seed)
+    edges = np.sort(rng.uniform(0, 10, 12))
+
+    # Values inside, outside, and exactly on every edge
+    values = np.concatenate([rng.uniform(-1, 11, 200), edges])
+
+    reference = np.full(values.size, -1)
+    for idx, value in enumerate(values):
+        for bin_idx in range(edges.size - 1):
+            upper_inside = (
+                value <= edges[bin_idx + 1] if bin_idx == edges.size - 2
+                else value < edges[bin_idx + 1]
+            )
+            if edges[bin_idx] <= value and upper_inside:
+                reference[idx] = bin_idx
+                break
+
+    np.testing.assert_array_equal(
+        binning.edge_bin_ids(values, edges), reference
+    )
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_bin_mean_against_loop(seed):
+    rng = np.random.default_rng(seed)
+    data, _ = random_series(rng, 500, nan_fraction=0.01)
+    bin_ids = random_bin_ids(rng, 500, 40)
+
+    # NaN propagate into their bin, empty bins are NaN
+    np.testing.assert_allclose(
+        binning.bin_mean(data, bin_ids, 40),
+        loop_bin_reduce(data, bin_ids, 40, np.mean)
+    )
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_bin_weighted_mean_against_loop(seed):
+    rng = np.random.default_rng(seed)
+    data, error = random_series(rng, 500)
+    bin_ids = random_bin_ids(rng, 500, 40)
+
+    def weighted(values_errors):
+        values, errors = values_errors.T
+        finite = np.isfinite(values) & np.isfinite(errors)
+        weights = 1 / errors[finite] ** 2
+
+        return np.sum(values[finite] * weights) / weights.sum()
+
+    mean, mean_error = binning.bin_weighted_mean(data, error, bin_ids, 40)
+    np.testing.assert_allclose(
+        mean, loop_bin_reduce(
+            np.column_stack([data, error]), bin_ids, 40, weighted
+        )
+    )
+
+    # Bins without a valid sample have no mean and an infinite error
+    counts = binning.bin_counts(
+        bin_ids[np.isfinite(data) & np.isfinite(error)], 40
+    )
+    assert np.all(np.isnan(mean[counts == 0]))
+    assert np.all(np.isinf(mean_error[counts == 0]))
+    assert np.all(np.isfinite(mean_error[counts > 0]))
+
+
+@pytest.mark.filterwarnings("ignore:All-NaN slice:RuntimeWarning")
+@pytest.mark.parametrize("seed", SEEDS)
+def test_bin_median_against_loop(seed):
+    rng = np.random.default_rng(seed)
+    data = np.vstack([random_series(rng, 500)[0] for _ in range(3)])
+    bin_ids = random_bin_ids(rng, 500, 40)
+
+    # Every row separately; NaN ignored, empty (or all-NaN) bins are NaN
+    medians = binning.bin_median(data, bin_ids, 40)
+    assert medians.shape == (3, 40)
+    for row in range(3):
+        np.testing.assert_allclose(
+            medians[row],
+            loop_bin_reduce(data[row], bin_ids, 40, np.nanmedian)
+        )
@@ -0,0 +1,32 @@
+import os
+import sys
+
+import numpy as np
+import polars as pl
+
+# The discovery statistics of 'exoplanet_inventory'
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(
+    REPOSITORY, "exoplanet_inventory", "exoplanet_detection_statistics"
+))
+import utils  # noqa: E402
+
+
+def test_cumulative_discovery_data_skips_missing_values():
+    frame = pl.DataFrame({
+        "disc_year": [1995, 1999, 2001, 2001, None],
+        "discoverymethod": [
+            "Radial Velocity", None, "Transit", "Transit", "Imaging"
+        ],
+    }).sort("disc_year", nulls_last=True)
+
+    cumulative = utils.cumulative_discovery_data(frame)
+
+    assert list(cumulative["method_names"]) == ["Radial Velocity", "Transit"]
+    np.testing.assert_array_equal(cumulative["year"], np.arange(1995, 2002))
+    np.testing.assert_array_equal(
+        cumulative["Radial Velocity"], [1, 1, 1, 1, 1, 1, 1]
+    )
+    np.testing.assert_array_equal(
+        cumulative["Transit"], [0, 0, 0, 0, 0, 0, 2]
+    )
@@ -0,0 +1,46 @@
+import os
+import pickle
+import sys
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.figure as m_fig  # noqa: E402
+import matplotlib.pyplot as plt  # noqa: E402
+from PIL import Image  # noqa: E402
+
+# The figure export of 'common'
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(REPOSITORY, "common"))
+import figure_export  # noqa: E402
+
+
+def test_export_figure_without_pyplot(tmp_path):
+    # A figure made without pyplot only has a base canvas
+    figure = m_fig.Figure(figsize=(2, 1))
+    figure.add_subplot().plot([0, 1], [1, 0])
+    filenames = [str(tmp_path / f"plot.{fmt}") for fmt in ("png", "svg")]
+
+    with figure_export.FigureExporter(processes=1) as exporter:
+        exporter.submit(figure, filenames, dpi=50)
+
+    assert sorted(exporter.saved) == sorted(filenames)
+    assert Image.open(filenames[0]).size == (100, 50)
+    assert os.path.getsize(filenames[1]) > 0
+
+
+def test_workers_close_restored_figures(tmp_path):
+    figure, axis = plt.subplots(figsize=(2, 1))
+    axis.plot([0, 1], [1, 0])
+    figure_state = pickle.dumps(figure)
+    plt.close(figure)
+
+    for idx in range(3):
+        figure_export.render_raster(
+            figure_state, [str(tmp_path / f"plot_{idx}.png")], 50, {}, {}
+        )
+        figure_export.render_savefig(
+            figure_state, [str(tmp_path / f"plot_{idx}.pdf")], 50, {}, {}
+        )
+
+    assert plt.get_fignums() == []
@@ -0,0 +1,130 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The spectral rebinning of 'pre-post_JWST_comparison'
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(REPOSITORY, "pre-post_JWST_comparison"))
+sys.path.append(os.path.join(REPOSITORY, "common"))
+import binning  # noqa: E402
+import spectral_rebin as sr  # noqa: E402
+import util as u  # noqa: E402
+
+# GLOBALS: stitching grid of the comparison
+EDGES = binning.resolution_edges(.2, 5.4, 50)
+
+
+def collection(spectra: list[dict]) -> u.SpectralCollection:
+    """Collection of spectra given as dictionaries of data arrays."""
+    return u.SpectralCollection(
+        data={
+            field: np.concatenate([spectrum[field] for spectrum in spectra])
+            for field in u.SpectralCollection.DATA_FIELDS
+        },
+        offsets=np.cumsum(
+            [0] + [spectrum["td"].size for spectrum in spectra]
+        ),
+        reference_names=np.array(
+            [f"Ref {idx}" for idx in range(len(spectra))]
+        ),
+        reference_idx=np.arange(len(spectra)),
+        instrument_names=np.array([""]),
+        instrument_idx=np.zeros(len(spectra), dtype=int)
+    )
+
+
+def spectrum(
+        edges: np.ndarray, depth: np.ndarray | float, error: float = 0.01
+) -> dict:
+    """Spectrum on contiguous wavelength bins."""
+    depth = np.broadcast_to(np.asarray(depth, dtype=float), edges.size - 1)
+
+    return {
+        "lam_cen": 0.5 * (edges[1:] + edges[:-1]),
+        "lam_err": 0.5 * np.diff(edges),
+        "td": np.array(depth),
+        "td_err_pos": np.full(depth.size, error),
+        "td_err_neg": np.full(depth.size, error),
+    }
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_constant_spectrum_rebins_to_constant(seed):
+    rng = np.random.default_rng(seed)
+
+    # Irregular source bins covering the grid (wider and narrower bins)
+    source_edges = np.sort(np.append(
+        rng.uniform(EDGES[0], EDGES[-1], 300), EDGES[[0, -1]]
+    ))
+    depth, variance = sr.rebin_spectra(
+        collection([spectrum(source_edges, 2.1)]), EDGES
+    )
+
+    np.testing.assert_allclose(depth, 2.1)
+    assert np.all(np.isfinite(variance))
+
+
+def test_offset_copies_align_and_combine():
+    rng = np.random.default_rng(1)
+    source_edges = np.linspace(0.6, 5.2, 400)
+    depth = 2.1 + 0.05 * np.sin(3 * source_edges[1:]) + rng.normal(
+        0, 0.005, source_edges.size - 1
+    )
+
+    spectra = collection([
+        spectrum(source_edges, depth),
+        spectrum(source_edges, depth + 0.01)
+    ])
+
+    offsets = sr.align_offsets(spectra, EDGES, reference=0)
+    np.testing.assert_allclose(offsets, [0, -0.01], atol=1e-12)
+
+    # Once aligned, both copies combine to the reference
+    reference = sr.combine_spectra(
+        collection([spectrum(source_edges, depth)]), EDGES
+    )
+    stitched = sr.stitch_spectra(spectra, EDGES, reference=0)
+    covered = np.isfinite(reference["td"])
+    np.testing.assert_allclose(
+        stitched["td"][covered], reference["td"][covered]
+    )
+    assert np.all(np.isnan(stitched["td"][~covered]))
+
+    # ... with the error of two independent measurements
+    np.testing.assert_allclose(
+        stitched["td_err_pos"][covered],
+        reference["td_err_pos"][covered] / np.sqrt(2)
+    )
+
+
+def test_wide_point_keeps_its_weight():
+    # One wide (Spitzer-like) point over several R=50 bins
+    wide = collection([{
+        "lam_cen": np.array([3.55]), "lam_err": np.array([0.15]),
+        "td": np.array([2.1]), "td_err_pos": np.array([0.01]),
+        "td_err_neg": np.array([0.01]),
+    }])
+
+    combined = sr.combine_spectra(wide, EDGES)
+    covered = np.isfinite(combined["td"])
+
+    assert covered.sum() > 3
+    np.testing.assert_allclose(combined["td"][covered], 2.1)
+    np.testing.assert_allclose(
+        np.sum(1 / combined["td_err_pos"][covered] ** 2), 1 / 0.01 ** 2
+    )
+
+
+def test_point_without_wavelength_range_is_rejected():
+    points = collection([spectrum(np.linspace(1, 2, 11), 2.1)])
+    points.lam_err[3] = 0.
+
+    with pytest.raises(ValueError):
+        sr.rebin_spectra(points, EDGES)
+
+    # Unless it has no valid value anyway
+    points.td[3] = np.nan
+    depth, _ = sr.rebin_spectra(points, EDGES)
+    np.testing.assert_allclose(depth[np.isfinite(depth)], 2.1)
@@ -0,0 +1,108 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The transit model of 'transit_lightcurves'
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(REPOSITORY, "transit_lightcurves"))
+import transit_model  # noqa: E402
+
+# WASP-39 b like orbit
+PLANET = {
+    "ratio_ator": 11.4, "ratio_rtor": 0.145, "pl_orbper": 4.055,
+    "pl_orbincl": 87.8, "pl_orbeccen": 0., "pl_orblper": 90.
+}
+TIME = np.linspace(-0.15, 0.15, 601)
+
+
+@pytest.mark.parametrize("limb_darkening", [None, (0.4, 0.25)])
+@pytest.mark.parametrize("missing", [np.nan, None, "absent"])
+def test_missing_orbit_parameters_mean_circular_orbit(
+        limb_darkening, missing
+):
+    circular = transit_model.transit_lightcurve(
+        TIME, PLANET, mid_time=0., limb_darkening=limb_darkening
+    )
+
+    parameters = dict(PLANET)
+    for key in ("pl_orbeccen", "pl_orblper"):
+        if missing == "absent":
+            del parameters[key]
+        else:
+            parameters[key] = missing
+
+    flux = transit_model.transit_lightcurve(
+        TIME, parameters, mid_time=0., limb_darkening=limb_darkening
+    )
+
+    assert np.all(np.isfinite(flux))
+    assert flux.min() < 0.98
+    np.testing.assert_array_equal(flux, circular)
+
+
+def test_uniform_depth_is_area_ratio():
+    flux = transit_model.transit_lightcurve(TIME, PLANET, mid_time=0.)
+
+    # The planet disk lies fully on the star at mid-transit
+    assert flux[TIME.size // 2] == pytest.approx(
+        1 - PLANET["ratio_rtor"] ** 2, abs=1e-12
+    )
+    assert flux[0] == flux[-1] == 1.
+
+
+def direct_quadratic_flux(
+        separation: float, radius_ratio: float, u1: float, u2: float,
+        n_steps: int = 20_000
+) -> float:
+    """
+    Limb-darkened transit by direct radial integration of the intensity
+    along the arcs of every stellar radius that the planet covers. The
+    cosine spacing of the radii resolves the square-root behaviour at
+    both ends of the covered range.
+    """
+    z, p = separation, radius_ratio
+    inner, outer = abs(z - p), min(z + p, 1.)
+    if inner >= outer:
+        return 1.
+
+    theta = (np.arange(n_steps) + 0.5) * np.pi / n_steps
+    radius = inner + (outer - inner) * 0.5 * (1 - np.cos(theta))
+    step = (outer - inner) * 0.5 * np.sin(theta) * np.pi / n_steps
+
+    arc = np.where(
+        radius < p - z, 2 * np.pi * radius,
+        2 * radius * np.arccos(np.clip(
+            (radius ** 2 + z ** 2 - p ** 2) / (2 * radius * z), -1, 1
+        ))
+    )
+    mu = np.sqrt(1 - radius ** 2)
+    intensity = 1 - u1 * (1 - mu) - u2 * (1 - mu) ** 2
+
+    return 1 - np.sum(intensity * arc * step) / (
+        np.pi * (1 - u1 / 3 - u2 / 6)
+    )
+
+
+@pytest.mark.parametrize("n_rings, tolerance", [
+    (transit_model.occultation.N_RINGS, 5e-6), (200, 1e-6)
+])
+def test_quadratic_limb_darkening_matches_direct_integration(
+        n_rings, tolerance
+):
+    u1, u2 = 0.4, 0.25
+    flux = transit_model.transit_lightcurve(
+        TIME, PLANET, mid_time=0., limb_darkening=(u1, u2), n_rings=n_rings
+    )
+
+    separation = transit_model.projected_separation(
+        TIME, 0., PLANET["pl_orbper"], PLANET["ratio_ator"],
+        PLANET["pl_orbincl"]
+    )
+    reference = [
+        direct_quadratic_flux(z, PLANET["ratio_rtor"], u1, u2)
+        for z in separation
+    ]
+
+    np.testing.assert_allclose(flux, reference, rtol=0, atol=tolerance)
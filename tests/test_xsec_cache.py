@@ -0,0 +1,48 @@
+import os
+import sys
+
+import numpy as np
+
+# The cache of binned products of 'opacity_xsec_illustration'
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(REPOSITORY, "opacity_xsec_illustration"))
+import xsec_cache  # noqa: E402
+
+PRODUCT = {
+    "xsec": np.array([1e-22, 2e-22]), "wavel": np.array([1e-6, 2e-6]),
+    "bin_information": "Binned using R=100"
+}
+
+
+def test_store_and_load_entry(tmp_path):
+    key = xsec_cache.cache_key("digest", 1, 2, "resolution", 100)
+    xsec_cache.store_entry(key, PRODUCT, cache_dir=str(tmp_path))
+
+    entry = xsec_cache.load_entry(key, cache_dir=str(tmp_path))
+
+    np.testing.assert_array_equal(entry["xsec"], PRODUCT["xsec"])
+    assert entry["bin_information"] == PRODUCT["bin_information"]
+    assert xsec_cache.load_entry("missing", cache_dir=str(tmp_path)) is None
+
+
+def test_entry_evicted_while_loading(tmp_path, monkeypatch):
+    key = xsec_cache.cache_key("digest", 1, 2, "resolution", 100)
+    xsec_cache.store_entry(key, PRODUCT, cache_dir=str(tmp_path))
+
+    # Another worker removes the entry between the access mark and the read
+    def evicted_read(filename):
+        os.remove(filename)
+        return xsec_cache.np.load(filename)
+
+    monkeypatch.setattr(xsec_cache, "read_npz", evicted_read)
+
+    assert xsec_cache.load_entry(key, cache_dir=str(tmp_path)) is None
+
+
+def test_chunk_size_in_cache_key():
+    keys = {
+        xsec_cache.cache_key("digest", 1, 2, "resolution", 100, chunk_size)
+        for chunk_size in (None, 10_000, 20_000)
+    }
+
+    assert len(keys) == 3
@@ -0,0 +1,136 @@
+import json
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Atomic file writes live in 'common' at the top of the repository
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"
+))
+import atomic_write  # noqa: E402
+
+# ECSV datatypes and their NumPy counterparts
+ECSV_DTYPES = {
+    "bool": np.bool_, "string": np.str_,
+    "int8": np.int8, "int16": np.int16, "int32": np.int32, "int64": np.int64,
+    "uint8": np.uint8, "uint16": np.uint16, "uint32": np.uint32,
+    "uint64": np.uint64,
+    "float16": np.float16, "float32": np.float32, "float64": np.float64,
+}
+
+
+def load_lightcurve(filename: str) -> dict[str, np.ndarray]:
+    """
+    Columns of an ECSV light-curve file. The file is only parsed once; the
+    columns are kept as .npy files in a sidecar directory and served as
+    memory maps, until the modification time of the ECSV file changes.
+    """
+    sidecar = sidecar_directory(filename)
+
+    if not sidecar_is_valid(filename, sidecar):
+        write_sidecar(filename, sidecar, read_ecsv(filename))
+
+    with open(os.path.join(sidecar, "meta.json")) as f:
+        columns = json.load(f)["columns"]
+
+    return {
+        column: np.load(
+            os.path.join(sidecar, f"{column}.npy"), mmap_mode="r"
+        )
+        for column in columns
+    }
+
+
+def read_ecsv(filename: str) -> dict[str, np.ndarray]:
+    """Parse an ECSV file, using the datatypes declared in its header."""
+    names, dtypes, delimiter = read_ecsv_header(filename)
+
+    # Parsing only happens once per file, so it can afford exact floats
+    data = pd.read_csv(
+        filename, comment="#", float_precision="round_trip",
+        sep="\\s+" if delimiter == " " else delimiter,
+        dtype={
+            name: dtype for name, dtype in dtypes.items()
+            if dtype is not np.str_
+        }
+    )
+
+    return {
+        name: data[name].to_numpy(dtype=dtypes.get(name)) for name in names
+    }
+
+
+def read_ecsv_header(filename: str) -> tuple[list[str], dict, str]:
+    """Column names, NumPy datatypes and delimiter from an ECSV header."""
+    column_pattern = re.compile(
+        r"-\s*\{name:\s*(?P<name>[^,}]+),\s*datatype:\s*(?P<dtype>[^,}]+)"
+    )
+    names, dtypes, delimiter = [], {}, " "
+
+    with open(filename) as f:
+        for line in f:
+            if not line.startswith("#"):
+                break
+
+            column = column_pattern.search(line)
+            if column is not None:
+                name = column["name"].strip()
+                names.append(name)
+                dtypes[name] = ECSV_DTYPES.get(
+                    column["dtype"].strip(), np.str_
+                )
+
+            elif line[1:].strip().startswith("delimiter:"):
+                delimiter = line.split(":", 1)[1].strip().strip("'\"")
+
+    return names, dtypes, delimiter
+
+
+def sidecar_directory(filename: str) -> str:
+    """Hidden directory next to the ECSV file holding its columns."""
+    directory, basename = os.path.split(os.path.abspath(filename))
+
+    return os.path.join(directory, f".{basename}.columns")
+
+
+def sidecar_is_valid(filename: str, sidecar: str) -> bool:
+    """Check that the sidecar was written for the current ECSV file."""
+    meta_file = os.path.join(sidecar, "meta.json")
+
+    if not os.path.isfile(meta_file):
+        return False
+
+    with open(meta_file) as f:
+        meta = json.load(f)
+
+    return meta["source_mtime"] == os.stat(filename).st_mtime_ns
+
+
+def write_sidecar(
+        filename: str, sidecar: str, columns: dict[str, np.ndarray]
+) -> None:
+    """
+    Store each column as .npy file, and the metadata last. Every file is
+    replaced in one step, so that an interrupted run (or a reader in
+    another process) never sees a partial column or metadata file.
+    """
+    os.makedirs(sidecar, exist_ok=True)
+
+    for name, column in columns.items():
+        with atomic_write.replacing_file(
+                os.path.join(sidecar, f"{name}.npy"), "wb"
+        ) as f:
+            np.save(f, column)
+
+    with atomic_write.replacing_file(
+            os.path.join(sidecar, "meta.json"), "w"
+    ) as f:
+        json.dump({
+            "source_mtime": os.stat(filename).st_mtime_ns,
+            "columns": list(columns.keys()),
+        }, f)
+
+    return None
@@ -1,81 +1,156 @@
-import pandas as pd
+import argparse
+import concurrent.futures as cf
+import functools
+import glob
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
 
-BIN_SIZE = 100
-plt.style.use(
-    "https://raw.githubusercontent.com/simon-ast/"
-    "matplotlib-plot-style/main/default_style.mplstyle"
-)
-
-
-def box_median(array, binsize):
-    median_array = []
-
-    bin_start = 0
-    bin_end = binsize
-    number_array_elements = array.shape[0]
+import ecsv_cache
+import transit_model
 
-    while bin_end < number_array_elements - binsize:
-        temporary_array = array[bin_start:bin_end]
-        median_array.append(np.nanmedian(temporary_array))
+# Shared binning and figure export live in 'common' at the top of the
+# repository
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"
+))
+import binning  # noqa: E402
+import figure_export  # noqa: E402
 
-        bin_start = bin_end
-        bin_end += binsize
+BIN_SIZE = 100
 
-    median_array = np.array(median_array)
 
-    return median_array
+def main():
+    args = argument_parser()
+
+    # Batch mode: bin all channel files into one summary product
+    if args.channels is not None:
+        summary = bin_channel_files(
+            pattern=args.channels, binsize=args.binsize,
+            processes=args.processes
+        )
+        save_channel_summary(
+            summary, args.output or f"channel_summary_bin{args.binsize}.npz"
+        )
+
+        return
+
+    # Both examples are rendered in parallel
+    with figure_export.FigureExporter() as exporter:
+        plot_white_example(args.binsize, exporter)
+        plot_spectroscopic_example(args.binsize, exporter)
+
+
+def argument_parser() -> argparse.Namespace:
+    # Instantiate argument parser
+    parser = argparse.ArgumentParser(
+        prog="Transit light-curve examples",
+        description="""
+            Plot the example white and spectroscopic light-curves, or bin
+            all spectroscopic channel files matching a glob pattern into a
+            single (channel x time-bin) summary product.
+        """,
+    )
 
+    parser.add_argument(
+        "-c", "--channels", default=None,
+        help="glob pattern of channel light-curve files (batch mode)"
+    )
+    parser.add_argument(
+        "-b", "--binsize", type=int, default=BIN_SIZE,
+        help="number of exposures per temporal bin"
+    )
+    parser.add_argument(
+        "-n", "--processes", type=int, default=None,
+        help="number of worker processes (default: number of cores)"
+    )
+    parser.add_argument(
+        "-o", "--output", default=None,
+        help="file name of the summary product"
+    )
 
-def wam(data, error, binsize):
-    wam_array = []
-    wam_error = []
+    return parser.parse_args()
 
-    bin_start = 0
-    bin_end = binsize
-    number_array_elements = data.shape[0]
 
-    while bin_end < number_array_elements - binsize:
-        temporary_data = data[bin_start:bin_end]
-        temporary_error = error[bin_start:bin_end]
-        weights = 1 / temporary_error ** 2
+def bin_channel_files(
+        pattern: str, binsize: int = BIN_SIZE, processes: int = None
+) -> dict:
+    """
+    Run 'plot_ready_data' over all channel files matching the pattern in a
+    process pool, and stack the binned light-curves by channel.
+    """
+    filenames = sorted(glob.glob(pattern))
+    if not filenames:
+        raise FileNotFoundError(f"No light-curve files match '{pattern}'")
 
-        temp_wam = np.sum(temporary_data * weights) / np.sum(weights)
-        temp_std = 1 / np.sqrt(np.sum(weights))
+    with cf.ProcessPoolExecutor(max_workers=processes) as pool:
+        channels = list(pool.map(
+            functools.partial(plot_ready_data, binsize=binsize), filenames
+        ))
 
-        wam_array.append(temp_wam)
-        wam_error.append(temp_std)
+    # Channels are sorted by wavelength, not by file name
+    channels.sort(key=lambda channel: channel["wavelength"])
 
-        bin_start = bin_end
-        bin_end += binsize
+    return {
+        "filename": np.array(
+            [channel["filename"] for channel in channels]
+        ),
+        "wavelength": np.array(
+            [channel["wavelength"] for channel in channels]
+        ),
+        "time_bin": channels[0]["time_bin"],
+        "lc_binned": np.vstack([channel["lc_binned"] for channel in channels]),
+        "error_binned": np.vstack(
+            [channel["error_binned"] for channel in channels]
+        ),
+    }
 
-    wam_array = np.array(wam_array)
-    wam_error = np.array(wam_error)
 
-    return wam_array, wam_error
+def save_channel_summary(summary: dict, filename: str) -> None:
+    """Save the stacked channel light-curves as a single product."""
+    np.savez(filename, **summary)
 
+    return None
 
-def plot_ready_data(filename, binsize=BIN_SIZE):
 
-    lc_data = pd.read_csv(filename, comment="#", sep="\\s+")
+def plot_ready_data(filename, binsize=BIN_SIZE, model_parameters=None):
+    """
+    Time axis, binned light-curve and transit model of one light-curve
+    file. Without model parameters, the transit model stored in the file is
+    used; otherwise it is evaluated with 'transit_model.transit_lightcurve'
+    from the planet parameters (keys as in the transit cord 'get_data'),
+    'mid_time' (same time system as the file) and optional quadratic
+    'limb_darkening' coefficients.
+    """
+    lc_data = ecsv_cache.load_lightcurve(filename)
 
     # X-axis
     time_bjmd = lc_data["time"]
-    time_hrs = (time_bjmd - time_bjmd.iloc[0]) * 24
-    binned_time = box_median(time_hrs, binsize)
+    time_hrs = (time_bjmd - time_bjmd[0]) * 24
+    binned_time = binning.box_median(time_hrs, binsize)
 
     # Y-axis
-    model = lc_data["transit"]
+    if model_parameters is None:
+        model = lc_data["transit"]
+    else:
+        model = transit_model.transit_lightcurve(
+            lc_data["time"], model_parameters,
+            mid_time=model_parameters["mid_time"],
+            limb_darkening=model_parameters.get("limb_darkening")
+        )
     #binned_lc = box_median(
     #    1 + (lc_data["lcdata"] - lc_data["polynom"]), binsize
     #)
-    binned_lc, binned_error = wam(
+    binned_lc, binned_error = binning.box_weighted_mean(
         1 + (lc_data["lcdata"] - lc_data["polynom"]), 
         lc_data["lcerr"], binsize
     )
 
     return {
+        "filename": filename,
+        "wavelength": float(lc_data["wavelength"][0]),
         "time_hrs": time_hrs,
         "time_bin": binned_time,
         "lc_model": model,
@@ -84,71 +159,104 @@ def plot_ready_data(filename, binsize=BIN_SIZE):
     }
 
 
-# White LC example
-fig_white, ax_white = plt.subplots(figsize=(8, 4))
-white_lc = plot_ready_data("w39b_lc_white.txt")
-
-# Underlying data
-ax_white.errorbar(
-    white_lc["time_bin"], white_lc["lc_binned"] * 1e2,
-    yerr=white_lc["error_binned"] * 1e2, fmt="o",
-    alpha=0.5, c="grey", label="Data", zorder=-1
-)
-
-# Light-curve astrophysical model
-ax_white.plot(
-    white_lc["time_hrs"], white_lc["lc_model"] * 1e2,
-    lw=2.5, c="k", label="Transit"
-)
-
-ax_white.legend()
-ax_white.set(
-    xlabel="Observed time [hrs]", ylabel="Normalised brightness [%]",
-    xlim=(white_lc["time_hrs"].iloc[0], white_lc["time_hrs"].iloc[-1]),
-    ylim=(0.974 * 1e2, 1.004 * 1e2)
-)
-
-# fig_white.patch.set_facecolor('none')
-fig_white.tight_layout()
-fig_white.savefig(f"transit_example_whiteLC_bin{BIN_SIZE}.png", dpi=600)
-
-#####################
-# Spectroscopic example
-fig_spec, ax_spec = plt.subplots(figsize=(8, 4))
-short_lc = plot_ready_data("w39b_lc_ch3.txt", BIN_SIZE)
-long_lc = plot_ready_data("w39b_lc_ch180.txt", BIN_SIZE)
-
-# Underlying data
-ax_spec.errorbar(
-    long_lc["time_bin"], long_lc["lc_binned"] * 1e2,
-    yerr=long_lc["error_binned"] * 1e2, fmt="o",
-    alpha=0.1, c="tab:red"
-)
-ax_spec.errorbar(
-    short_lc["time_bin"], short_lc["lc_binned"] * 1e2,
-    yerr=short_lc["error_binned"] * 1e2, fmt="o",
-    alpha=0.1, c="tab:blue"
-)
-
-
-# Light-curve astrophysical model
-ax_spec.plot(
-    long_lc["time_hrs"], long_lc["lc_model"] * 1e2, lw=2.5, c="tab:red",
-    label="Transit ($\\lambda \\approx 4.4 \\, \\mu \\mathrm{m}$)"
-)
-ax_spec.plot(
-    short_lc["time_hrs"], short_lc["lc_model"] * 1e2, lw=2.5, 
-    c="tab:blue", 
-    label="Transit ($\\lambda \\approx 2.2 \\, \\mu \\mathrm{m}$)")
-
-ax_spec.legend()
-ax_spec.set(
-    xlabel="Observed time [hrs]", 
-    ylabel="Normalised brightness [%]",
-    xlim=(short_lc["time_hrs"].iloc[0], short_lc["time_hrs"].iloc[-1]),
-    ylim=(0.974 * 1e2, 1.004 * 1e2)
-)
-
-# fig_spec.patch.set_facecolor('none')
-fig_spec.tight_layout()
-fig_spec.savefig(f"transit_example_specLC_bin{BIN_SIZE}.png", dpi=600)
+def plot_white_example(
+        binsize: int = BIN_SIZE,
+        exporter: figure_export.FigureExporter = None
+) -> None:
+    # White LC example
+    fig_white, ax_white = plt.subplots(figsize=(8, 4))
+    white_lc = plot_ready_data("w39b_lc_white.txt", binsize)
+
+    # Underlying data
+    ax_white.errorbar(
+        white_lc["time_bin"], white_lc["lc_binned"] * 1e2,
+        yerr=white_lc["error_binned"] * 1e2, fmt="o",
+        alpha=0.5, c="grey", label="Data", zorder=-1
+    )
+
+    # Light-curve astrophysical model
+    ax_white.plot(
+        white_lc["time_hrs"], white_lc["lc_model"] * 1e2,
+        lw=2.5, c="k", label="Transit"
+    )
+
+    ax_white.legend()
+    ax_white.set(
+        xlabel="Observed time [hrs]", ylabel="Normalised brightness [%]",
+        xlim=(white_lc["time_hrs"][0], white_lc["time_hrs"][-1]),
+        ylim=(0.974 * 1e2, 1.004 * 1e2)
+    )
+
+    # fig_white.patch.set_facecolor('none')
+    fig_white.tight_layout()
+    save_example(
+        fig_white, f"transit_example_whiteLC_bin{binsize}.png", exporter
+    )
+
+
+def plot_spectroscopic_example(
+        binsize: int = BIN_SIZE,
+        exporter: figure_export.FigureExporter = None
+) -> None:
+    # Spectroscopic example
+    fig_spec, ax_spec = plt.subplots(figsize=(8, 4))
+    short_lc = plot_ready_data("w39b_lc_ch3.txt", binsize)
+    long_lc = plot_ready_data("w39b_lc_ch180.txt", binsize)
+
+    # Underlying data
+    ax_spec.errorbar(
+        long_lc["time_bin"], long_lc["lc_binned"] * 1e2,
+        yerr=long_lc["error_binned"] * 1e2, fmt="o",
+        alpha=0.1, c="tab:red"
+    )
+    ax_spec.errorbar(
+        short_lc["time_bin"], short_lc["lc_binned"] * 1e2,
+        yerr=short_lc["error_binned"] * 1e2, fmt="o",
+        alpha=0.1, c="tab:blue"
+    )
+
+    # Light-curve astrophysical model
+    ax_spec.plot(
+        long_lc["time_hrs"], long_lc["lc_model"] * 1e2, lw=2.5, c="tab:red",
+        label="Transit ($\\lambda \\approx 4.4 \\, \\mu \\mathrm{m}$)"
+    )
+    ax_spec.plot(
+        short_lc["time_hrs"], short_lc["lc_model"] * 1e2, lw=2.5, 
+        c="tab:blue", 
+        label="Transit ($\\lambda \\approx 2.2 \\, \\mu \\mathrm{m}$)")
+
+    ax_spec.legend()
+    ax_spec.set(
+        xlabel="Observed time [hrs]", 
+        ylabel="Normalised brightness [%]",
+        xlim=(short_lc["time_hrs"][0], short_lc["time_hrs"][-1]),
+        ylim=(0.974 * 1e2, 1.004 * 1e2)
+    )
+
+    # fig_spec.patch.set_facecolor('none')
+    fig_spec.tight_layout()
+    save_example(
+        fig_spec, f"transit_example_specLC_bin{binsize}.png", exporter
+    )
+
+
+def save_example(
+        figure: plt.Figure,
+        filename: str,
+        exporter: figure_export.FigureExporter = None
+) -> None:
+    """Queue the figure in the export pool, or save it right away."""
+    if exporter is None:
+        figure.savefig(filename, dpi=600)
+    else:
+        exporter.submit(figure, filename, dpi=600)
+
+    return None
+
+
+if __name__ == "__main__":
+    plt.style.use(
+        "https://raw.githubusercontent.com/simon-ast/"
+        "matplotlib-plot-style/main/default_style.mplstyle"
+    )
+    main()
@@ -0,0 +1,163 @@
+import os
+import sys
+
+import numpy as np
+
+# Shared occultation (overlap and limb-darkened flux) of 'common'
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"
+))
+import occultation  # noqa: E402
+
+# GLOBALS
+KEPLER_ITERATIONS = 10
+
+
+def transit_lightcurve(
+        time: np.ndarray,
+        parameters: dict,
+        mid_time: float,
+        radius_ratio: float | np.ndarray = None,
+        limb_darkening: tuple = None,
+        n_rings: int = occultation.N_RINGS
+) -> np.ndarray:
+    """
+    Transit light-curve of a planet for a whole time array. The radius
+    ratio and limb-darkening coefficients may be arrays (one value per
+    spectroscopic channel), in which case the model is evaluated on the
+    (channel x time) grid.
+
+    :param time:            Observation times [d], e.g. BJD
+    :param parameters:      Planet parameters, with the keys of the transit
+                            cord 'get_data' (ratio_ator, ratio_rtor,
+                            pl_orbper, pl_orbincl, pl_orbeccen, pl_orblper;
+                            missing eccentricity and argument of periapsis
+                            default to 0 and 90 deg)
+    :param mid_time:        Time of mid-transit [d]
+    :param radius_ratio:    Planet-to-star radius ratio(s), overriding the
+                            one in the parameters
+    :param limb_darkening:  None (uniform star), or quadratic coefficients
+                            (u1, u2), each a number or one per channel
+    :param n_rings:         Number of radial rings for limb darkening
+
+    :return:
+        Normalised flux, of shape (time,) or (channel, time)
+    """
+    separation = projected_separation(
+        time, mid_time,
+        period=parameters["pl_orbper"],
+        semimajor_axis=parameters["ratio_ator"],
+        inclination=parameters["pl_orbincl"],
+        eccentricity=orbit_parameter(parameters, "pl_orbeccen", 0.),
+        argument_periapsis=orbit_parameter(parameters, "pl_orblper", 90.)
+    )
+
+    if radius_ratio is None:
+        radius_ratio = parameters["ratio_rtor"]
+
+    # Channel values along a new first axis, times along the last one
+    radius_ratio = channel_column(radius_ratio)
+
+    if limb_darkening is None:
+        return occultation.uniform_flux(separation, radius_ratio)
+
+    return occultation.quadratic_flux(
+        separation, radius_ratio,
+        channel_column(limb_darkening[0]), channel_column(limb_darkening[1]),
+        n_rings=n_rings
+    )
+
+
+def orbit_parameter(parameters: dict, key: str, default: float) -> float:
+    """
+    Orbit parameter, or its default if it is not given: the archive leaves
+    eccentricity and argument of periapsis empty (None or NaN) for many
+    planets, which are then treated as circular orbits.
+    """
+    value = parameters.get(key)
+
+    if value is None or not np.isfinite(value):
+        return default
+
+    return float(value)
+
+
+def channel_column(value: float | np.ndarray) -> float | np.ndarray:
+    """Per-channel values as column, to broadcast against the time axis."""
+    value = np.asarray(value, dtype=float)
+
+    return value[:, np.newaxis] if value.ndim == 1 else value
+
+
+def projected_separation(
+        time: np.ndarray,
+        mid_time: float,
+        period: float,
+        semimajor_axis: float,
+        inclination: float,
+        eccentricity: float = 0.,
+        argument_periapsis: float = 90.
+) -> np.ndarray:
+    """
+    Sky-projected star-planet separation in stellar radii, following
+    Winn (2010). Times where the planet is behind the star get infinite
+    separation, so that they never count as transit.
+
+    :param time:                Observation times [d]
+    :param mid_time:            Time of mid-transit [d]
+    :param period:              Orbital period [d]
+    :param semimajor_axis:      Semi-major axis in units of stellar radius
+    :param inclination:         Orbital inclination [deg]
+    :param eccentricity:        Orbital eccentricity
+    :param argument_periapsis:  Argument of periapsis [deg]
+
+    :return:
+        Projected separations
+    """
+    time = np.asarray(time, dtype=float)
+    omega = np.radians(argument_periapsis)
+    inclination = np.radians(inclination)
+
+    # Mean anomaly relative to the one at mid-transit (true anomaly of
+    # pi/2 - omega)
+    transit_anomaly = np.pi / 2 - omega
+    transit_eccentric = 2 * np.arctan(
+        np.sqrt((1 - eccentricity) / (1 + eccentricity))
+        * np.tan(transit_anomaly / 2)
+    )
+    mean_anomaly = (
+        transit_eccentric - eccentricity * np.sin(transit_eccentric)
+        + 2 * np.pi * (time - mid_time) / period
+    )
+
+    eccentric = eccentric_anomaly(mean_anomaly, eccentricity)
+    true_anomaly = 2 * np.arctan2(
+        np.sqrt(1 + eccentricity) * np.sin(eccentric / 2),
+        np.sqrt(1 - eccentricity) * np.cos(eccentric / 2)
+    )
+    distance = semimajor_axis * (1 - eccentricity * np.cos(eccentric))
+
+    # Winn (2010), equations (5) and (6)
+    separation = distance * np.sqrt(
+        1 - np.sin(omega + true_anomaly) ** 2 * np.sin(inclination) ** 2
+    )
+
+    return np.where(np.sin(omega + true_anomaly) > 0, separation, np.inf)
+
+
+def eccentric_anomaly(
+        mean_anomaly: np.ndarray, eccentricity: float
+) -> np.ndarray:
+    """Solve Kepler's equation for all mean anomalies (Newton's method)."""
+    eccentric = np.array(mean_anomaly, dtype=float)
+
+    if eccentricity == 0:
+        return eccentric
+
+    for _ in range(KEPLER_ITERATIONS):
+        eccentric -= (
+            (eccentric - eccentricity * np.sin(eccentric) - mean_anomaly)
+            / (1 - eccentricity * np.cos(eccentric))
+        )
+
+    return eccentric